@@ -0,0 +1,113 @@
+"""
+Inventory Analytics for the Product Inventory System
+Vectorized (NumPy) aggregates over numeric product columns, with a pure-Python reference
+
+NumPy is optional: without it InventorySystem.analytics() falls back to
+compute_reference(), which produces the same results with plain loops.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+
+def _percentile(sorted_values, percent):
+    """Linear-interpolated percentile of a sorted list (NumPy's default method)"""
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summary(total_products, total_quantity, total_value, percentiles, low_stock_count,
+             low_stock_threshold, categories):
+    return {
+        "total_products": total_products,
+        "total_quantity": total_quantity,
+        "total_value": total_value,
+        "stock_weighted_average_price": total_value / total_quantity if total_quantity else None,
+        "price_percentiles": percentiles,
+        "low_stock_threshold": low_stock_threshold,
+        "low_stock_count": low_stock_count,
+        "categories": categories
+    }
+
+
+def compute_reference(products, low_stock_threshold=5):
+    """Compute the analytics with plain Python loops over product objects"""
+    prices = []
+    total_quantity = 0
+    total_value = 0.0
+    low_stock_count = 0
+    categories = {}
+    for product in products:
+        value = product.price * product.quantity
+        low_stock = product.quantity <= low_stock_threshold
+        prices.append(product.price)
+        total_quantity += product.quantity
+        total_value += value
+        low_stock_count += low_stock
+        
+        group = categories.setdefault(product.category.casefold(),
+                                      {"products": 0, "quantity": 0, "value": 0.0, "low_stock": 0})
+        group["products"] += 1
+        group["quantity"] += product.quantity
+        group["value"] += value
+        group["low_stock"] += low_stock
+    
+    prices.sort()
+    percentiles = {f"p{p}": _percentile(prices, p) for p in PERCENTILES} if prices else None
+    return _summary(len(prices), total_quantity, total_value, percentiles, low_stock_count,
+                    low_stock_threshold, dict(sorted(categories.items())))
+
+
+def compute_vectorized(columns, low_stock_threshold=5):
+    """Compute the analytics with NumPy over a store's numeric_columns()
+    
+    columns is (ids, prices, quantities, category codes, category names):
+    equal-length array.array buffers where a negative ID marks a deleted
+    row, plus the category string for each code.
+    """
+    raw_ids, raw_prices, raw_quantities, raw_codes, names = columns
+    # Boolean indexing copies, so the source arrays are free to resize afterwards
+    live = np.frombuffer(raw_ids, dtype=np.int64) >= 0
+    prices = np.frombuffer(raw_prices, dtype=np.float64)[live]
+    quantities = np.frombuffer(raw_quantities, dtype=np.int64)[live]
+    codes = np.frombuffer(raw_codes, dtype=np.int32)[live]
+    
+    # Map raw category codes onto case-folded groups
+    group_of_name = {}
+    code_to_group = np.zeros(max(len(names), 1), dtype=np.int64)
+    for code, name in enumerate(names):
+        if name is not None:
+            code_to_group[code] = group_of_name.setdefault(name.casefold(), len(group_of_name))
+    groups = code_to_group[codes]
+    group_count = len(group_of_name)
+    
+    values = prices * quantities
+    low_stock = quantities <= low_stock_threshold
+    counts = np.bincount(groups, minlength=group_count)
+    group_quantities = np.bincount(groups, weights=quantities, minlength=group_count)
+    group_values = np.bincount(groups, weights=values, minlength=group_count)
+    group_low_stock = np.bincount(groups, weights=low_stock, minlength=group_count)
+    
+    categories = {}
+    for key, group in sorted(group_of_name.items()):
+        if counts[group]:
+            categories[key] = {
+                "products": int(counts[group]),
+                "quantity": int(group_quantities[group]),
+                "value": float(group_values[group]),
+                "low_stock": int(group_low_stock[group])
+            }
+    
+    percentiles = None
+    if len(prices):
+        points = np.percentile(prices, PERCENTILES)
+        percentiles = {f"p{p}": float(point) for p, point in zip(PERCENTILES, points)}
+    return _summary(len(prices), int(quantities.sum()), float(values.sum()), percentiles,
+                    int(low_stock.sum()), low_stock_threshold, categories)
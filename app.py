@@ -3,23 +3,171 @@ Flask Web Application for Product Inventory List System
 Provides a web-based user interface for managing inventory
 """
 
-from flask import Flask, render_template, jsonify, request
-from inventory_system import InventorySystem
-from product import Product
+import atexit
+import base64
+import json
+import math
+import os
+import time
+
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
+from backends import MemoryBackend, SQLiteBackend
+from inventory_system import InventorySystem, ORDER_PRIORITIES
+from json_cache import ProductJSONCache, product_to_dict
+from order_worker import OrderWorker
+from persistence import Persistence
+from product_store import STORES
+from product import MAX_QUANTITY, Product
 
 app = Flask(__name__)
-inventory = InventorySystem()
 
+# Optional bound on the order backlog; POST /api/orders answers 503 when full
+ORDER_QUEUE_CAPACITY = int(os.environ.get('ORDER_QUEUE_CAPACITY', 0)) or None
 
-def product_to_dict(product):
-    """Convert Product object to dictionary for JSON serialization"""
-    return {
-        "product_id": product.product_id,
-        "name": product.name,
-        "category": product.category,
-        "price": product.price,
-        "quantity": product.quantity
-    }
+# Undo history budget in change records (a transaction counts each change it made);
+# the oldest operations are dropped to stay within it
+UNDO_LIMIT = int(os.environ.get('UNDO_LIMIT', 1000))
+
+# Order dispatch: "fifo" (default) or "priority" (by priority, then deadline, then arrival)
+PRIORITY_ORDERS = os.environ.get('ORDER_QUEUE_MODE', 'fifo') == 'priority'
+
+# Debug mode: cross-check running statistics against a full scan on every read
+DEBUG_CHECKS = os.environ.get('INVENTORY_DEBUG_CHECKS', '') == '1'
+
+# Largest page GET /api/products will return when paginating
+MAX_PAGE_SIZE = 1000
+
+# Most orders POST /api/orders/process?max=N will handle in one call
+MAX_PROCESS_BATCH = 10000
+
+
+# Shared SQLite database; set it to run several gunicorn workers on one inventory.
+# Products live in the database, while the order queue and undo history stay per worker.
+DATABASE = os.environ.get('INVENTORY_DATABASE')
+
+# Optional durable storage (write-ahead log + snapshots) for the in-memory backend
+DATA_DIR = os.environ.get('INVENTORY_DATA_DIR')
+
+if DATABASE:
+    if DATA_DIR:
+        raise RuntimeError("INVENTORY_DATA_DIR is only used without INVENTORY_DATABASE")
+    BACKEND = SQLiteBackend(DATABASE, pool_size=int(os.environ.get('INVENTORY_DB_POOL_SIZE', 4)))
+else:
+    # Product storage engine: "linked" (default), memory-lean "columnar", or "mapped",
+    # which serves a binary snapshot in INVENTORY_DATA_DIR straight from the file
+    BACKEND = MemoryBackend(STORES[os.environ.get('INVENTORY_STORE', 'linked')]())
+
+inventory = InventorySystem(order_capacity=ORDER_QUEUE_CAPACITY, debug_checks=DEBUG_CHECKS, backend=BACKEND,
+                            priority_orders=PRIORITY_ORDERS, undo_limit=UNDO_LIMIT)
+
+# Encoded JSON per product for list responses. Other workers' changes to a shared
+# database would not invalidate it, so it only stores fragments in memory mode.
+json_cache = ProductJSONCache(enabled=not DATABASE)
+inventory.change_listeners.append(json_cache.invalidate)
+
+persistence = None
+if DATA_DIR:
+    persistence = Persistence(DATA_DIR, snapshot_format=os.environ.get('INVENTORY_SNAPSHOT_FORMAT', 'json'))
+    persistence.recover(inventory)
+    atexit.register(persistence.close)
+
+# Background order processing in micro-batches; started at import when ORDER_WORKER=1
+order_worker = OrderWorker(inventory,
+                           batch_size=int(os.environ.get('ORDER_WORKER_BATCH_SIZE', 100)),
+                           interval=int(os.environ.get('ORDER_WORKER_INTERVAL_MS', 50)) / 1000)
+
+
+def start_order_worker():
+    """Start draining the order queue in the background"""
+    order_worker.start()
+
+
+def stop_order_worker():
+    """Stop the background worker after its current batch"""
+    order_worker.stop()
+
+
+def products_response(products, **fields):
+    """JSON response listing products, joined from their cached fragments"""
+    return Response(json_cache.encode_response(products, **fields), mimetype='application/json')
+
+
+def not_modified(etag):
+    """Return a 304 response if the client's If-None-Match already has etag, else None"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    return response
+
+
+def parse_product_fields(data):
+    """Validate a product payload and return (name, category, price, quantity)
+    
+    Raises ValueError (or TypeError) with a client-facing message.
+    """
+    name = data.get('name', '').strip()
+    category = data.get('category', '').strip()
+    price = float(data.get('price', 0))
+    quantity = int(data.get('quantity', 0))
+    
+    if not name or not category:
+        raise ValueError("Name and category are required")
+    
+    if not math.isfinite(price):
+        raise ValueError("Price must be a finite number")
+    
+    if price < 0 or quantity < 0:
+        raise ValueError("Price and quantity must be non-negative")
+    
+    if quantity > MAX_QUANTITY:
+        raise ValueError(f"Quantity cannot exceed {MAX_QUANTITY}")
+    
+    return name, category, price, quantity
+
+
+def parse_order_priority(data):
+    """Return (priority, deadline) from an order payload, raising ValueError if invalid
+    
+    priority is an integer or a name from ORDER_PRIORITIES; deadline is an
+    optional Unix timestamp.
+    """
+    priority = data.get('priority', 0)
+    if isinstance(priority, str) and not priority.lstrip('-').isdigit():
+        if priority not in ORDER_PRIORITIES:
+            raise ValueError(f"Priority must be an integer or one of: {', '.join(ORDER_PRIORITIES)}")
+        priority = ORDER_PRIORITIES[priority]
+    if isinstance(priority, float) and not math.isfinite(priority):
+        raise ValueError("Priority must be a finite number")
+    
+    deadline = data.get('deadline')
+    if deadline is not None:
+        deadline = float(deadline)
+        # A NaN would also stop expiry for good once it reached the top of the deadline heap
+        if not math.isfinite(deadline):
+            raise ValueError("Deadline must be a finite Unix timestamp")
+    return int(priority), deadline
+
+
+def encode_cursor(product_id):
+    """Encode the last product ID of a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(f"p:{product_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not raw.startswith('p:') or not raw[2:].isdigit():
+        raise ValueError("Invalid cursor")
+    return int(raw[2:])
 
 
 @app.route('/')
@@ -29,15 +177,54 @@ def index():
 
 @app.route('/api/products', methods=['GET'])
 def get_all_products():
-    """Get all products"""
-    products = inventory.display_all_products()
-    # Convert Product objects to dictionaries
-    products_list = []
-    current = inventory.product_list.head
-    while current is not None:
-        products_list.append(product_to_dict(current.data))
-        current = current.next
-    return jsonify({"success": True, "products": products_list})
+    """Get all products, or one page of them when limit/cursor is given"""
+    # Take the tag before reading, so a change made meanwhile is never hidden behind it
+    etag = inventory.version_tag()
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return with_etag(products_response(inventory.iter_products()), etag)
+    
+    try:
+        limit = int(request.args.get('limit', 50))
+        after_id = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if limit <= 0:
+        return jsonify({"success": False, "error": "Limit must be positive"}), 400
+    
+    products, has_more = inventory.page_products(after_id, min(limit, MAX_PAGE_SIZE))
+    next_cursor = encode_cursor(products[-1].product_id) if has_more else None
+    return with_etag(products_response(products, next_cursor=next_cursor), etag)
+
+
+def generate_ndjson_export():
+    """Yield the catalog as one JSON object per line"""
+    for product in inventory.iter_products():
+        yield json_cache.fragment(product) + b"\n"
+
+
+def generate_json_export():
+    """Yield the catalog as the same document GET /api/products returns"""
+    yield b'{"products":['
+    separator = b''
+    for product in inventory.iter_products():
+        yield separator + json_cache.fragment(product)
+        separator = b','
+    yield b'],"success":true}\n'
+
+
+@app.route('/api/products/export', methods=['GET'])
+def export_products():
+    """Stream the full catalog without building it in memory"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format == 'ndjson':
+        return Response(stream_with_context(generate_ndjson_export()), mimetype='application/x-ndjson')
+    if export_format == 'json':
+        return Response(stream_with_context(generate_json_export()), mimetype='application/json')
+    return jsonify({"success": False, "error": "Format must be 'ndjson' or 'json'"}), 400
 
 
 @app.route('/api/products', methods=['POST'])
@@ -45,17 +232,7 @@ def add_product():
     """Add a new product"""
     try:
         data = request.get_json()
-        name = data.get('name', '').strip()
-        category = data.get('category', '').strip()
-        price = float(data.get('price', 0))
-        quantity = int(data.get('quantity', 0))
-        
-        if not name or not category:
-            return jsonify({"success": False, "error": "Name and category are required"}), 400
-        
-        if price < 0 or quantity < 0:
-            return jsonify({"success": False, "error": "Price and quantity must be non-negative"}), 400
-        
+        name, category, price, quantity = parse_product_fields(data)
         product = inventory.add_product(name, category, price, quantity)
         return jsonify({"success": True, "product": product_to_dict(product)})
     except (ValueError, TypeError) as e:
@@ -64,6 +241,48 @@ def add_product():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route('/api/products/bulk', methods=['POST'])
+def add_products_bulk():
+    """Add many products from a JSON array or an NDJSON body"""
+    if request.mimetype == 'application/x-ndjson':
+        rows = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(e)
+    else:
+        rows = request.get_json(silent=True)
+        if isinstance(rows, dict):
+            rows = rows.get('products')
+    
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"success": False, "error": "Expected a non-empty array of products"}), 400
+    
+    # Validate the whole batch before inserting anything
+    valid_rows = []
+    errors = []
+    for row_number, row in enumerate(rows):
+        try:
+            if isinstance(row, Exception):
+                raise ValueError(f"Invalid JSON: {row}")
+            if not isinstance(row, dict):
+                raise ValueError("Each product must be an object")
+            valid_rows.append(parse_product_fields(row))
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append({"row": row_number, "error": str(e)})
+    
+    products = inventory.add_products(valid_rows)
+    return jsonify({
+        "success": True,
+        "added": len(products),
+        "products": [product_to_dict(p) for p in products],
+        "errors": errors
+    })
+
+
 @app.route('/api/products/<int:product_id>', methods=['GET'])
 def get_product(product_id):
     """Get a specific product by ID"""
@@ -92,6 +311,9 @@ def update_quantity(product_id):
         if new_quantity < 0:
             return jsonify({"success": False, "error": "Quantity cannot be negative"}), 400
         
+        if new_quantity > MAX_QUANTITY:
+            return jsonify({"success": False, "error": f"Quantity cannot exceed {MAX_QUANTITY}"}), 400
+        
         if inventory.update_product_quantity(product_id, new_quantity):
             product = inventory.search_product(product_id)
             return jsonify({"success": True, "product": product_to_dict(product)})
@@ -107,6 +329,9 @@ def update_price(product_id):
         data = request.get_json()
         new_price = float(data.get('price', 0))
         
+        if not math.isfinite(new_price):
+            return jsonify({"success": False, "error": "Price must be a finite number"}), 400
+        
         if new_price < 0:
             return jsonify({"success": False, "error": "Price cannot be negative"}), 400
         
@@ -125,17 +350,35 @@ def search_products():
     if not name:
         return jsonify({"success": False, "error": "Search term is required"}), 400
     
-    results = inventory.search_by_name(name)
-    products_list = [product_to_dict(p) for p in results]
-    return jsonify({"success": True, "products": products_list})
+    return products_response(inventory.search_by_name(name))
+
+
+@app.route('/api/products/autocomplete', methods=['GET'])
+def autocomplete_products():
+    """Suggest products whose name starts with a prefix"""
+    prefix = request.args.get('prefix', '').strip()
+    if not prefix:
+        return jsonify({"success": False, "error": "Prefix is required"}), 400
+    
+    try:
+        limit = int(request.args.get('limit', 10))
+        if limit <= 0:
+            limit = 10
+    except (ValueError, TypeError):
+        limit = 10
+    
+    return products_response(inventory.autocomplete(prefix, min(limit, 100)))
 
 
 @app.route('/api/products/category/<category>', methods=['GET'])
 def get_products_by_category(category):
     """Get products by category"""
-    results = inventory.display_by_category(category)
-    products_list = [product_to_dict(p) for p in results]
-    return jsonify({"success": True, "products": products_list})
+    etag = inventory.version_tag(category=category)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    
+    return with_etag(products_response(inventory.display_by_category(category)), etag)
 
 
 @app.route('/api/orders', methods=['POST'])
@@ -145,17 +388,24 @@ def add_order():
         data = request.get_json()
         product_id = int(data.get('product_id', 0))
         quantity = int(data.get('quantity', 0))
+        priority, deadline = parse_order_priority(data)
         
         if quantity <= 0:
             return jsonify({"success": False, "error": "Quantity must be positive"}), 400
         
-        order = inventory.add_order(product_id, quantity)
+        order = inventory.add_order(product_id, quantity, priority, deadline)
         if order:
+            order_worker.wake()
             return jsonify({"success": True, "order": order})
+        elif inventory.order_queue.is_full():
+            response = jsonify({"success": False, "error": "Order queue is full, try again later"})
+            response.headers['Retry-After'] = '1'
+            return response, 503
         else:
             product = inventory.search_product(product_id)
             if product:
-                return jsonify({"success": False, "error": f"Insufficient stock! Available: {product.quantity}"}), 400
+                available = inventory.available_quantity(product_id)
+                return jsonify({"success": False, "error": f"Insufficient stock! Available: {available}"}), 400
             return jsonify({"success": False, "error": "Product not found"}), 404
     except (ValueError, TypeError) as e:
         return jsonify({"success": False, "error": str(e)}), 400
@@ -163,28 +413,150 @@ def add_order():
 
 @app.route('/api/orders/process', methods=['POST'])
 def process_order():
-    """Process the next order from the queue"""
-    order = inventory.process_order()
+    """Process the next order, or up to max orders within deadline_ms"""
+    if 'max' not in request.args:
+        order = inventory.process_order()
+        if order:
+            return jsonify({"success": True, "order": order})
+        return jsonify({"success": False, "error": "No orders in queue"}), 404
+    
+    # Start the clock before waiting for the inventory lock, so it counts against the budget
+    started = time.monotonic()
+    try:
+        max_orders = int(request.args['max'])
+        deadline_ms = float(request.args['deadline_ms']) if 'deadline_ms' in request.args else None
+    except ValueError:
+        return jsonify({"success": False, "error": "max and deadline_ms must be numbers"}), 400
+    if deadline_ms is not None and not math.isfinite(deadline_ms):
+        return jsonify({"success": False, "error": "deadline_ms must be a finite number"}), 400
+    if max_orders <= 0 or (deadline_ms is not None and deadline_ms <= 0):
+        return jsonify({"success": False, "error": "max and deadline_ms must be positive"}), 400
+    
+    deadline = started + deadline_ms / 1000 if deadline_ms is not None else None
+    processed, rejected = inventory.process_orders(min(max_orders, MAX_PROCESS_BATCH), deadline)
+    return jsonify({
+        "success": True,
+        "processed": processed,
+        "rejected": rejected,
+        "pending": len(inventory.pending_orders)
+    })
+
+
+@app.route('/api/orders/<int:order_id>', methods=['DELETE'])
+def cancel_order(order_id):
+    """Cancel a pending order and release its reserved stock"""
+    order = inventory.cancel_order(order_id)
     if order:
         return jsonify({"success": True, "order": order})
-    return jsonify({"success": False, "error": "No orders in queue"}), 404
+    return jsonify({"success": False, "error": "Order not found or already processed"}), 404
+
+
+@app.route('/api/orders/worker', methods=['GET'])
+def get_order_worker_status():
+    """Get the background order worker's state and throughput"""
+    return jsonify({"success": True, "worker": order_worker.status()})
 
 
 @app.route('/api/orders', methods=['GET'])
 def get_pending_orders():
-    """Get all pending orders"""
-    orders = inventory.display_pending_orders()
-    return jsonify({"success": True, "orders": orders})
+    """Get pending orders in processing order, or one page of them when offset/limit is given"""
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if offset < 0:
+        return jsonify({"success": False, "error": "Offset must not be negative"}), 400
+    if limit is not None and limit <= 0:
+        return jsonify({"success": False, "error": "Limit must be positive"}), 400
+    
+    if limit is None and 'offset' not in request.args:
+        return jsonify({"success": True, "orders": inventory.display_pending_orders()})
+    
+    limit = min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+    with inventory.lock.read():
+        orders = inventory.display_pending_orders(offset, limit)
+        total = len(inventory.pending_orders)
+    return jsonify({
+        "success": True,
+        "orders": orders,
+        "offset": offset,
+        "total": total,
+        "has_more": offset + len(orders) < total
+    })
+
+
+def parse_steps():
+    """Read the ?steps= count for undo/redo (default 1, capped at UNDO_LIMIT)"""
+    steps = int(request.args.get('steps', 1))
+    if steps <= 0:
+        raise ValueError("Steps must be positive")
+    return min(steps, UNDO_LIMIT)
 
 
 @app.route('/api/operations/undo', methods=['POST'])
 def undo_operation():
-    """Undo the last operation"""
-    if inventory.undo_last_operation():
-        return jsonify({"success": True})
+    """Undo the last operation, or the last ?steps=N of them"""
+    try:
+        steps = parse_steps()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    undone = inventory.undo(steps)
+    if undone:
+        return jsonify({"success": True, "undone": undone})
     return jsonify({"success": False, "error": "No operations to undo"}), 404
 
 
+@app.route('/api/operations/redo', methods=['POST'])
+def redo_operation():
+    """Redo the last undone operation, or the last ?steps=N of them"""
+    try:
+        steps = parse_steps()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    redone = inventory.redo(steps)
+    if redone:
+        return jsonify({"success": True, "redone": redone})
+    return jsonify({"success": False, "error": "No operations to redo"}), 404
+
+
+def operation_to_dict(op_type, product_id, old_value):
+    """Convert an undo record (op, product ID, old value) to a dictionary"""
+    if op_type == "transaction":
+        return {
+            "type": "transaction",
+            "description": f"Transaction of {len(old_value)} changes",
+            "operations": [operation_to_dict(*record) for record in old_value]
+        }
+    if op_type == "add_batch":
+        # A batch record holds the first and last product ID
+        return {
+            "type": "add_batch",
+            "description": f"Added {old_value - product_id + 1} products",
+            "product_ids": list(range(product_id, old_value + 1))
+        }
+    
+    if op_type == "remove":
+        name, category, price, quantity, _ = old_value
+        product = Product(product_id, name, category, price, quantity)
+    else:
+        # Records keep only the ID; show the product as it is now, if it still exists
+        product = inventory.search_product(product_id)
+    label = product.name if product else f"product #{product_id}"
+    operation = {"type": op_type, "product": product_to_dict(product) if product else None}
+    if op_type == "add":
+        operation["description"] = f"Added: {label}"
+    elif op_type == "remove":
+        operation["description"] = f"Removed: {label}"
+    elif op_type == "update_quantity":
+        operation["description"] = f"Updated quantity: {label} (was {old_value})"
+        operation["old_value"] = old_value
+    elif op_type == "update_price":
+        operation["description"] = f"Updated price: {label} (was ${old_value:.2f})"
+        operation["old_value"] = old_value
+    return operation
+
+
 @app.route('/api/operations/recent', methods=['GET'])
 def get_recent_operations():
     """Get recent operations"""
@@ -196,62 +568,56 @@ def get_recent_operations():
         n = 5
     
     operations = inventory.display_recent_operations(n)
-    operations_list = []
-    for op in operations:
-        op_type = op[0]
-        if op_type == "add":
-            operations_list.append({
-                "type": "add",
-                "description": f"Added: {op[1].name}",
-                "product": product_to_dict(op[1])
-            })
-        elif op_type == "remove":
-            operations_list.append({
-                "type": "remove",
-                "description": f"Removed: {op[1].name}",
-                "product": product_to_dict(op[1])
-            })
-        elif op_type == "update_quantity":
-            operations_list.append({
-                "type": "update_quantity",
-                "description": f"Updated quantity: {op[1].name} (was {op[2]})",
-                "product": product_to_dict(op[1]),
-                "old_value": op[2]
-            })
-        elif op_type == "update_price":
-            operations_list.append({
-                "type": "update_price",
-                "description": f"Updated price: {op[1].name} (was ${op[2]:.2f})",
-                "product": product_to_dict(op[1]),
-                "old_value": op[2]
-            })
-    
+    operations_list = [operation_to_dict(*op) for op in operations]
     return jsonify({"success": True, "operations": operations_list})
 
 
 @app.route('/api/statistics', methods=['GET'])
 def get_statistics():
     """Get inventory statistics"""
+    etag = inventory.version_tag(orders=True)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    
     stats = inventory.get_statistics()
-    return jsonify({"success": True, "statistics": stats})
+    return with_etag(jsonify({"success": True, "statistics": stats}), etag)
+
+
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """Get per-category and price analytics"""
+    try:
+        low_stock = int(request.args.get('low_stock', 5))
+    except (ValueError, TypeError):
+        return jsonify({"success": False, "error": "low_stock must be an integer"}), 400
+    
+    return jsonify({"success": True, "analytics": inventory.analytics(low_stock)})
 
 
 # Initialize sample data on module import
 # This ensures data is loaded when the app starts
 def init_sample_data():
     """Initialize with sample products"""
-    if inventory.product_list.is_empty():  # Only add if empty
-        inventory.add_product("Laptop", "Electronics", 999.99, 10)
-        inventory.add_product("Mouse", "Electronics", 29.99, 50)
-        inventory.add_product("Keyboard", "Electronics", 79.99, 30)
-        inventory.add_product("Desk Chair", "Furniture", 199.99, 15)
-        inventory.add_product("Coffee Maker", "Appliances", 89.99, 20)
+    # One transaction, so workers starting together on a shared database seed it once;
+    # ungrouped, so undo still removes the demo products one at a time
+    with inventory.transaction(group_undo=False):
+        if inventory.is_empty() and inventory.next_id == 1:  # Only seed a brand-new inventory
+            inventory.add_product("Laptop", "Electronics", 999.99, 10)
+            inventory.add_product("Mouse", "Electronics", 29.99, 50)
+            inventory.add_product("Keyboard", "Electronics", 79.99, 30)
+            inventory.add_product("Desk Chair", "Furniture", 199.99, 15)
+            inventory.add_product("Coffee Maker", "Appliances", 89.99, 20)
 
 # Initialize sample data
 init_sample_data()
 
+if os.environ.get('ORDER_WORKER') == '1':
+    start_order_worker()
+    # Registered after persistence.close, so it runs first and the last batch is journaled
+    atexit.register(stop_order_worker)
+
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host='0.0.0.0', port=port)
 
@@ -0,0 +1,651 @@
+"""
+Storage Backends for the Product Inventory System
+Where InventorySystem keeps its products: in process memory, or in a shared SQLite database
+
+Both backends expose the same interface:
+    allocate_id()                  reserve the next product ID and return it
+    next_id                        the ID allocate_id() hands out next (assignable)
+    allocate_order_id()            reserve the next order ID and return it
+    next_order_id                  the ID allocate_order_id() hands out next (assignable)
+    transaction()                  context manager making the calls inside it atomic
+    insert(product, successor_id)  store a product, return the stored product
+    bulk_load(rows)                store (id, name, category, price, quantity) rows in one step
+    delete(product_id)             remove a product, return it as a detached Product
+    get(product_id)                stored product or None (write-through in memory)
+    snapshot(product_id)           product as it is now, or None, safe to use after the lock
+    successor_id(product_id)       ID of the next product in list order (position hint for undo)
+    set_quantity(product, value)   change a stored product's quantity
+    set_price(product, value)      change a stored product's price
+    take_stock(product, quantity)  decrement quantity if enough is in stock, atomically; True if taken
+    page(after_id, limit)          (products with ID > after_id in ID order, has_more)
+    search_name(query)             products whose lowercased name contains query, in ID order
+    by_category(category)          products of a category (case-insensitive), in ID order
+    autocomplete(prefix, limit)    products whose lowercased name starts with prefix, by name then ID
+    statistics()                   total_products, total_quantity, total_value, categories
+    numeric_columns()              as in product_store.py
+    version                        change counter, bumped by every product mutation
+    category_version(category)     the version of a category's last change (0 if never changed)
+    epoch                          random token; versions are only comparable within one epoch
+    iteration (in ID order), len() and `in`
+"""
+
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+
+from data_structures import NGramIndex, PrefixIndex
+from product import Product
+from product_store import LinkedListStore, product_columns
+
+
+class MemoryBackend:
+    """Products in process memory: a storage engine plus in-memory indexes
+    
+    The engine (see product_store.py) holds the products; category, name
+    and prefix indexes and running totals are kept beside it so every query
+    avoids a full scan. After bulk_load() the name and prefix indexes are
+    built on first use instead. State is private to the process.
+    """
+    def __init__(self, store=None):
+        # Primary product storage; Linked List by default
+        self.store = store if store is not None else LinkedListStore()
+        
+        # Secondary index: case-folded category -> set of product IDs
+        self.category_index = {}
+        
+        # Trigram inverted index over lowercased names: gram -> product IDs
+        self.name_index = NGramIndex(3)
+        
+        # Sorted (lowercased name, ID) pairs for prefix autocomplete
+        self.name_prefixes = PrefixIndex()
+        
+        # Set by bulk_load(): the two name indexes are rebuilt from the store on
+        # first use (under name_index_lock, as concurrent readers may race for it)
+        self.name_indexes_stale = False
+        self.name_index_lock = threading.Lock()
+        
+        # Running aggregates, kept in sync by every mutation (O(1) statistics)
+        self.total_quantity = 0
+        self.total_value = 0
+        
+        # Counters for product and order IDs
+        self.next_id = 1
+        self.next_order_id = 1
+        
+        # Change counters for conditional GETs: the whole inventory, and
+        # case-folded category -> version of its last change
+        self.version = 0
+        self.category_versions = {}
+        self.epoch = os.urandom(4).hex()
+    
+    def allocate_id(self):
+        product_id = self.next_id
+        self.next_id += 1
+        return product_id
+    
+    def allocate_order_id(self):
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        return order_id
+    
+    def transaction(self):
+        """Calls are already atomic within one process"""
+        return contextlib.nullcontext()
+    
+    def insert(self, product, successor_id=None):
+        """Store a product (before successor_id, else at the end) and add it to all indexes"""
+        product = self.store.insert(product, successor_id)
+        self._index_category(product.product_id, product.category)
+        if not self.name_indexes_stale:
+            self.name_index.add(product.product_id, product.name.lower())
+            self.name_prefixes.insert(product.name.lower(), product.product_id)
+        self.total_quantity += product.quantity
+        self.total_value += product.price * product.quantity
+        self._bump_version(product.category)
+        return product
+    
+    def delete(self, product_id):
+        """Remove a product from storage and all indexes, returning it detached"""
+        product = self.store.delete(product_id)
+        self._unindex_category(product)
+        if not self.name_indexes_stale:
+            self.name_index.remove(product.product_id, product.name.lower())
+            self.name_prefixes.remove(product.name.lower(), product.product_id)
+        self.total_quantity -= product.quantity
+        self.total_value -= product.price * product.quantity
+        if not len(self.store):
+            self.total_value = 0  # Drop accumulated rounding error
+        self._bump_version(product.category)
+        return product
+    
+    def bulk_load(self, rows):
+        """Store many products at once, typically a snapshot being recovered
+        
+        Each row is (id, name, category, price, quantity). Cheaper than
+        insert() per row: versions are bumped once, and the name indexes are
+        left to be rebuilt on first use. A store with attach() (MappedStore)
+        that is still empty takes a MappedSnapshot as is, so only its numeric
+        fields and categories are read here.
+        """
+        if hasattr(self.store, "attach") and hasattr(rows, "scan") and not len(self.store):
+            self.store.attach(rows)
+            loaded = rows.scan()
+        else:
+            loaded = self._insert_rows(rows)
+        
+        categories = set()
+        for product_id, category, price, quantity in loaded:
+            self._index_category(product_id, category)
+            categories.add(category)
+            self.total_quantity += quantity
+            self.total_value += price * quantity
+            self.next_id = max(self.next_id, product_id + 1)
+        if categories:
+            self.name_indexes_stale = True
+            self.version += 1
+            for category in categories:
+                self.category_versions[category.casefold()] = self.version
+    
+    def _insert_rows(self, rows):
+        """Insert rows into the store, yielding the fields bulk_load() indexes"""
+        for product_id, name, category, price, quantity in rows:
+            self.store.insert(Product(product_id, name, category, price, quantity))
+            yield product_id, category, price, quantity
+    
+    def _name_indexes(self):
+        """Return the name and prefix indexes, rebuilding them first if a bulk load left them stale"""
+        if self.name_indexes_stale:
+            with self.name_index_lock:
+                if self.name_indexes_stale:
+                    name_index, names = NGramIndex(3), []
+                    for product in self.store:
+                        name = product.name.lower()
+                        name_index.add(product.product_id, name)
+                        names.append((name, product.product_id))
+                    self.name_index, self.name_prefixes = name_index, PrefixIndex(names)
+                    self.name_indexes_stale = False
+        return self.name_index, self.name_prefixes
+    
+    def _bump_version(self, category):
+        """Record a change to a product of category"""
+        self.version += 1
+        self.category_versions[category.casefold()] = self.version
+    
+    def category_version(self, category):
+        return self.category_versions.get(category.casefold(), 0)
+    
+    def _index_category(self, product_id, category):
+        """Add a product to the bucket of its category"""
+        key = category.casefold()
+        bucket = self.category_index.get(key)
+        if bucket is None:
+            self.category_index[key] = {product_id}
+        else:
+            bucket.add(product_id)
+    
+    def _unindex_category(self, product):
+        """Remove a product from the bucket of its category"""
+        key = product.category.casefold()
+        bucket = self.category_index[key]
+        bucket.discard(product.product_id)
+        if not bucket:
+            del self.category_index[key]
+    
+    def get(self, product_id):
+        return self.store.get(product_id)
+    
+    def snapshot(self, product_id):
+        return self.store.snapshot(product_id)
+    
+    def successor_id(self, product_id):
+        return self.store.successor_id(product_id)
+    
+    def set_quantity(self, product, new_quantity):
+        """Change a product's quantity and adjust the running aggregates"""
+        delta = new_quantity - product.quantity
+        self.store.set_quantity(product, new_quantity)  # First, so a rejected value leaves the totals alone
+        self.total_quantity += delta
+        self.total_value += product.price * delta
+        self._bump_version(product.category)
+    
+    def set_price(self, product, new_price):
+        """Change a product's price and adjust the running aggregates"""
+        delta = (new_price - product.price) * product.quantity
+        self.store.set_price(product, new_price)
+        self.total_value += delta
+        self._bump_version(product.category)
+    
+    def take_stock(self, product, quantity):
+        """Decrement a product's quantity if at least quantity is in stock"""
+        if product.quantity < quantity:
+            return False
+        self.set_quantity(product, product.quantity - quantity)
+        return True
+    
+    def page(self, after_id=None, limit=50):
+        return self.store.page(after_id, limit)
+    
+    def search_name(self, query):
+        """Return products whose lowercased name contains query, in ID order"""
+        if not self.name_index.is_searchable(query):
+            # Too short for a trigram: check every name, which is what the index would answer
+            return [product for product in self.store if query in product.name.lower()]
+        
+        # Postings are unordered; sort by ID to follow the list order
+        name_index = self._name_indexes()[0]
+        products = [self.store.snapshot(product_id)
+                    for product_id in sorted(name_index.candidates(query))]
+        if name_index.is_exact(query):
+            return products
+        return [product for product in products if query in product.name.lower()]
+    
+    def by_category(self, category):
+        bucket = self.category_index.get(category.casefold(), ())
+        return [self.store.snapshot(product_id) for product_id in sorted(bucket)]
+    
+    def autocomplete(self, prefix, limit=10):
+        name_prefixes = self._name_indexes()[1]
+        return [self.store.snapshot(product_id) for product_id in name_prefixes.starts_with(prefix, limit)]
+    
+    def statistics(self):
+        return {
+            "total_products": len(self.store),
+            "total_quantity": self.total_quantity,
+            "total_value": self.total_value,
+            "categories": len(self.category_index)
+        }
+    
+    def numeric_columns(self):
+        return self.store.numeric_columns()
+    
+    def __iter__(self):
+        return iter(self.store)
+    
+    def __len__(self):
+        return len(self.store)
+    
+    def __contains__(self, product_id):
+        return product_id in self.store
+
+
+SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL,
+    name_key TEXT NOT NULL,
+    category_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_by_category ON products (category_key, id);
+CREATE INDEX IF NOT EXISTS products_by_name ON products (name_key, id);
+
+-- Single row of counters, kept current by the triggers below (O(1) statistics)
+CREATE TABLE IF NOT EXISTS counters (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    next_id INTEGER NOT NULL,
+    products INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    value REAL NOT NULL
+);
+INSERT OR IGNORE INTO counters VALUES (1, 1, 0, 0, 0.0);
+
+-- Order IDs, shared so that an order ID names one order across all workers
+CREATE TABLE IF NOT EXISTS order_ids (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    next_id INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO order_ids VALUES (1, 1);
+
+CREATE TABLE IF NOT EXISTS categories (
+    key TEXT PRIMARY KEY,
+    products INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS products_inserted AFTER INSERT ON products BEGIN
+    UPDATE counters SET products = products + 1, quantity = quantity + NEW.quantity,
+                        value = value + NEW.price * NEW.quantity;
+    INSERT INTO categories VALUES (NEW.category_key, 1)
+        ON CONFLICT (key) DO UPDATE SET products = products + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS products_deleted AFTER DELETE ON products BEGIN
+    -- Reset the value when the table empties to drop accumulated rounding error
+    UPDATE counters SET products = products - 1, quantity = quantity - OLD.quantity,
+                        value = CASE WHEN products = 1 THEN 0.0
+                                     ELSE value - OLD.price * OLD.quantity END;
+    UPDATE categories SET products = products - 1 WHERE key = OLD.category_key;
+    DELETE FROM categories WHERE key = OLD.category_key AND products = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS products_updated AFTER UPDATE OF price, quantity ON products BEGIN
+    UPDATE counters SET quantity = quantity - OLD.quantity + NEW.quantity,
+                        value = value - OLD.price * OLD.quantity + NEW.price * NEW.quantity;
+END;
+
+-- Change counters for conditional GETs, shared by every worker. The epoch is
+-- random, so a recreated database never repeats an old (epoch, version).
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    epoch INTEGER NOT NULL,
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO versions VALUES (1, abs(random() % 4294967296), 0);
+
+-- Version of each category's last change; rows outlive their category
+CREATE TABLE IF NOT EXISTS category_versions (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS products_inserted_version AFTER INSERT ON products BEGIN
+    UPDATE versions SET version = version + 1;
+    INSERT INTO category_versions VALUES (NEW.category_key, (SELECT version FROM versions))
+        ON CONFLICT (key) DO UPDATE SET version = excluded.version;
+END;
+CREATE TRIGGER IF NOT EXISTS products_deleted_version AFTER DELETE ON products BEGIN
+    UPDATE versions SET version = version + 1;
+    INSERT INTO category_versions VALUES (OLD.category_key, (SELECT version FROM versions))
+        ON CONFLICT (key) DO UPDATE SET version = excluded.version;
+END;
+CREATE TRIGGER IF NOT EXISTS products_updated_version AFTER UPDATE OF price, quantity ON products BEGIN
+    UPDATE versions SET version = version + 1;
+    INSERT INTO category_versions VALUES (NEW.category_key, (SELECT version FROM versions))
+        ON CONFLICT (key) DO UPDATE SET version = excluded.version;
+END;
+COMMIT;
+"""
+
+PRODUCT_COLUMNS = "id, name, category, price, quantity"
+INSERT_PRODUCT = "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?)"
+SELECT_PRODUCT = f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = ?"
+DELETE_PRODUCT = "DELETE FROM products WHERE id = ?"
+UPDATE_QUANTITY = "UPDATE products SET quantity = ? WHERE id = ?"
+UPDATE_PRICE = "UPDATE products SET price = ? WHERE id = ?"
+TAKE_STOCK = "UPDATE products SET quantity = quantity - ? WHERE id = ? AND quantity >= ?"
+SELECT_QUANTITY = "SELECT quantity FROM products WHERE id = ?"
+SELECT_PAGE = f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id > ? ORDER BY id LIMIT ?"
+SELECT_BY_NAME = f"SELECT {PRODUCT_COLUMNS} FROM products WHERE instr(name_key, ?) > 0 ORDER BY id"
+SELECT_BY_CATEGORY = f"SELECT {PRODUCT_COLUMNS} FROM products WHERE category_key = ? ORDER BY id"
+SELECT_BY_PREFIX = (f"SELECT {PRODUCT_COLUMNS} FROM products WHERE name_key >= ? AND name_key < ? "
+                    f"ORDER BY name_key, id LIMIT ?")
+SELECT_COUNTERS = "SELECT products, quantity, value, (SELECT count(*) FROM categories) FROM counters"
+ALLOCATE_ID = "UPDATE counters SET next_id = next_id + 1"
+SELECT_NEXT_ID = "SELECT next_id FROM counters"
+SET_NEXT_ID = "UPDATE counters SET next_id = ?"
+ALLOCATE_ORDER_ID = "UPDATE order_ids SET next_id = next_id + 1"
+SELECT_NEXT_ORDER_ID = "SELECT next_id FROM order_ids"
+SET_NEXT_ORDER_ID = "UPDATE order_ids SET next_id = ?"
+RAISE_NEXT_ORDER_ID = "UPDATE order_ids SET next_id = max(next_id, ?)"
+RAISE_NEXT_ID = "UPDATE counters SET next_id = max(next_id, (SELECT coalesce(max(id), 0) + 1 FROM products))"
+SELECT_VERSION = "SELECT version FROM versions"
+SELECT_EPOCH = "SELECT epoch FROM versions"
+SELECT_CATEGORY_VERSION = "SELECT version FROM category_versions WHERE key = ?"
+
+# Sorts after any character, so [prefix, prefix + MAX_CHAR) is every string starting with prefix
+MAX_CHAR = chr(0x10FFFF)
+
+
+class ConnectionPool:
+    """Per-process pool of SQLite connections
+    
+    Connections are opened lazily, at most size of them, and each is used by
+    one thread at a time; a thread that already holds one (e.g. inside a
+    transaction) gets the same connection back. The pool starts over after
+    a fork, so a gunicorn worker never shares a connection with its parent.
+    """
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self.pid = None
+        self._reset()
+    
+    def _reset(self):
+        self.pid = os.getpid()
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+    
+    def _open(self):
+        # Autocommit mode: transactions are begun explicitly. Statements are
+        # compiled once per connection and reused from its statement cache.
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                     check_same_thread=False, cached_statements=64)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+    
+    @contextlib.contextmanager
+    def connection(self):
+        """Check out this thread's connection, opening or waiting for one if needed"""
+        if self.pid != os.getpid():
+            self._reset()
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            yield connection
+            return
+        
+        try:
+            connection = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            connection = self._open() if can_open else self.idle.get()
+        self.local.connection = connection
+        try:
+            yield connection
+        finally:
+            self.local.connection = None
+            self.idle.put(connection)
+    
+    def close(self):
+        """Close the idle connections"""
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SQLiteBackend:
+    """Products in a SQLite database shared by every process that opens it
+    
+    The database runs in WAL mode, so readers never block the writer, and
+    several gunicorn workers can serve the same inventory. Products are
+    indexed by ID (the primary key), case-folded category and lowercased
+    name; triggers keep product, quantity, value and category counters so
+    statistics() does not scan, and a version counter per inventory and per
+    category for conditional GETs. Stored products are returned as detached
+    Product snapshots.
+    """
+    def __init__(self, path, pool_size=4):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        # Per thread: the last order ID handed out in its current transaction
+        self.local = threading.local()
+        with self.pool.connection() as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+            # Fixed for the life of the database, so read it once
+            self.epoch = format(connection.execute(SELECT_EPOCH).fetchone()[0], "x")
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        """Run the calls inside as one write transaction, yielding its connection
+        
+        BEGIN IMMEDIATE takes the database write lock up front, so a
+        read-check-write sequence cannot interleave with another worker.
+        Nested transactions join the outer one. A failed transaction is
+        rolled back except for the order IDs it handed out: the orders
+        themselves live in process memory and are not rolled back, so their
+        IDs must not be handed out again.
+        """
+        with self.pool.connection() as connection:
+            if connection.in_transaction:
+                yield connection
+                return
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("SAVEPOINT body")
+            self.local.last_order_id = None
+            try:
+                yield connection
+            except BaseException:
+                self._roll_back(connection)
+                raise
+            connection.commit()
+    
+    def _roll_back(self, connection):
+        """Undo a failed transaction but keep its order IDs, holding the write lock throughout"""
+        try:
+            connection.execute("ROLLBACK TO body")
+            if self.local.last_order_id is not None:
+                connection.execute(RAISE_NEXT_ORDER_ID, (self.local.last_order_id + 1,))
+            connection.commit()
+        except sqlite3.Error:
+            connection.rollback()
+            raise
+    
+    def _query(self, sql, parameters=()):
+        with self.pool.connection() as connection:
+            return connection.execute(sql, parameters).fetchall()
+    
+    def _execute(self, sql, parameters=()):
+        with self.pool.connection() as connection:
+            connection.execute(sql, parameters)
+    
+    def allocate_id(self):
+        with self.transaction() as connection:
+            connection.execute(ALLOCATE_ID)
+            return connection.execute(SELECT_NEXT_ID).fetchone()[0] - 1
+    
+    @property
+    def next_id(self):
+        return self._query(SELECT_NEXT_ID)[0][0]
+    
+    @next_id.setter
+    def next_id(self, value):
+        self._execute(SET_NEXT_ID, (value,))
+    
+    def allocate_order_id(self):
+        with self.transaction() as connection:
+            connection.execute(ALLOCATE_ORDER_ID)
+            order_id = connection.execute(SELECT_NEXT_ORDER_ID).fetchone()[0] - 1
+            self.local.last_order_id = order_id
+            return order_id
+    
+    @property
+    def next_order_id(self):
+        return self._query(SELECT_NEXT_ORDER_ID)[0][0]
+    
+    @next_order_id.setter
+    def next_order_id(self, value):
+        self._execute(SET_NEXT_ORDER_ID, (value,))
+    
+    @property
+    def version(self):
+        return self._query(SELECT_VERSION)[0][0]
+    
+    def category_version(self, category):
+        rows = self._query(SELECT_CATEGORY_VERSION, (category.casefold(),))
+        return rows[0][0] if rows else 0
+    
+    def insert(self, product, successor_id=None):
+        """Insert a row for product; rows are ordered by ID, so successor_id is unused"""
+        self._execute(INSERT_PRODUCT, (product.product_id, product.name, product.category,
+                                       product.price, product.quantity,
+                                       product.name.lower(), product.category.casefold()))
+        return product
+    
+    def bulk_load(self, rows):
+        """Insert (id, name, category, price, quantity) rows in one transaction"""
+        with self.transaction() as connection:
+            connection.executemany(INSERT_PRODUCT, (
+                (product_id, name, category, price, quantity, name.lower(), category.casefold())
+                for product_id, name, category, price, quantity in rows))
+            connection.execute(RAISE_NEXT_ID)
+    
+    def delete(self, product_id):
+        with self.transaction() as connection:
+            product = Product(*connection.execute(SELECT_PRODUCT, (product_id,)).fetchone())
+            connection.execute(DELETE_PRODUCT, (product_id,))
+        return product
+    
+    def get(self, product_id):
+        rows = self._query(SELECT_PRODUCT, (product_id,))
+        return Product(*rows[0]) if rows else None
+    
+    def snapshot(self, product_id):
+        return self.get(product_id)
+    
+    def successor_id(self, product_id):
+        return None
+    
+    def set_quantity(self, product, new_quantity):
+        self._execute(UPDATE_QUANTITY, (new_quantity, product.product_id))
+        product.update_quantity(new_quantity)
+    
+    def set_price(self, product, new_price):
+        self._execute(UPDATE_PRICE, (new_price, product.product_id))
+        product.update_price(new_price)
+    
+    def take_stock(self, product, quantity):
+        """Check and decrement in one conditional UPDATE, so workers cannot oversell"""
+        with self.transaction() as connection:
+            if not connection.execute(TAKE_STOCK, (quantity, product.product_id, quantity)).rowcount:
+                return False
+            product.update_quantity(connection.execute(SELECT_QUANTITY, (product.product_id,)).fetchone()[0])
+        return True
+    
+    def page(self, after_id=None, limit=50):
+        """Return up to limit products with IDs greater than after_id, in ID order"""
+        rows = self._query(SELECT_PAGE, (after_id if after_id is not None else -1, limit + 1))
+        return [Product(*row) for row in rows[:limit]], len(rows) > limit
+    
+    def search_name(self, query):
+        if not query:
+            return list(self)
+        return [Product(*row) for row in self._query(SELECT_BY_NAME, (query,))]
+    
+    def by_category(self, category):
+        return [Product(*row) for row in self._query(SELECT_BY_CATEGORY, (category.casefold(),))]
+    
+    def autocomplete(self, prefix, limit=10):
+        rows = self._query(SELECT_BY_PREFIX, (prefix, prefix + MAX_CHAR, limit))
+        return [Product(*row) for row in rows]
+    
+    def statistics(self):
+        products, quantity, value, categories = self._query(SELECT_COUNTERS)[0]
+        return {
+            "total_products": products,
+            "total_quantity": quantity,
+            "total_value": value,
+            "categories": categories
+        }
+    
+    def numeric_columns(self):
+        """Copy the numeric fields into typed arrays (one pass over the table)"""
+        return product_columns(self)
+    
+    def close(self):
+        self.pool.close()
+    
+    def __iter__(self):
+        # Page through the table so no connection is held between batches
+        after_id = -1
+        while True:
+            products, has_more = self.page(after_id, 500)
+            yield from products
+            if not has_more:
+                return
+            after_id = products[-1].product_id
+    
+    def __len__(self):
+        return self._query(SELECT_COUNTERS)[0][0]
+    
+    def __contains__(self, product_id):
+        return bool(self._query("SELECT 1 FROM products WHERE id = ?", (product_id,)))
+
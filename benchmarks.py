@@ -0,0 +1,436 @@
+"""
+Benchmarks for the Product Inventory System
+
+Usage:
+    python benchmarks.py snapshot [--products N]
+    python benchmarks.py memory [--products N] [--engines-only]
+    python benchmarks.py analytics [--products N]
+    python benchmarks.py stress [--threads N] [--seconds S] [--store linked|columnar]
+    python benchmarks.py json [--products N] [--repeat N]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import analytics
+from binary_snapshot import MappedSnapshot, write_binary_snapshot
+from inventory_system import InventorySystem
+from json_cache import ProductJSONCache, encode_json, product_to_dict
+from persistence import Persistence, SNAPSHOT_FILES
+from product import Product
+from product_store import STORES
+
+
+CATEGORIES = ["Electronics", "Furniture", "Appliances", "Clothing", "Books", "Toys", "Garden", "Sports"]
+
+
+def make_rows(count, seed=42):
+    """Generate count (id, name, category, price, quantity) rows"""
+    rng = random.Random(seed)
+    return [[product_id, f"Product {product_id} {rng.choice(CATEGORIES)} Model {rng.randint(1, 999)}",
+             rng.choice(CATEGORIES), round(rng.uniform(1, 2000), 2), rng.randint(0, 500)]
+            for product_id in range(1, count + 1)]
+
+
+def timed(function):
+    """Run function once and return (seconds, result)"""
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def print_table(title, rows):
+    print(title)
+    print("-" * 60)
+    for label, value in rows:
+        print(f"{label:<44}{value}")
+    print()
+
+
+def bench_snapshot(args):
+    """Compare cold start from a JSON snapshot against the binary mmap snapshot"""
+    state = {"lsn": 0, "next_id": args.products + 1, "products": make_rows(args.products), "orders": []}
+    probe_ids = random.Random(1).sample(range(1, args.products + 1), min(100, args.products))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        json_dir = os.path.join(directory, "json")
+        binary_dir = os.path.join(directory, "binary")
+        os.makedirs(json_dir)
+        os.makedirs(binary_dir)
+        with open(os.path.join(json_dir, SNAPSHOT_FILES["json"]), "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        binary_path = os.path.join(binary_dir, SNAPSHOT_FILES["binary"])
+        write_binary_snapshot(binary_path, state)
+        del state
+        
+        def json_first_read():
+            with open(os.path.join(json_dir, SNAPSHOT_FILES["json"]), encoding="utf-8") as f:
+                rows = json.load(f)["products"]
+            by_id = {row[0]: row for row in rows}
+            return [by_id[product_id] for product_id in probe_ids]
+        
+        def binary_first_read():
+            snapshot = MappedSnapshot(binary_path)
+            products = [snapshot.find(product_id) for product_id in probe_ids]
+            snapshot.close()
+            return products
+        
+        def full_recovery(data_dir, engine="linked"):
+            persistence = Persistence(data_dir)
+            inventory = persistence.recover(InventorySystem(store=STORES[engine]()))
+            persistence.close()
+            return inventory
+        
+        json_read, _ = timed(json_first_read)
+        binary_read, _ = timed(binary_first_read)
+        json_full, _ = timed(lambda: full_recovery(json_dir))
+        binary_full, _ = timed(lambda: full_recovery(binary_dir))
+        mapped_full, inventory = timed(lambda: full_recovery(binary_dir, "mapped"))
+        mapped_read, _ = timed(lambda: [inventory.search_product(product_id) for product_id in probe_ids])
+        del inventory
+        json_size = os.path.getsize(os.path.join(json_dir, SNAPSHOT_FILES["json"]))
+        binary_size = os.path.getsize(binary_path)
+    
+    print_table(f"Snapshot cold start, {args.products:,} products", [
+        ("JSON snapshot size", f"{json_size / 1e6:.1f} MB"),
+        ("Binary snapshot size", f"{binary_size / 1e6:.1f} MB"),
+        ("First 100 reads, JSON (parse + index)", f"{json_read * 1000:.1f} ms"),
+        ("First 100 reads, binary (mmap + lazy)", f"{binary_read * 1000:.1f} ms"),
+        ("Full InventorySystem recovery, JSON", f"{json_full * 1000:.1f} ms"),
+        ("Full InventorySystem recovery, binary", f"{binary_full * 1000:.1f} ms"),
+        ("Recovery, binary on the 'mapped' store", f"{mapped_full * 1000:.1f} ms"),
+        ("First 100 reads after it", f"{mapped_read * 1000:.1f} ms"),
+    ])
+
+
+def measure_memory(build):
+    """Return the bytes still allocated by the object build() returns"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return used
+
+
+class OriginalProduct:
+    """Product as the original InventorySystem stored it: a plain class with a __dict__"""
+    def __init__(self, product_id, name, category, price, quantity):
+        self.product_id = product_id
+        self.name = name
+        self.category = category
+        self.price = price
+        self.quantity = quantity
+
+
+class OriginalNode:
+    """The original singly linked list node, also with a __dict__"""
+    def __init__(self, data):
+        self.data = data
+        self.next = None
+
+
+def bench_memory(args):
+    """Compare per-SKU memory against the original InventorySystem
+    
+    The original kept each product as a plain object in a linked list node
+    and in product_array; it had no indexes. The storage engines alone are
+    measured, and (unless --engines-only) whole InventorySystem instances,
+    whose name indexes and totals cost the same on either engine.
+    """
+    count = args.products
+    rng = random.Random(42)
+    prices = [round(rng.uniform(1, 2000), 2) for _ in range(1000)]
+    
+    def fields(product_id):
+        # Fresh strings per product, as a request or snapshot load would create
+        return (product_id, f"Product {product_id} Model {product_id % 997}",
+                CATEGORIES[product_id % len(CATEGORIES)], prices[product_id % 1000], product_id % 500)
+    
+    def build_original():
+        head = tail = None
+        product_array = []
+        for product_id in range(1, count + 1):
+            product = OriginalProduct(*fields(product_id))
+            node = OriginalNode(product)
+            if tail is None:
+                head = node
+            else:
+                tail.next = node
+            tail = node
+            product_array.append(product)
+        return head, product_array
+    
+    def build_store(store_class):
+        store = store_class()
+        for product_id in range(1, count + 1):
+            store.insert(Product(*fields(product_id)))
+        return store
+    
+    def build_inventory(store_class):
+        inventory = InventorySystem(store=store_class())
+        for product_id in range(1, count + 1):
+            inventory.apply_journal_record(["add", *fields(product_id), None])
+        return inventory
+    
+    def per_sku(used):
+        return f"{used / count:.0f} bytes/SKU ({used / 1e6:.0f} MB)"
+    
+    original = measure_memory(build_original)
+    rows = [("Original: Product + Node + product_array", per_sku(original))]
+    engines = {}
+    for engine in ("linked", "columnar"):
+        engines[engine] = measure_memory(lambda: build_store(STORES[engine]))
+        rows.append((f"Storage engine '{engine}'", per_sku(engines[engine])))
+    rows.append(("Reduction vs original, columnar engine", f"{original / engines['columnar']:.1f}x"))
+    if not args.engines_only:
+        systems = {}
+        for engine in ("linked", "columnar"):
+            systems[engine] = measure_memory(lambda: build_inventory(STORES[engine]))
+            rows.append((f"InventorySystem incl. indexes, '{engine}'", per_sku(systems[engine])))
+        reduction = original / systems["columnar"]
+        rows.append(("Reduction vs original, InventorySystem", f"{reduction:.1f}x"))
+        rows.append(("5x target, InventorySystem", "met" if reduction >= 5 else "not met"))
+    
+    print_table(f"Memory footprint, {count:,} products", rows)
+
+
+def results_match(expected, actual):
+    """Compare analytics results, allowing float rounding differences"""
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(results_match(expected[k], actual[k]) for k in expected)
+    if isinstance(expected, float) or isinstance(actual, float):
+        return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-6)
+    return expected == actual
+
+
+def bench_analytics(args):
+    """Time vectorized analytics against the pure-Python reference on both engines"""
+    if analytics.np is None:
+        raise SystemExit("NumPy is not installed")
+    
+    rows = []
+    for engine in ("linked", "columnar"):
+        inventory = InventorySystem(store=STORES[engine]())
+        for row in make_rows(args.products):
+            inventory.apply_journal_record(["add"] + row + [None])
+        inventory.analytics()  # Warm up, so NumPy's first-call setup is not timed
+        reference_time, expected = timed(lambda: analytics.compute_reference(inventory.backend))
+        vectorized_time, actual = timed(inventory.analytics)
+        if not results_match(expected, actual):
+            raise SystemExit(f"Vectorized analytics differ from the reference on '{engine}'")
+        rows.append((f"Reference (pure Python), '{engine}'", f"{reference_time * 1000:.1f} ms"))
+        rows.append((f"Vectorized (NumPy), '{engine}'", f"{vectorized_time * 1000:.1f} ms"))
+    
+    print_table(f"Analytics, {args.products:,} products (results match)", rows)
+
+
+def check_invariants(inventory, initial_stock, shipped):
+    """Raise AssertionError if the inventory is inconsistent after a stress run"""
+    inventory.verify_statistics()
+    ids = [product.product_id for product in inventory.iter_products()]
+    assert ids == sorted(set(ids)), "Products out of ID order or duplicated"
+    assert len(ids) == len(inventory.backend), "Product count differs from iteration"
+    store = getattr(inventory.backend, "store", None)
+    if hasattr(store, "product_list"):
+        # Walk the linked list backwards too, to catch broken prev pointers
+        backwards = []
+        node = store.product_list.tail
+        while node is not None:
+            backwards.append(node.data.product_id)
+            node = node.prev
+        assert backwards == ids[::-1], "Linked list prev pointers are inconsistent"
+        assert len(store.product_index) == len(store.product_array) == len(ids), "Store indexes disagree"
+    assert inventory.total_reserved == sum(order["quantity"] for order in inventory.display_pending_orders()), \
+        "Reservations do not match pending orders"
+    for product_id, stock in initial_stock.items():
+        quantity = inventory.search_product(product_id).quantity
+        assert quantity >= 0, f"Product {product_id} oversold"
+        assert stock - quantity == shipped.get(product_id, 0), f"Product {product_id} stock does not add up"
+
+
+def run_stress(store, threads, seconds):
+    """Hammer one InventorySystem from many threads, then check its invariants
+    
+    Returns (inventory, counts, shipped, elapsed); raises the first error a
+    thread hit, or AssertionError if an invariant does not hold.
+    """
+    inventory = InventorySystem(store=STORES[store]())
+    hot_ids = [inventory.add_product(f"Hot item {i}", CATEGORIES[i % len(CATEGORIES)], 10.0, 1000).product_id
+               for i in range(8)]
+    initial_stock = {product_id: 1000 for product_id in hot_ids}
+    
+    # Switch threads very often so that any unsynchronized section interleaves
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    stop = threading.Event()
+    lock = threading.Lock()
+    shipped = {}
+    counts = {"reads": 0, "writes": 0, "orders": 0}
+    errors = []
+    
+    def worker(seed):
+        rng = random.Random(seed)
+        local_shipped = {}
+        reads = writes = orders = 0
+        own_ids = []
+        own_orders = []
+        try:
+            while not stop.is_set():
+                action = rng.random()
+                if action < 0.2:
+                    order = inventory.add_order(rng.choice(hot_ids), rng.randint(1, 5))
+                    if order:
+                        own_orders.append(order["order_id"])
+                        orders += 1
+                elif action < 0.25 and own_orders:
+                    inventory.cancel_order(own_orders.pop(rng.randrange(len(own_orders))))
+                elif action < 0.4:
+                    order = inventory.process_order()
+                    if order:
+                        local_shipped[order["product_id"]] = local_shipped.get(order["product_id"], 0) + order["quantity"]
+                elif action < 0.5:
+                    own_ids.append(inventory.add_product(f"Item {seed} {writes}", rng.choice(CATEGORIES),
+                                                         1.0, rng.randint(0, 9)).product_id)
+                elif action < 0.6 and own_ids:
+                    inventory.remove_product(own_ids.pop(rng.randrange(len(own_ids))))
+                elif action < 0.65:
+                    inventory.update_product_price(rng.choice(hot_ids), round(rng.uniform(1, 20), 2))
+                else:
+                    inventory.search_by_name("item")
+                    inventory.get_statistics()
+                    inventory.page_products(rng.randint(0, 100), 20)
+                    inventory.autocomplete("hot", 5)
+                    reads += 4
+                    continue
+                writes += 1
+        except Exception as e:
+            errors.append(e)
+        with lock:
+            for product_id, quantity in local_shipped.items():
+                shipped[product_id] = shipped.get(product_id, 0) + quantity
+            counts["reads"] += reads
+            counts["writes"] += writes
+            counts["orders"] += orders
+    
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    sys.setswitchinterval(switch_interval)
+    if errors:
+        raise errors[0]
+    
+    # Drain what is left so every accepted order is either shipped or rejected
+    while inventory.pending_orders:
+        order = inventory.process_order()
+        if order:
+            shipped[order["product_id"]] = shipped.get(order["product_id"], 0) + order["quantity"]
+    check_invariants(inventory, initial_stock, shipped)
+    return inventory, counts, shipped, elapsed
+
+
+def bench_stress(args):
+    """Multi-threaded stress run; fails if an invariant breaks"""
+    inventory, counts, shipped, elapsed = run_stress(args.store, args.threads, args.seconds)
+    print_table(f"Stress, {args.threads} threads for {args.seconds}s on '{args.store}' (invariants hold)", [
+        ("Read calls", f"{counts['reads']:,} ({counts['reads'] / elapsed:,.0f}/s)"),
+        ("Write calls", f"{counts['writes']:,} ({counts['writes'] / elapsed:,.0f}/s)"),
+        ("Orders accepted", f"{counts['orders']:,}"),
+        ("Units shipped", f"{sum(shipped.values()):,}"),
+        ("Products at end", f"{len(inventory.backend):,}"),
+    ])
+
+
+def bench_json(args):
+    """Time serializing the full product listing with and without the per-product JSON cache"""
+    inventory = InventorySystem()
+    for row in make_rows(args.products):
+        inventory.apply_journal_record(["add"] + row + [None])
+    cache = ProductJSONCache()
+    inventory.change_listeners.append(cache.invalidate)
+    
+    def uncached():
+        # What GET /api/products did before: a dict per product, then jsonify
+        return encode_json({"success": True, "products": [product_to_dict(p) for p in inventory.iter_products()]})
+    
+    def cached():
+        return cache.encode_response(inventory.iter_products())
+    
+    def best(function):
+        return min(timed(function)[0] for _ in range(args.repeat))
+    
+    uncached_time = best(uncached)
+    cold_time, document = timed(cached)
+    if json.loads(document) != json.loads(uncached()):
+        raise SystemExit("Cached listing differs from the uncached one")
+    warm_time = best(cached)
+    
+    # Touch 1% of the products, as between two polls of a busy inventory
+    rng = random.Random(7)
+    changed = rng.sample(range(1, args.products + 1), max(1, args.products // 100))
+    for product_id in changed:
+        inventory.update_product_quantity(product_id, rng.randint(0, 500))
+    churn_time = timed(cached)[0]
+    
+    def rate(seconds):
+        return f"{seconds * 1000:8.1f} ms  {args.products / seconds:>12,.0f} products/s"
+    
+    print_table(f"Product listing serialization, {args.products:,} products (documents match)", [
+        ("Uncached (dict per product + json.dumps)", rate(uncached_time)),
+        ("Cache, cold (encode and store fragments)", rate(cold_time)),
+        ("Cache, warm (join cached fragments)", rate(warm_time)),
+        (f"Cache, after {len(changed):,} products changed", rate(churn_time)),
+        ("Speedup, warm vs uncached", f"{uncached_time / warm_time:.1f}x"),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Product Inventory System benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    
+    snapshot = subparsers.add_parser("snapshot", help="JSON vs binary snapshot cold start")
+    snapshot.add_argument("--products", type=int, default=200000)
+    snapshot.set_defaults(run=bench_snapshot)
+    
+    memory = subparsers.add_parser("memory", help="Per-SKU memory against the original InventorySystem")
+    memory.add_argument("--products", type=int, default=1000000)
+    memory.add_argument("--engines-only", action="store_true",
+                        help="skip the (slow) whole InventorySystem measurements")
+    memory.set_defaults(run=bench_memory)
+    
+    analytics_parser = subparsers.add_parser("analytics", help="Vectorized vs reference analytics")
+    analytics_parser.add_argument("--products", type=int, default=200000)
+    analytics_parser.set_defaults(run=bench_analytics)
+    
+    stress = subparsers.add_parser("stress", help="Multi-threaded stress run with invariant checks")
+    stress.add_argument("--threads", type=int, default=8)
+    stress.add_argument("--seconds", type=float, default=3.0)
+    stress.add_argument("--store", choices=sorted(STORES), default="linked")
+    stress.set_defaults(run=bench_stress)
+    
+    json_parser = subparsers.add_parser("json", help="Product listing serialization with and without the JSON cache")
+    json_parser.add_argument("--products", type=int, default=100000)
+    json_parser.add_argument("--repeat", type=int, default=5)
+    json_parser.set_defaults(run=bench_json)
+    
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
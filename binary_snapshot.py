@@ -0,0 +1,220 @@
+"""
+Binary Snapshot Format for the Product Inventory System
+Fixed-width record table plus a string heap, read through mmap
+
+Layout (little-endian):
+    header   magic, version, record count, next_id, LSN, heap size, orders size,
+             next_order_id (version 2; version 1 files have no next_order_id)
+    records  one fixed-width record per product, sorted by product ID:
+             id, price, quantity, name offset/length, category offset/length
+    heap     UTF-8 strings; repeated strings (e.g. categories) are stored once
+    orders   pending orders as a JSON array
+
+Usage:
+    python binary_snapshot.py to-json SNAPSHOT.bin OUTPUT.json
+    python binary_snapshot.py from-json SNAPSHOT.json OUTPUT.bin
+    python binary_snapshot.py info SNAPSHOT.bin
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+from product import Product
+
+
+MAGIC = b"INVSNAP1"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQQQQQQ")
+HEADER_V1 = struct.Struct("<8sIIQQQQQ")
+RECORD = struct.Struct("<qdqIIII")
+
+
+def write_binary_snapshot(path, state):
+    """Write a snapshot state dict (as produced by Persistence) to path atomically"""
+    heap = bytearray()
+    offsets = {}
+    
+    def intern(text):
+        """Store text in the heap once and return its (offset, length)"""
+        if text not in offsets:
+            data = text.encode("utf-8")
+            offsets[text] = (len(heap), len(data))
+            heap.extend(data)
+        return offsets[text]
+    
+    products = sorted(state["products"], key=lambda row: row[0])
+    records = bytearray(RECORD.size * len(products))
+    for i, (product_id, name, category, price, quantity) in enumerate(products):
+        name_offset, name_length = intern(name)
+        category_offset, category_length = intern(category)
+        RECORD.pack_into(records, i * RECORD.size, product_id, price, quantity,
+                         name_offset, name_length, category_offset, category_length)
+    orders = json.dumps(state["orders"], separators=(",", ":")).encode("utf-8")
+    
+    header = HEADER.pack(MAGIC, VERSION, 0, len(products), state["next_id"],
+                         state["lsn"], len(heap), len(orders), state.get("next_order_id", 1))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(records)
+        f.write(heap)
+        f.write(orders)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MappedSnapshot:
+    """Read-only view of a binary snapshot backed by mmap
+    
+    Opening only maps the file and parses the header, so it costs the same
+    for any catalog size. Records are decoded on access: find() binary
+    searches the ID-sorted table and builds a single Product. The mapping
+    stays valid after the file is replaced by a newer snapshot, and is
+    released by close() or when the object is garbage collected.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from("<8sI", self.buffer, 0)
+        if magic != MAGIC or version not in (1, VERSION):
+            self.close()
+            raise ValueError(f"{path} is not a version 1 or {VERSION} inventory snapshot")
+        if version == 1:
+            # Order IDs were not stored yet; recovery falls back to the pending orders
+            (_, _, _, self.count, self.next_id, self.lsn,
+             heap_size, orders_size) = HEADER_V1.unpack_from(self.buffer, 0)
+            self.next_order_id = 1
+            self.records_offset = HEADER_V1.size
+        else:
+            (_, _, _, self.count, self.next_id, self.lsn,
+             heap_size, orders_size, self.next_order_id) = HEADER.unpack_from(self.buffer, 0)
+            self.records_offset = HEADER.size
+        self.heap_offset = self.records_offset + self.count * RECORD.size
+        self.orders_offset = self.heap_offset + heap_size
+        self.orders_size = orders_size
+    
+    def _string(self, offset, length):
+        start = self.heap_offset + offset
+        return self.buffer[start:start + length].decode("utf-8")
+    
+    def record(self, index):
+        """Return (id, name, category, price, quantity) for the record at index"""
+        if index < 0 or index >= self.count:
+            raise IndexError("Record index out of range")
+        (product_id, price, quantity, name_offset, name_length,
+         category_offset, category_length) = RECORD.unpack_from(self.buffer,
+                                                                 self.records_offset + index * RECORD.size)
+        return (product_id, self._string(name_offset, name_length),
+                self._string(category_offset, category_length), price, quantity)
+    
+    def id_at(self, index):
+        return struct.unpack_from("<q", self.buffer, self.records_offset + index * RECORD.size)[0]
+    
+    def lower_bound(self, product_id):
+        """Return the index of the first record with an ID >= product_id"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.id_at(middle) < product_id:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def index(self, product_id):
+        """Return the index of the record with product_id, or -1, in O(log n)"""
+        index = self.lower_bound(product_id)
+        if index < self.count and self.id_at(index) == product_id:
+            return index
+        return -1
+    
+    def find(self, product_id):
+        """Return the Product with product_id, or None, in O(log n)"""
+        index = self.index(product_id)
+        return Product(*self.record(index)) if index >= 0 else None
+    
+    def _records(self):
+        """Iterate over the raw record tuples in one pass"""
+        return struct.iter_unpack(RECORD.format, self.buffer[self.records_offset:self.heap_offset])
+    
+    def scan(self):
+        """Yield (id, category, price, quantity) for every record, in ID order
+        
+        Names are not decoded, and each distinct category only once, so this
+        is much cheaper than iterating over full records.
+        """
+        categories = {}
+        for product_id, price, quantity, _, _, category_offset, category_length in self._records():
+            category = categories.get(category_offset)
+            if category is None:
+                category = categories[category_offset] = self._string(category_offset, category_length)
+            yield product_id, category, price, quantity
+    
+    def orders(self):
+        """Return the pending orders stored in the snapshot"""
+        start = self.orders_offset
+        return json.loads(self.buffer[start:start + self.orders_size].decode("utf-8"))
+    
+    def __iter__(self):
+        """Yield (id, name, category, price, quantity) for every record, in ID order"""
+        string = self._string
+        categories = {}
+        for (product_id, price, quantity, name_offset, name_length,
+             category_offset, category_length) in self._records():
+            category = categories.get(category_offset)
+            if category is None:
+                category = categories[category_offset] = string(category_offset, category_length)
+            yield product_id, string(name_offset, name_length), category, price, quantity
+    
+    def __len__(self):
+        return self.count
+    
+    def to_state(self):
+        """Return the snapshot as a state dict (the JSON snapshot layout)"""
+        return {
+            "lsn": self.lsn,
+            "next_id": self.next_id,
+            "next_order_id": self.next_order_id,
+            "products": [list(row) for row in self],
+            "orders": self.orders()
+        }
+    
+    def close(self):
+        self.buffer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv):
+    """Command-line converter between JSON and binary snapshots"""
+    if len(argv) == 3 and argv[0] == "to-json":
+        with MappedSnapshot(argv[1]) as snapshot:
+            state = snapshot.to_state()
+        with open(argv[2], "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+    elif len(argv) == 3 and argv[0] == "from-json":
+        with open(argv[1], encoding="utf-8") as f:
+            write_binary_snapshot(argv[2], json.load(f))
+    elif len(argv) == 2 and argv[0] == "info":
+        with MappedSnapshot(argv[1]) as snapshot:
+            print(f"Products: {len(snapshot)}")
+            print(f"Next ID: {snapshot.next_id}")
+            print(f"Next order ID: {snapshot.next_order_id}")
+            print(f"LSN: {snapshot.lsn}")
+            print(f"Pending orders: {len(snapshot.orders())}")
+    else:
+        print("Usage:" + __doc__.split("Usage:")[1].rstrip())
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,20 +1,33 @@
 """
 Data Structures Implementation
-Linked List, Stack, and Queue implementations for the Product Inventory System
+Linked List, Stack, Queue and search index implementations for the Product Inventory System
 """
 
+import bisect
+import heapq
+import itertools
+from array import array
+
 
 class Node:
     """Node class for Linked List implementation"""
+    __slots__ = ("data", "next", "prev")
+    
     def __init__(self, data):
         self.data = data
         self.next = None
+        self.prev = None
 
 
 class LinkedList:
-    """Singly Linked List implementation"""
+    """Doubly Linked List implementation with a tail pointer
+    
+    Insertion methods return the new node, which callers may keep as a
+    handle for O(1) removal with unlink().
+    """
     def __init__(self):
         self.head = None
+        self.tail = None
         self.size = 0
     
     def is_empty(self):
@@ -27,51 +40,69 @@ class LinkedList:
         if self.is_empty():
             self.head = new_node
         else:
-            current = self.head
-            while current.next is not None:
-                current = current.next
-            current.next = new_node
+            new_node.prev = self.tail
+            self.tail.next = new_node
+        self.tail = new_node
         self.size += 1
+        return new_node
     
     def prepend(self, data):
         """Add an element to the beginning of the linked list"""
         new_node = Node(data)
-        new_node.next = self.head
+        if self.is_empty():
+            self.tail = new_node
+        else:
+            new_node.next = self.head
+            self.head.prev = new_node
         self.head = new_node
         self.size += 1
+        return new_node
+    
+    def insert_before(self, node, data):
+        """Insert an element directly before the given node"""
+        if node is self.head:
+            return self.prepend(data)
+        
+        new_node = Node(data)
+        new_node.prev = node.prev
+        new_node.next = node
+        node.prev.next = new_node
+        node.prev = new_node
+        self.size += 1
+        return new_node
     
     def insert_at(self, index, data):
         """Insert an element at a specific index"""
         if index < 0 or index > self.size:
             raise IndexError("Index out of range")
         
-        if index == 0:
-            self.prepend(data)
-            return
+        if index == self.size:
+            return self.append(data)
+        return self.insert_before(self._node_at(index), data)
+    
+    def unlink(self, node):
+        """Remove the given node from the list in O(1) and return its data"""
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
         
-        new_node = Node(data)
-        current = self.head
-        for _ in range(index - 1):
-            current = current.next
-        new_node.next = current.next
-        current.next = new_node
-        self.size += 1
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        
+        node.prev = None
+        node.next = None
+        self.size -= 1
+        return node.data
     
     def delete(self, data):
         """Delete the first occurrence of data"""
-        if self.is_empty():
-            return False
-        
-        if self.head.data == data:
-            self.head = self.head.next
-            self.size -= 1
-            return True
-        
         current = self.head
-        while current.next is not None:
-            if current.next.data == data:
-                current.next = current.next.next
-                self.size -= 1
+        while current is not None:
+            if current.data == data:
+                self.unlink(current)
                 return True
             current = current.next
         
@@ -88,24 +119,34 @@ class LinkedList:
             index += 1
         return -1
     
+    def _node_at(self, index):
+        """Walk to the node at index, starting from the nearer end"""
+        if index < self.size // 2:
+            current = self.head
+            for _ in range(index):
+                current = current.next
+        else:
+            current = self.tail
+            for _ in range(self.size - 1 - index):
+                current = current.prev
+        return current
+    
     def get(self, index):
         """Get element at a specific index"""
         if index < 0 or index >= self.size:
             raise IndexError("Index out of range")
         
-        current = self.head
-        for _ in range(index):
-            current = current.next
-        return current.data
+        return self._node_at(index).data
     
     def display(self):
         """Display all elements in the linked list"""
-        elements = []
+        return [str(data) for data in self]
+    
+    def __iter__(self):
         current = self.head
         while current is not None:
-            elements.append(str(current.data))
+            yield current.data
             current = current.next
-        return elements
     
     def __len__(self):
         return self.size
@@ -154,56 +195,451 @@ class Stack:
         return len(self.items)
 
 
+class BoundedStack:
+    """Stack with a fixed capacity, on a ring buffer
+    
+    push and pop are O(1). Once the stack is full, each push overwrites the
+    oldest (bottom) element, so memory stays bounded. recent(k) reads the
+    top k elements in O(k) without changing the stack.
+    
+    With a weight function, capacity budgets the total weight of the
+    elements instead of their number (weights are positive integers): a
+    push drops bottom elements until the total fits, and an element heavier
+    than the whole budget empties the stack and is not kept.
+    """
+    def __init__(self, capacity, weight=None):
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.weight = weight
+        self.items = [None] * capacity
+        self.weights = [0] * capacity
+        self.top = 0  # slot the next push writes to
+        self.count = 0
+        self.total_weight = 0
+    
+    def is_empty(self):
+        """Check if the stack is empty"""
+        return self.count == 0
+    
+    def push(self, item):
+        """Add an element to the top, dropping bottom elements to stay within capacity"""
+        weight = self.weight(item) if self.weight is not None else 1
+        if weight > self.capacity:
+            self.clear()
+            return
+        while self.count and self.total_weight + weight > self.capacity:
+            # Drop the bottom element
+            bottom = (self.top - self.count) % self.capacity
+            self.total_weight -= self.weights[bottom]
+            self.items[bottom] = None
+            self.count -= 1
+        self.items[self.top] = item
+        self.weights[self.top] = weight
+        self.top = (self.top + 1) % self.capacity
+        self.count += 1
+        self.total_weight += weight
+    
+    def pop(self):
+        """Remove and return the top element from the stack"""
+        if self.is_empty():
+            raise IndexError("Stack is empty")
+        self.top = (self.top - 1) % self.capacity
+        item = self.items[self.top]
+        self.items[self.top] = None
+        self.total_weight -= self.weights[self.top]
+        self.count -= 1
+        return item
+    
+    def peek(self):
+        """Return the top element without removing it"""
+        if self.is_empty():
+            raise IndexError("Stack is empty")
+        return self.items[(self.top - 1) % self.capacity]
+    
+    def clear(self):
+        """Remove all elements"""
+        self.items = [None] * self.capacity
+        self.weights = [0] * self.capacity
+        self.top = 0
+        self.count = 0
+        self.total_weight = 0
+    
+    def recent(self, k):
+        """Return up to k elements from the top down, without removing them"""
+        return [self.items[(self.top - 1 - i) % self.capacity] for i in range(min(k, self.count))]
+    
+    def size(self):
+        """Return the size of the stack"""
+        return self.count
+    
+    def display(self):
+        """Display all elements in the stack, bottom first"""
+        return self.recent(self.count)[::-1]
+    
+    def __str__(self):
+        return str(self.display())
+    
+    def __len__(self):
+        return self.count
+
+
 class Queue:
-    """Queue implementation using a list"""
-    def __init__(self):
-        self.items = []
+    """Queue implementation using a growable ring buffer
+    
+    enqueue and dequeue are O(1). When a capacity is given the queue is
+    bounded and enqueue raises IndexError once it is full.
+    """
+    def __init__(self, capacity=None):
+        if capacity is not None and capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self.items = [None] * (min(capacity, 8) if capacity else 8)
+        self.head = 0
+        self.count = 0
     
     def is_empty(self):
         """Check if the queue is empty"""
-        return len(self.items) == 0
+        return self.count == 0
+    
+    def is_full(self):
+        """Check if a bounded queue has reached its capacity"""
+        return self.capacity is not None and self.count >= self.capacity
+    
+    def _grow(self):
+        """Double the ring buffer, unwrapping it so the front is at index 0"""
+        new_size = len(self.items) * 2
+        if self.capacity is not None:
+            new_size = min(new_size, self.capacity)
+        self.items = self.display() + [None] * (new_size - self.count)
+        self.head = 0
     
     def enqueue(self, item):
         """Add an element to the rear of the queue"""
-        self.items.append(item)
+        if self.is_full():
+            raise IndexError("Queue is full")
+        if self.count == len(self.items):
+            self._grow()
+        self.items[(self.head + self.count) % len(self.items)] = item
+        self.count += 1
     
     def dequeue(self):
         """Remove and return the front element from the queue"""
         if self.is_empty():
             raise IndexError("Queue is empty")
-        return self.items.pop(0)
+        item = self.items[self.head]
+        self.items[self.head] = None
+        self.head = (self.head + 1) % len(self.items)
+        self.count -= 1
+        return item
     
     def front(self):
         """Return the front element without removing it"""
         if self.is_empty():
             raise IndexError("Queue is empty")
-        return self.items[0]
+        return self.items[self.head]
     
     def rear(self):
         """Return the rear element without removing it"""
         if self.is_empty():
             raise IndexError("Queue is empty")
-        return self.items[-1]
+        return self.items[(self.head + self.count - 1) % len(self.items)]
     
     def size(self):
         """Return the size of the queue"""
-        return len(self.items)
+        return self.count
     
     def display(self):
         """Display all elements in the queue"""
-        return self.items.copy()
+        end = self.head + self.count
+        if end <= len(self.items):
+            return self.items[self.head:end]
+        return self.items[self.head:] + self.items[:end - len(self.items)]
+    
+    def page(self, offset=0, limit=None):
+        """Return up to limit elements starting offset places from the front, without dequeuing (O(limit))"""
+        start = min(offset, self.count)
+        stop = self.count if limit is None else min(self.count, start + limit)
+        size = len(self.items)
+        return [self.items[(self.head + i) % size] for i in range(start, stop)]
+    
+    def __iter__(self):
+        """Iterate from the front without dequeuing; the queue must not change meanwhile"""
+        size = len(self.items)
+        for i in range(self.count):
+            yield self.items[(self.head + i) % size]
+    
+    def remove_where(self, predicate):
+        """Remove the elements matching predicate (O(n)) and return them; the rest keep their order"""
+        kept = []
+        removed = []
+        for item in self.display():
+            (removed if predicate(item) else kept).append(item)
+        if removed:
+            self.items = kept + [None] * (len(self.items) - len(kept))
+            self.head = 0
+            self.count = len(kept)
+        return removed
     
     def __str__(self):
-        return str(self.items)
+        return str(self.display())
     
     def __len__(self):
-        return len(self.items)
-
+        return self.count
 
 
+class PriorityQueue:
+    """Priority queue on a binary heap, with the same interface as Queue
+    
+    key(item) gives each item's sort key; the smallest key is dequeued
+    first, and items with equal keys leave in the order they arrived.
+    enqueue and dequeue are O(log n). When a capacity is given the queue is
+    bounded and enqueue raises IndexError once it is full.
+    """
+    def __init__(self, key, capacity=None):
+        if capacity is not None and capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.key = key
+        self.capacity = capacity
+        self.heap = []  # (key, arrival number, item) entries
+        self.arrivals = 0
+    
+    def is_empty(self):
+        """Check if the queue is empty"""
+        return not self.heap
+    
+    def is_full(self):
+        """Check if a bounded queue has reached its capacity"""
+        return self.capacity is not None and len(self.heap) >= self.capacity
+    
+    def enqueue(self, item):
+        """Add an element in priority order"""
+        if self.is_full():
+            raise IndexError("Queue is full")
+        # The arrival number breaks ties FIFO and keeps items from being compared
+        heapq.heappush(self.heap, (self.key(item), self.arrivals, item))
+        self.arrivals += 1
+    
+    def dequeue(self):
+        """Remove and return the element with the smallest key"""
+        if self.is_empty():
+            raise IndexError("Queue is empty")
+        return heapq.heappop(self.heap)[2]
+    
+    def front(self):
+        """Return the next element to be dequeued without removing it"""
+        if self.is_empty():
+            raise IndexError("Queue is empty")
+        return self.heap[0][2]
+    
+    def rear(self):
+        """Return the element that would be dequeued last (O(n))"""
+        if self.is_empty():
+            raise IndexError("Queue is empty")
+        return max(self.heap)[2]
+    
+    def size(self):
+        """Return the size of the queue"""
+        return len(self.heap)
+    
+    def display(self):
+        """Return all elements in dequeue order, leaving the heap untouched"""
+        return [entry[2] for entry in sorted(self.heap)]
+    
+    def page(self, offset=0, limit=None):
+        """Return up to limit elements starting offset places into dequeue order, leaving the heap untouched
+        
+        Walks the heap best-first (see __iter__), so a page costs
+        O((offset + limit) log(offset + limit)) instead of sorting the whole
+        queue.
+        """
+        return list(itertools.islice(self, offset, None if limit is None else offset + limit))
+    
+    def __iter__(self):
+        """Iterate in dequeue order without dequeuing; the queue must not change meanwhile
+        
+        Walks the heap best-first from the root with a small frontier heap,
+        so the first k elements cost O(k log k).
+        """
+        heap = self.heap
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, index = heapq.heappop(frontier)
+            yield entry[2]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+    
+    def remove_where(self, predicate):
+        """Remove the elements matching predicate (O(n)) and return them"""
+        kept = []
+        removed = []
+        for entry in self.heap:
+            (removed if predicate(entry[2]) else kept).append(entry)
+        if removed:
+            # Arrival numbers are kept, so the remaining order does not change
+            heapq.heapify(kept)
+            self.heap = kept
+        return [entry[2] for entry in sorted(removed)]
+    
+    def __str__(self):
+        return str(self.display())
+    
+    def __len__(self):
+        return len(self.heap)
 
 
+class NGramIndex:
+    """Inverted index from character n-grams to integer keys for substring search
+    
+    Only grams of exactly n characters are indexed, and each posting list is
+    a sorted array('q') of keys, so a posting costs 8 bytes instead of a set
+    entry. Removal is lazy: removed keys are filtered out of results and
+    purged from the postings once they make up half of them (the same
+    tombstone scheme as ColumnarStore).
+    
+    A query of n characters is answered exactly by its posting list; longer
+    queries intersect the postings of their n-grams, and the caller verifies
+    the few candidates left. Queries shorter than n cannot use the index
+    (see is_searchable()).
+    """
+    def __init__(self, n=3):
+        self.n = n
+        self.postings = {}
+        self.removed = {}  # key -> text, for removed keys still in the postings
+        self.entries = 0   # postings held, including stale ones
+        self.stale = 0
+    
+    def _grams(self, text):
+        """Return the set of distinct n-grams in text"""
+        n = self.n
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+    
+    def add(self, key, text):
+        """Index key under every n-gram of text"""
+        if key in self.removed:
+            # Re-added (e.g. by undo) before its old postings were purged
+            self._purge(key, self.removed.pop(key))
+        postings = self.postings
+        grams = self._grams(text)
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array('q', (key,))
+            elif posting[-1] < key:
+                posting.append(key)  # New keys are usually the largest yet
+            else:
+                posting.insert(bisect.bisect_left(posting, key), key)
+        self.entries += len(grams)
+    
+    def _purge(self, key, text):
+        """Delete a removed key's postings right away"""
+        grams = self._grams(text)
+        for gram in grams:
+            posting = self.postings[gram]
+            del posting[bisect.bisect_left(posting, key)]
+            if not posting:
+                del self.postings[gram]
+        self.entries -= len(grams)
+        self.stale -= len(grams)
+    
+    def remove(self, key, text):
+        """Drop key from the index (its postings are purged later)"""
+        self.removed[key] = text
+        self.stale += len(self._grams(text))
+        if self.stale * 2 > self.entries:
+            self.compact()
+    
+    def compact(self):
+        """Rewrite the postings without removed keys"""
+        removed = self.removed
+        for gram, posting in list(self.postings.items()):
+            kept = array('q', [key for key in posting if key not in removed])
+            if kept:
+                self.postings[gram] = kept
+            else:
+                del self.postings[gram]
+        self.entries -= self.stale
+        self.stale = 0
+        self.removed = {}
+    
+    def is_searchable(self, query):
+        """Check whether query is long enough for candidates()"""
+        return len(query) >= self.n
+    
+    def is_exact(self, query):
+        """Check whether candidates(query) needs no verification"""
+        return len(query) == self.n
+    
+    def candidates(self, query):
+        """Return keys whose text may contain query, in ascending order"""
+        removed = self.removed
+        if self.is_exact(query):
+            return [key for key in self.postings.get(query, ()) if key not in removed]
+        
+        postings = []
+        for gram in self._grams(query):
+            posting = self.postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        smallest, rest = postings[0], postings[1:]
+        return [key for key in smallest
+                if key not in removed and all(_sorted_contains(posting, key) for posting in rest)]
+    
+    def __len__(self):
+        return len(self.postings)
 
 
+def _sorted_contains(values, key):
+    """Binary search a sorted sequence for key"""
+    i = bisect.bisect_left(values, key)
+    return i < len(values) and values[i] == key
 
 
+class PrefixIndex:
+    """Sorted array of (text, key) pairs for prefix autocomplete
+    
+    Texts are kept in one sorted list and keys in a parallel array('q'),
+    ordered by (text, key), so an entry costs a list slot, the text and 8
+    bytes. starts_with() binary searches for the first text at or after the
+    prefix and reads matches from there, so its cost is O(log n) plus the
+    results returned. Inserts and removals shift the arrays (a memmove).
+    """
+    def __init__(self, items=()):
+        # Built with one sort, for indexes rebuilt from a whole store
+        items = sorted(items)
+        self.texts = [text for text, key in items]
+        self.keys = array('q', [key for text, key in items])
+    
+    def _position(self, text, key):
+        """Return where (text, key) is or would be inserted"""
+        lo = bisect.bisect_left(self.texts, text)
+        hi = bisect.bisect_right(self.texts, text, lo)
+        return bisect.bisect_left(self.keys, key, lo, hi)
+    
+    def insert(self, text, key):
+        """Store key under text"""
+        i = self._position(text, key)
+        self.texts.insert(i, text)
+        self.keys.insert(i, key)
+    
+    def remove(self, text, key):
+        """Remove key from text"""
+        i = self._position(text, key)
+        del self.texts[i]
+        del self.keys[i]
+    
+    def starts_with(self, prefix, limit=None):
+        """Return up to limit keys whose text starts with prefix, ordered by (text, key)"""
+        texts = self.texts
+        start = bisect.bisect_left(texts, prefix)
+        end = len(texts) if limit is None else min(len(texts), start + limit)
+        i = start
+        while i < end and texts[i].startswith(prefix):
+            i += 1
+        return self.keys[start:i].tolist()
+    
+    def __len__(self):
+        return len(self.texts)
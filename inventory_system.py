@@ -3,245 +3,718 @@ Product Inventory List System
 Main inventory management system using Lists, Stack, Queue, and Linked Lists
 """
 
-from data_structures import LinkedList, Stack, Queue
+import contextlib
+import heapq
+import itertools
+import math
+import os
+import time
+
+import analytics
+from backends import MemoryBackend
+from data_structures import BoundedStack, Queue, PriorityQueue
+from locks import ReadWriteLock
 from product import Product
 
 
+# Named order priorities accepted by add_order(); higher is dispatched first
+ORDER_PRIORITIES = {"standard": 0, "wholesale": 1, "expedited": 2}
+
+
+def undo_weight(record):
+    """Number of delta records an undo entry holds (a transaction counts its members)"""
+    if record[0] == "transaction":
+        return sum(undo_weight(member) for member in record[2])
+    return 1
+
+
+def order_dispatch_key(order):
+    """Priority queue key: highest priority, then earliest deadline (none last), then arrival"""
+    deadline = order.get("deadline")
+    return -order.get("priority", 0), deadline is None, deadline if deadline is not None else 0
+
+
 class InventorySystem:
-    """Product Inventory Management System using various data structures"""
+    """Product Inventory Management System using various data structures
+    
+    Safe to share between threads: reads hold self.lock shared and run
+    together, while mutations hold it exclusively (see transaction()).
+    """
     
-    def __init__(self):
-        # Linked List for storing products
-        self.product_list = LinkedList()
+    def __init__(self, order_capacity=None, debug_checks=False, store=None, backend=None,
+                 priority_orders=False, undo_limit=1000):
+        # Product storage and queries (see backends.py); in memory on the given engine by default
+        self.backend = backend if backend is not None else MemoryBackend(store)
         
-        # Stack for tracking recent operations (for undo functionality)
-        self.operation_stack = Stack()
+        # Bounded stacks of operations to undo and redo, as compact delta records
+        # (op, product ID, old value). A transaction's records are collected in
+        # undo_group and pushed as one entry. Each stack keeps the most recent
+        # entries holding at most undo_limit records in total (see undo_weight()).
+        self.operation_stack = BoundedStack(undo_limit, undo_weight)
+        self.redo_stack = BoundedStack(undo_limit, undo_weight)
+        self.undo_group = []
+        self.transaction_depth = 0
         
-        # Queue for processing orders/transactions
-        self.order_queue = Queue()
+        # Queue for processing orders/transactions (bounded if order_capacity is set);
+        # FIFO by default, or a heap by priority and deadline with priority_orders
+        if priority_orders:
+            self.order_queue = PriorityQueue(order_dispatch_key, order_capacity)
+        else:
+            self.order_queue = Queue(order_capacity)
         
-        # List for storing all products (Python list)
-        self.product_array = []
+        # Reservation ledger: product ID -> units held by pending orders (O(1) availability)
+        self.reservations = {}
+        self.total_reserved = 0
         
-        # Counter for product IDs
-        self.next_id = 1
+        # Pending orders by order ID, and a heap of (deadline, order ID) for expiry.
+        # Cancelled orders stay in order_queue as tombstones (no longer in
+        # pending_orders) until dequeued or compacted away; order_tombstones counts them.
+        self.pending_orders = {}
+        self.order_deadlines = []
+        self.order_tombstones = 0
+        
+        # Bumped by every change to the pending orders (see version_tag()); the
+        # ledger is per process, so its versions get their own random epoch
+        self.order_version = 0
+        self.order_epoch = os.urandom(4).hex()
+        
+        # Debug mode: re-verify running aggregates with a full scan on every read
+        self.debug_checks = debug_checks
+        
+        # Write-ahead journal (see persistence.py); None disables journaling. Its
+        # append() numbers each change record (lsn is the latest number), and
+        # wait_durable(lsn) blocks until the records up to lsn are on disk
+        self.journal = None
+        
+        # Callables taking a product ID, called after that product is added,
+        # changed or removed (e.g. to invalidate caches)
+        self.change_listeners = []
+        
+        # Readers share the inventory, writers get it exclusively
+        self.lock = ReadWriteLock()
+    
+    @property
+    def next_id(self):
+        """The product ID the next added product will get"""
+        return self.backend.next_id
+    
+    @next_id.setter
+    def next_id(self, value):
+        self.backend.next_id = value
+    
+    @property
+    def next_order_id(self):
+        """The order ID the next order will get (unique across workers sharing a database)"""
+        return self.backend.next_order_id
+    
+    @next_order_id.setter
+    def next_order_id(self, value):
+        self.backend.next_order_id = value
+    
+    @contextlib.contextmanager
+    def transaction(self, group_undo=True):
+        """Group several calls into one atomic unit
+        
+        Holds the write lock, so no other thread sees the changes half-done,
+        and runs them in one backend transaction. Transactions nest, and
+        everything done inside the outermost one is undone (and redone) in a
+        single step; with group_undo=False (read from the outermost one) each
+        call stays its own undo entry instead. If the block raises, its
+        product changes are reverted before the exception propagates (the
+        memory backend has no rollback of its own); pending orders are not
+        part of the undo history and stay as they are. With a journal, the
+        outermost transaction returns once its records are on disk.
+        """
+        journal = durable_lsn = None
+        with self.lock.write(), self.backend.transaction():
+            if not self.transaction_depth:
+                grouped = group_undo
+                journal = self.journal
+                start_lsn = journal.lsn if journal is not None else None
+            start = len(self.undo_group)
+            self.transaction_depth += 1
+            try:
+                yield
+            except BaseException:
+                failed = tuple(self.undo_group[start:])
+                del self.undo_group[start:]
+                if failed:
+                    self._revert(("transaction", None, failed))
+                raise
+            finally:
+                self.transaction_depth -= 1
+            if not self.transaction_depth:
+                self._commit_undo_group(grouped)
+                if journal is not None and journal.lsn != start_lsn:
+                    durable_lsn = journal.lsn
+        if durable_lsn is not None:
+            # Outside the lock, so the commits queued behind this one share its fsync
+            journal.wait_durable(durable_lsn)
+    
+    def _record(self, op_type, product_id, old_value):
+        """Add an undo record to the current transaction's group"""
+        self.undo_group.append((op_type, product_id, old_value))
+    
+    def _commit_undo_group(self, grouped=True):
+        """Push the finished transaction's records as one undo entry (or one each)"""
+        group, self.undo_group = self.undo_group, []
+        if not group:
+            return
+        if grouped:
+            self.operation_stack.push(group[0] if len(group) == 1 else ("transaction", None, tuple(group)))
+        else:
+            for record in group:
+                self.operation_stack.push(record)
+        # A new change invalidates anything that was undone before it
+        if not self.redo_stack.is_empty():
+            self.redo_stack.clear()
     
     def add_product(self, name, category, price, quantity):
-        """Add a new product to the inventory using Linked List"""
-        product = Product(self.next_id, name, category, price, quantity)
-        self.product_list.append(product)
-        self.product_array.append(product)
-        self.operation_stack.push(("add", product))
-        self.next_id += 1
+        """Add a new product to the inventory; returns a snapshot of it"""
+        with self.transaction():
+            product = self._index_product(Product(self.backend.allocate_id(), name, category, price, quantity))
+            self._record("add", product.product_id, None)
+            # Detached, like search results: a ProductView would fail once another thread removed the product
+            return self.backend.snapshot(product.product_id)
+    
+    def add_products(self, rows):
+        """Add many products at once, recorded as a single undo entry
+        
+        rows is an iterable of (name, category, price, quantity) tuples that
+        the caller has already validated. Returns snapshots of the new products.
+        """
+        products = []
+        with self.transaction():
+            try:
+                for name, category, price, quantity in rows:
+                    products.append(self._index_product(
+                        Product(self.backend.allocate_id(), name, category, price, quantity)))
+            finally:
+                if products:
+                    # IDs in a batch are consecutive, so the record keeps just the first and last
+                    self._record("add_batch", products[0].product_id, products[-1].product_id)
+            return [self.backend.snapshot(product.product_id) for product in products]
+    
+    def load_products(self, rows):
+        """Load products that are not in the inventory yet, e.g. from a snapshot
+        
+        rows are (id, name, category, price, quantity) tuples, or a
+        MappedSnapshot. Unlike add_products() nothing is recorded for undo
+        or journaled, and the backend stores the rows in one step (see
+        bulk_load() in backends.py), so recovery does not pay for a
+        transaction per product.
+        """
+        with self.lock.write():
+            self.backend.bulk_load(rows)
+    
+    def _index_product(self, product, successor_id=None):
+        """Store a product (before successor_id, else at the end) and journal it"""
+        product = self.backend.insert(product, successor_id)
+        self._journal("add", product.product_id, product.name, product.category,
+                      product.price, product.quantity, successor_id)
+        self._product_changed(product.product_id)
+        return product
+    
+    def _unindex_product(self, product_id):
+        """Remove a product from storage and journal it, returning it detached"""
+        product = self.backend.delete(product_id)
+        self._journal("remove", product_id)
+        self._product_changed(product_id)
         return product
     
+    def _set_quantity(self, product, new_quantity):
+        """Change a product's quantity and journal it"""
+        self.backend.set_quantity(product, new_quantity)
+        self._journal("quantity", product.product_id, new_quantity)
+        self._product_changed(product.product_id)
+    
+    def _set_price(self, product, new_price):
+        """Change a product's price and journal it"""
+        self.backend.set_price(product, new_price)
+        self._journal("price", product.product_id, new_price)
+        self._product_changed(product.product_id)
+    
+    def _take_stock(self, product, quantity):
+        """Decrement a product's stock by quantity if enough is left, as one atomic step"""
+        if not self.backend.take_stock(product, quantity):
+            return False
+        self._journal("quantity", product.product_id, product.quantity)
+        self._product_changed(product.product_id)
+        return True
+    
+    def _journal(self, *record):
+        """Append a physical change record to the write-ahead journal, if any"""
+        if self.journal is not None:
+            self.journal.append(list(record))
+    
+    def _product_changed(self, product_id):
+        """Notify change_listeners that a product was added, changed or removed"""
+        for listener in self.change_listeners:
+            listener(product_id)
+    
+    def apply_journal_record(self, record):
+        """Re-apply a journal record during recovery (no undo entry, not re-journaled)"""
+        op_type = record[0]
+        with self.transaction():
+            if op_type == "add":
+                product_id, name, category, price, quantity, successor_id = record[1:]
+                self._index_product(Product(product_id, name, category, price, quantity), successor_id)
+                self.next_id = max(self.next_id, product_id + 1)
+            elif op_type == "remove":
+                self._unindex_product(record[1])
+            elif op_type == "quantity":
+                self._set_quantity(self.backend.get(record[1]), record[2])
+            elif op_type == "price":
+                self._set_price(self.backend.get(record[1]), record[2])
+            elif op_type == "order":
+                self._open_order(record[1])
+            elif op_type == "dequeue":
+                if len(record) > 1 and isinstance(record[1], list):
+                    self._retire_orders(record[1])
+                else:
+                    # Logs written before dequeues named their orders hold a count
+                    for _ in range(record[1] if len(record) > 1 else 1):
+                        self._close_order(self._dequeue_order())
+            elif op_type == "cancel":
+                self._cancel_orders(record[1])
+            else:
+                raise ValueError(f"Unknown journal record: {op_type}")
+    
     def remove_product(self, product_id):
         """Remove a product from the inventory"""
-        # Search in linked list
-        current = self.product_list.head
-        prev = None
-        found = False
-        
-        while current is not None:
-            if current.data.product_id == product_id:
-                found = True
-                product = current.data
-                # Remove from linked list
-                if prev is None:
-                    self.product_list.head = current.next
-                else:
-                    prev.next = current.next
-                self.product_list.size -= 1
-                
-                # Remove from array list
-                self.product_array = [p for p in self.product_array if p.product_id != product_id]
-                
-                # Push to operation stack
-                self.operation_stack.push(("remove", product))
-                return product
-            prev = current
-            current = current.next
-        
-        return None
+        with self.transaction():
+            if product_id not in self.backend:
+                return None
+            
+            successor_id = self.backend.successor_id(product_id)
+            product = self._unindex_product(product_id)
+            
+            # Push to operation stack (with the successor, so undo restores the position)
+            self._record("remove", product_id, (product.name, product.category, product.price,
+                                                product.quantity, successor_id))
+        return product
     
     def search_product(self, product_id):
-        """Search for a product by ID"""
-        current = self.product_list.head
-        while current is not None:
-            if current.data.product_id == product_id:
-                return current.data
-            current = current.next
-        return None
+        """Search for a product by ID (a snapshot, safe to read after the lock is released)"""
+        with self.lock.read():
+            return self.backend.snapshot(product_id)
     
     def search_by_name(self, name):
-        """Search for products by name"""
-        results = []
-        current = self.product_list.head
-        while current is not None:
-            if name.lower() in current.data.name.lower():
-                results.append(current.data)
-            current = current.next
-        return results
+        """Search for products by name (case-insensitive substring match)"""
+        with self.lock.read():
+            return self.backend.search_name(name.lower())
+    
+    def autocomplete(self, prefix, limit=10):
+        """Return up to limit products whose name starts with prefix, sorted by name"""
+        with self.lock.read():
+            return self.backend.autocomplete(prefix.lower(), limit)
     
     def update_product_quantity(self, product_id, new_quantity):
         """Update the quantity of a product"""
-        product = self.search_product(product_id)
-        if product:
-            old_quantity = product.quantity
-            product.update_quantity(new_quantity)
-            self.operation_stack.push(("update_quantity", product, old_quantity))
-            return True
+        with self.transaction():
+            product = self.backend.get(product_id)
+            if product:
+                old_quantity = product.quantity
+                self._set_quantity(product, new_quantity)
+                self._record("update_quantity", product_id, old_quantity)
+                return True
         return False
     
     def update_product_price(self, product_id, new_price):
         """Update the price of a product"""
-        product = self.search_product(product_id)
-        if product:
-            old_price = product.price
-            product.update_price(new_price)
-            self.operation_stack.push(("update_price", product, old_price))
-            return True
+        with self.transaction():
+            product = self.backend.get(product_id)
+            if product:
+                old_price = product.price
+                self._set_price(product, new_price)
+                self._record("update_price", product_id, old_price)
+                return True
         return False
     
-    def add_order(self, product_id, quantity):
-        """Add an order to the queue for processing"""
-        product = self.search_product(product_id)
-        if product:
-            if product.quantity >= quantity:
-                order = {
-                    "product_id": product_id,
-                    "product_name": product.name,
-                    "quantity": quantity,
-                    "total_price": product.price * quantity
-                }
-                self.order_queue.enqueue(order)
+    def available_quantity(self, product_id):
+        """Return the stock of a product not yet reserved by pending orders (O(1))"""
+        self._expire_due_orders()
+        with self.lock.read():
+            product = self.backend.get(product_id)
+            if product is None:
+                return 0
+            return product.quantity - self.reservations.get(product_id, 0)
+    
+    def add_order(self, product_id, quantity, priority=0, deadline=None):
+        """Add an order to the queue for processing, reserving its stock
+        
+        Only stock that is not already reserved can be ordered. priority
+        (higher first) and deadline (a Unix timestamp; earlier first) affect
+        dispatch order when priority_orders is enabled, and an order still
+        pending at its deadline expires, releasing its reservation.
+        """
+        with self.transaction():
+            self.expire_orders()
+            if not self._order_queue_has_room():
+                return None  # Backlog is at capacity
+            product = self.backend.get(product_id)
+            if product:
+                if self.available_quantity(product_id) >= quantity:
+                    order = {
+                        "order_id": self.backend.allocate_order_id(),
+                        "product_id": product_id,
+                        "product_name": product.name,
+                        "quantity": quantity,
+                        "total_price": product.price * quantity,
+                        "priority": priority,
+                        "deadline": deadline
+                    }
+                    self._open_order(order)
+                    self._journal("order", order)
+                    return order
+                else:
+                    return None  # Insufficient stock
+            return None
+    
+    def _open_order(self, order):
+        """Queue an order and reserve its stock"""
+        order.setdefault("order_id", self.next_order_id)  # Orders journaled before order IDs existed
+        self._order_queue_has_room()  # Tombstones must not take the place of a replayed order
+        self.order_queue.enqueue(order)
+        self.pending_orders[order["order_id"]] = order
+        if order["order_id"] >= self.next_order_id:
+            self.next_order_id = order["order_id"] + 1
+        product_id = order["product_id"]
+        self.reservations[product_id] = self.reservations.get(product_id, 0) + order["quantity"]
+        self.total_reserved += order["quantity"]
+        if order.get("deadline") is not None:
+            heapq.heappush(self.order_deadlines, (order["deadline"], order["order_id"]))
+        self.order_version += 1
+    
+    def _close_order(self, order):
+        """Release the reservation of an order that has left the queue"""
+        del self.pending_orders[order["order_id"]]
+        product_id = order["product_id"]
+        reserved = self.reservations[product_id] - order["quantity"]
+        if reserved:
+            self.reservations[product_id] = reserved
+        else:
+            del self.reservations[product_id]
+        self.total_reserved -= order["quantity"]
+        self.order_version += 1
+    
+    def _is_pending(self, order):
+        """Check that a queued order is not a tombstone"""
+        return self.pending_orders.get(order["order_id"]) is order
+    
+    def _dequeue_order(self):
+        """Dequeue the next pending order, dropping tombstones in front of it; None if there is none"""
+        while not self.order_queue.is_empty():
+            order = self.order_queue.dequeue()
+            if self._is_pending(order):
                 return order
-            else:
-                return None  # Insufficient stock
+            self.order_tombstones -= 1
         return None
     
+    def _compact_orders(self):
+        """Drop every tombstone from the queue (O(n))"""
+        self.order_queue.remove_where(lambda order: not self._is_pending(order))
+        self.order_tombstones = 0
+    
+    def _order_queue_has_room(self):
+        """Check that the queue can take another order, compacting it if tombstones fill it"""
+        if self.order_queue.is_full() and self.order_tombstones:
+            self._compact_orders()
+        return not self.order_queue.is_full()
+    
+    def _retire_orders(self, order_ids):
+        """Close pending orders by ID and release their reservations
+        
+        The orders stay in the queue as tombstones, so each one is O(1);
+        tombstones at the front are dequeued right away (as replayed
+        dequeues usually are), and the queue is compacted once they make up
+        more than half of it.
+        """
+        for order_id in order_ids:
+            order = self.pending_orders.get(order_id)
+            if order is not None:
+                self._close_order(order)
+                self.order_tombstones += 1
+        while self.order_tombstones and not self._is_pending(self.order_queue.front()):
+            self.order_queue.dequeue()
+            self.order_tombstones -= 1
+        if 2 * self.order_tombstones > len(self.order_queue):
+            self._compact_orders()
+    
+    def _cancel_orders(self, order_ids):
+        """Cancel pending orders by ID, leaving tombstones in the queue"""
+        order_ids = set(order_ids)
+        self._retire_orders(order_ids)
+        self._journal("cancel", sorted(order_ids))
+    
+    def cancel_order(self, order_id):
+        """Cancel a pending order, releasing its reserved stock; returns it, or None"""
+        with self.transaction():
+            order = self.pending_orders.get(order_id)
+            if order is not None:
+                self._cancel_orders([order_id])
+            return order
+    
+    def expire_orders(self, now=None):
+        """Cancel pending orders whose deadline has passed; returns how many expired"""
+        now = time.time() if now is None else now
+        with self.transaction():
+            expired = []
+            while self.order_deadlines and self.order_deadlines[0][0] <= now:
+                _, order_id = heapq.heappop(self.order_deadlines)
+                if order_id in self.pending_orders:  # Skip orders already processed or cancelled
+                    expired.append(order_id)
+            if expired:
+                self._cancel_orders(expired)
+            return len(expired)
+    
+    def _expire_due_orders(self):
+        """Expire orders before a read that reports reservations
+        
+        Takes the write lock only when the earliest deadline has passed, so
+        reads stay shared otherwise. Callers must not hold the read lock.
+        """
+        try:
+            due = self.order_deadlines[0][0] <= time.time()
+        except IndexError:
+            return  # No deadlines (or another thread just took the last one)
+        if due:
+            self.expire_orders()
+    
     def process_order(self):
         """Process the next order from the queue"""
-        if not self.order_queue.is_empty():
-            order = self.order_queue.dequeue()
-            product = self.search_product(order["product_id"])
-            if product and product.quantity >= order["quantity"]:
-                product.update_quantity(product.quantity - order["quantity"])
-                return order
-        return None
+        processed, _ = self.process_orders(1)
+        return processed[0] if processed else None
     
-    def undo_last_operation(self):
-        """Undo the last operation using the stack"""
-        if not self.operation_stack.is_empty():
-            operation = self.operation_stack.pop()
-            op_type = operation[0]
+    def process_orders(self, max_orders, deadline=None):
+        """Process up to max_orders orders from the queue in one pass
+        
+        Orders are grouped by product, so each product's stock is read and
+        decremented once per batch. Each order is accepted in queue order
+        while its product's stock lasts, exactly as one-by-one processing
+        would. deadline is an optional time.monotonic() value: no further
+        orders are taken once it has passed (but at least one always is).
+        Returns (processed, rejected) lists of orders.
+        """
+        with self.transaction():
+            self.expire_orders()
+            batch = []
+            while len(batch) < max_orders and self.pending_orders:
+                if batch and deadline is not None and time.monotonic() >= deadline:
+                    break
+                order = self._dequeue_order()
+                self._close_order(order)
+                batch.append(order)
+            if not batch:
+                return [], []
+            # By ID, so replay closes the same orders whatever the queue's dispatch order
+            self._journal("dequeue", [order["order_id"] for order in batch])
             
-            if op_type == "add":
-                # Undo add: remove the product
-                product = operation[1]
-                self.remove_product(product.product_id)
-                # Remove the undo operation from stack
-                if not self.operation_stack.is_empty():
-                    self.operation_stack.pop()
-                return True
-            elif op_type == "remove":
-                # Undo remove: add the product back
-                product = operation[1]
-                self.product_list.append(product)
-                self.product_array.append(product)
-                return True
-            elif op_type == "update_quantity":
-                # Undo quantity update
-                product = operation[1]
-                old_quantity = operation[2]
-                product.update_quantity(old_quantity)
-                return True
-            elif op_type == "update_price":
-                # Undo price update
-                product = operation[1]
-                old_price = operation[2]
-                product.update_price(old_price)
-                return True
-        return False
+            by_product = {}
+            for order in batch:
+                by_product.setdefault(order["product_id"], []).append(order)
+            
+            accepted = set()
+            for product_id, orders in by_product.items():
+                product = self.backend.get(product_id)
+                available = product.quantity if product else 0
+                taken = 0
+                for order in orders:
+                    if taken + order["quantity"] <= available:
+                        taken += order["quantity"]
+                        accepted.add(id(order))
+                if taken:
+                    self._take_stock(product, taken)
+        
+        processed = [order for order in batch if id(order) in accepted]
+        rejected = [order for order in batch if id(order) not in accepted]
+        return processed, rejected
+    
+    def _revert(self, record):
+        """Undo one delta record and return the record that reverses it, or None
+        
+        Each step is O(1) on the in-memory stores and goes through the
+        internal helpers, so it neither pushes undo entries nor scans.
+        Products removed or changed since (e.g. by another worker sharing
+        the backend) are skipped.
+        """
+        op_type, product_id, old_value = record
+        if op_type == "transaction":
+            # Revert newest first; the inverse group replays in that same order
+            inverse = [self._revert(member) for member in reversed(old_value)]
+            inverse = tuple(member for member in inverse if member is not None)
+            return ("transaction", None, inverse) if inverse else None
+        if op_type == "add_batch":
+            return self._revert(("transaction", None, tuple(
+                ("add", batch_id, None) for batch_id in range(product_id, old_value + 1))))
+        
+        if op_type == "add":
+            if product_id not in self.backend:
+                return None
+            successor_id = self.backend.successor_id(product_id)
+            product = self._unindex_product(product_id)
+            return ("remove", product_id, (product.name, product.category, product.price,
+                                           product.quantity, successor_id))
+        if op_type == "remove":
+            # Put the product back in front of its old successor
+            name, category, price, quantity, successor_id = old_value
+            if product_id in self.backend:
+                return None
+            self._index_product(Product(product_id, name, category, price, quantity), successor_id)
+            return ("add", product_id, None)
+        
+        product = self.backend.get(product_id)
+        if product is None:
+            return None
+        if op_type == "update_quantity":
+            current = product.quantity
+            self._set_quantity(product, old_value)
+        else:
+            current = product.price
+            self._set_price(product, old_value)
+        return (op_type, product_id, current)
+    
+    def _replay(self, source, target, steps):
+        """Revert up to steps entries from source, pushing their inverses onto target"""
+        done = 0
+        with self.transaction():
+            while done < steps and not source.is_empty():
+                inverse = self._revert(source.pop())
+                if inverse is not None:
+                    target.push(inverse)
+                done += 1
+        return done
+    
+    def undo(self, steps=1):
+        """Undo up to steps operations (a transaction counts as one); return how many were undone"""
+        return self._replay(self.operation_stack, self.redo_stack, steps)
+    
+    def redo(self, steps=1):
+        """Redo up to steps undone operations; return how many were redone"""
+        return self._replay(self.redo_stack, self.operation_stack, steps)
+    
+    def undo_last_operation(self):
+        """Undo the last operation (or transaction) using the stack"""
+        return self.undo(1) == 1
     
     def display_all_products(self):
         """Display all products using Linked List"""
-        if self.product_list.is_empty():
-            return []
-        return self.product_list.display()
+        with self.lock.read():
+            return [str(product) for product in self.backend]
+    
+    def is_empty(self):
+        """Check if the inventory has no products"""
+        with self.lock.read():
+            return len(self.backend) == 0
+    
+    def page_products(self, after_id=None, limit=50):
+        """Return up to limit products with IDs greater than after_id, in ID order
+        
+        Also returns whether more products follow. The cost is proportional
+        to the page size (plus any IDs deleted right after after_id).
+        """
+        with self.lock.read():
+            return self.backend.page(after_id, limit)
+    
+    def iter_products(self, batch_size=500):
+        """Yield every product in ID order, fetching batch_size at a time
+        
+        Resumes by product ID between batches, so it stays valid while
+        products are added or removed during a long iteration.
+        """
+        after_id = None
+        has_more = True
+        while has_more:
+            products, has_more = self.page_products(after_id, batch_size)
+            yield from products
+            if products:
+                after_id = products[-1].product_id
     
     def display_by_category(self, category):
         """Display products filtered by category"""
-        results = []
-        current = self.product_list.head
-        while current is not None:
-            if current.data.category.lower() == category.lower():
-                results.append(current.data)
-            current = current.next
-        return results
+        with self.lock.read():
+            return self.backend.by_category(category)
+    
+    def version_tag(self, category=None, orders=False):
+        """Return an opaque tag that changes whenever the products change
+        
+        With category, only changes to that category's products count; with
+        orders, changes to pending orders and reservations count too. It is
+        read from counters in O(1), so callers can tell that a response is
+        unchanged without building it.
+        """
+        if orders:
+            self._expire_due_orders()  # Or a 304 could confirm reservations that have expired
+        with self.lock.read():
+            if category is None:
+                tag = f"{self.backend.epoch}.{self.backend.version}"
+            else:
+                tag = f"{self.backend.epoch}.{self.backend.category_version(category)}"
+            if orders:
+                tag += f".{self.order_epoch}.{self.order_version}"
+            return tag
     
     def get_statistics(self):
         """Get inventory statistics"""
-        total_products = len(self.product_list)
-        total_quantity = 0
-        total_value = 0
-        categories = set()
-        
-        current = self.product_list.head
-        while current is not None:
-            product = current.data
-            total_quantity += product.quantity
-            total_value += product.price * product.quantity
-            categories.add(product.category)
-            current = current.next
-        
-        return {
-            "total_products": total_products,
-            "total_quantity": total_quantity,
-            "total_value": total_value,
-            "categories": len(categories),
-            "pending_orders": len(self.order_queue)
-        }
+        self._expire_due_orders()
+        with self.lock.read():
+            if self.debug_checks:
+                self.verify_statistics()
+            
+            statistics = self.backend.statistics()
+            statistics["pending_orders"] = len(self.pending_orders)
+            statistics["reserved_quantity"] = self.total_reserved
+            statistics["available_quantity"] = statistics["total_quantity"] - self.total_reserved
+            return statistics
     
-    def display_recent_operations(self, n=5):
-        """Display recent operations from the stack"""
-        operations = []
-        temp_stack = Stack()
-        count = 0
-        
-        while not self.operation_stack.is_empty() and count < n:
-            op = self.operation_stack.pop()
-            temp_stack.push(op)
-            operations.append(op)
-            count += 1
+    def analytics(self, low_stock_threshold=5):
+        """Per-category value, price percentiles, stock-weighted price and low-stock counts
         
-        # Restore stack
-        while not temp_stack.is_empty():
-            self.operation_stack.push(temp_stack.pop())
-        
-        return operations[::-1]  # Reverse to show most recent first
+        Vectorized with NumPy over the store's numeric columns when NumPy is
+        installed, otherwise computed by the pure-Python reference.
+        """
+        with self.lock.read():
+            if analytics.np is None:
+                return analytics.compute_reference(self.backend, low_stock_threshold)
+            return analytics.compute_vectorized(self.backend.numeric_columns(), low_stock_threshold)
     
-    def display_pending_orders(self):
-        """Display all pending orders in the queue"""
-        orders = []
-        temp_queue = Queue()
-        
-        while not self.order_queue.is_empty():
-            order = self.order_queue.dequeue()
-            orders.append(order)
-            temp_queue.enqueue(order)
-        
-        # Restore queue
-        while not temp_queue.is_empty():
-            self.order_queue.enqueue(temp_queue.dequeue())
+    def verify_statistics(self):
+        """Recompute the aggregates with a full scan and check the backend's totals"""
+        with self.lock.read():
+            statistics = self.backend.statistics()
+            total_quantity = 0
+            total_value = 0
+            categories = set()
+            
+            for product in self.backend:
+                total_quantity += product.quantity
+                total_value += product.price * product.quantity
+                categories.add(product.category.casefold())
+            
+            if (total_quantity != statistics["total_quantity"]
+                    or not math.isclose(total_value, statistics["total_value"], rel_tol=1e-9, abs_tol=1e-6)
+                    or len(categories) != statistics["categories"]):
+                raise RuntimeError(
+                    f"Statistics drift: running quantity={statistics['total_quantity']}, "
+                    f"value={statistics['total_value']}, categories={statistics['categories']}; "
+                    f"scan quantity={total_quantity}, value={total_value}, "
+                    f"categories={len(categories)}"
+                )
+            return True
+    
+    def display_recent_operations(self, n=5):
+        """Return the last n undoable operations, oldest first, without touching the stack (O(n))"""
+        with self.lock.read():
+            return self.operation_stack.recent(n)[::-1]
+    
+    def display_pending_orders(self, offset=0, limit=None):
+        """Return pending orders in the order they will be processed
         
-        return orders
-
-
-
-
-
-
-
-
-
+        offset and limit select a page without copying or dequeuing the rest
+        of the queue.
+        """
+        with self.lock.read():
+            if not self.order_tombstones:
+                return self.order_queue.page(offset, limit)
+            pending = (order for order in self.order_queue if self._is_pending(order))
+            return list(itertools.islice(pending, offset, None if limit is None else offset + limit))
@@ -0,0 +1,78 @@
+"""
+JSON Cache for the Product Inventory System
+Pre-encoded JSON objects for products, so list responses are built by joining bytes
+"""
+
+import json
+import threading
+
+
+def product_to_dict(product):
+    """Convert Product object to dictionary for JSON serialization"""
+    return {
+        "product_id": product.product_id,
+        "name": product.name,
+        "category": product.category,
+        "price": product.price,
+        "quantity": product.quantity
+    }
+
+
+def encode_json(value):
+    """Encode value the way jsonify does outside debug mode (compact, sorted keys)"""
+    return json.dumps(value, separators=(",", ":"), sort_keys=True).encode()
+
+
+class ProductJSONCache:
+    """Encoded JSON object of each product, keyed by product ID
+    
+    InventorySystem calls invalidate() after every change to a product
+    (see change_listeners), including its removal, so cached fragments are
+    never stale. A fragment encoded while its product was being changed is
+    not stored: each invalidation bumps a counter, and a fill only lands if
+    the counter did not move. With enabled=False nothing is stored, for
+    backends whose products other processes can change.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.fragments = {}
+        self.invalidations = 0
+        self.lock = threading.Lock()
+    
+    def fragment(self, product):
+        """Return the product's JSON object as bytes, encoding it on a miss"""
+        data = self.fragments.get(product.product_id)
+        if data is None:
+            seen = self.invalidations
+            data = encode_json(product_to_dict(product))
+            if self.enabled:
+                with self.lock:
+                    if self.invalidations == seen:
+                        self.fragments[product.product_id] = data
+        return data
+    
+    def invalidate(self, product_id):
+        """Drop a product's fragment after it changed"""
+        with self.lock:
+            self.invalidations += 1
+            self.fragments.pop(product_id, None)
+    
+    def clear(self):
+        with self.lock:
+            self.invalidations += 1
+            self.fragments = {}
+    
+    def encode_list(self, products):
+        """Return products as a JSON array (bytes) joined from their fragments"""
+        return b"[" + b",".join([self.fragment(product) for product in products]) + b"]"
+    
+    def encode_response(self, products, **fields):
+        """Return {"products": [...], "success": true, **fields} as a JSON document (bytes)
+        
+        The same document jsonify would produce, apart from key order.
+        """
+        rest = encode_json(dict(fields, success=True))
+        return b'{"products":' + self.encode_list(products) + b"," + rest[1:] + b"\n"
+    
+    def __len__(self):
+        return len(self.fragments)
@@ -0,0 +1,74 @@
+"""
+Locks for the Product Inventory System
+Reader-writer lock that lets concurrent reads share the inventory while writes are exclusive
+"""
+
+import contextlib
+import threading
+
+
+class ReadWriteLock:
+    """Many readers or one writer at a time, preferring waiting writers
+    
+    New readers queue behind a waiting writer, so a steady stream of reads
+    cannot starve writes. Both sides are reentrant per thread: a writer may
+    take the read or write lock again, and a reader may nest reads. Taking
+    the write lock while holding only the read lock would deadlock, so it
+    raises RuntimeError instead.
+    """
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.waiting_writers = 0
+        self.writer = None  # ident of the thread holding the write lock
+        self.local = threading.local()
+    
+    @contextlib.contextmanager
+    def read(self):
+        """Hold the lock shared for the duration of the with block"""
+        depth = getattr(self.local, "reads", 0)
+        if depth or self.writer == threading.get_ident():
+            # Nested inside this thread's own read or write; already safe
+            self.local.reads = depth + 1
+            try:
+                yield
+            finally:
+                self.local.reads = depth
+            return
+        
+        with self.condition:
+            while self.writer is not None or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        self.local.reads = 1
+        try:
+            yield
+        finally:
+            self.local.reads = 0
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+    
+    @contextlib.contextmanager
+    def write(self):
+        """Hold the lock exclusively for the duration of the with block"""
+        me = threading.get_ident()
+        if self.writer == me:
+            yield
+            return
+        if getattr(self.local, "reads", 0):
+            raise RuntimeError("Cannot upgrade a read lock to a write lock")
+        
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer is not None or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = me
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = None
+                self.condition.notify_all()
@@ -3,8 +3,10 @@ Main Application for Product Inventory List System
 Provides a console-based user interface for managing inventory
 """
 
+import math
+
 from inventory_system import InventorySystem
-from product import Product
+from product import MAX_QUANTITY, Product
 
 
 def print_header():
@@ -33,9 +35,10 @@ def print_menu():
     print("10. Process Order from Queue (Queue)")
     print("11. Display Pending Orders (Queue)")
     print("12. Undo Last Operation (Stack)")
-    print("13. Display Recent Operations (Stack)")
-    print("14. View Inventory Statistics")
-    print("15. Exit")
+    print("13. Redo Last Undone Operation (Stack)")
+    print("14. Display Recent Operations (Stack)")
+    print("15. View Inventory Statistics")
+    print("16. Exit")
     print("-" * 80)
 
 
@@ -54,6 +57,9 @@ def add_product_ui(inventory):
             return
         
         price = float(input("Enter product price: $"))
+        if not math.isfinite(price):
+            print("Error: Price must be a finite number!")
+            return
         if price < 0:
             print("Error: Price cannot be negative!")
             return
@@ -62,6 +68,9 @@ def add_product_ui(inventory):
         if quantity < 0:
             print("Error: Quantity cannot be negative!")
             return
+        if quantity > MAX_QUANTITY:
+            print(f"Error: Quantity cannot exceed {MAX_QUANTITY}!")
+            return
         
         product = inventory.add_product(name, category, price, quantity)
         print(f"\n✓ Product added successfully!")
@@ -162,6 +171,9 @@ def update_quantity_ui(inventory):
         if new_quantity < 0:
             print("Error: Quantity cannot be negative!")
             return
+        if new_quantity > MAX_QUANTITY:
+            print(f"Error: Quantity cannot exceed {MAX_QUANTITY}!")
+            return
         
         if inventory.update_product_quantity(product_id, new_quantity):
             product = inventory.search_product(product_id)
@@ -181,6 +193,9 @@ def update_price_ui(inventory):
     try:
         product_id = int(input("Enter product ID: "))
         new_price = float(input("Enter new price: $"))
+        if not math.isfinite(new_price):
+            print("Error: Price must be a finite number!")
+            return
         if new_price < 0:
             print("Error: Price cannot be negative!")
             return
@@ -210,13 +225,16 @@ def add_order_ui(inventory):
         order = inventory.add_order(product_id, quantity)
         if order:
             print(f"\n✓ Order added to queue successfully!")
+            print(f"  Order ID: {order['order_id']}")
             print(f"  Product: {order['product_name']}")
             print(f"  Quantity: {order['quantity']}")
             print(f"  Total Price: ${order['total_price']:.2f}")
+        elif inventory.order_queue.is_full():
+            print("\n✗ Order queue is full! Process some orders first.")
         else:
             product = inventory.search_product(product_id)
             if product:
-                print(f"\n✗ Insufficient stock! Available: {product.quantity}")
+                print(f"\n✗ Insufficient stock! Available: {inventory.available_quantity(product_id)}")
             else:
                 print(f"\n✗ Product with ID {product_id} not found!")
     except ValueError:
@@ -246,7 +264,7 @@ def display_pending_orders_ui(inventory):
         print(f"\nTotal pending orders: {len(orders)}")
         print("-" * 80)
         for i, order in enumerate(orders, 1):
-            print(f"{i}. Product: {order['product_name']} | "
+            print(f"{i}. Order #{order['order_id']} | Product: {order['product_name']} | "
                   f"Quantity: {order['quantity']} | "
                   f"Total: ${order['total_price']:.2f}")
     else:
@@ -262,6 +280,15 @@ def undo_operation_ui(inventory):
         print("\n✗ No operations to undo!")
 
 
+def redo_operation_ui(inventory):
+    """User interface for redoing the last undone operation"""
+    print("\n--- Redo Last Undone Operation ---")
+    if inventory.redo():
+        print("\n✓ Last undone operation redone successfully!")
+    else:
+        print("\n✗ No operations to redo!")
+
+
 def display_recent_operations_ui(inventory):
     """User interface for displaying recent operations"""
     print("\n--- Recent Operations (Stack) ---")
@@ -279,16 +306,23 @@ def display_recent_operations_ui(inventory):
     if operations:
         print(f"\nRecent {len(operations)} operation(s):")
         print("-" * 80)
-        for i, op in enumerate(operations, 1):
-            op_type = op[0]
+        for i, (op_type, product_id, old_value) in enumerate(operations, 1):
+            if op_type == "transaction":
+                print(f"{i}. TRANSACTION: {len(old_value)} changes")
+                continue
+            if op_type == "add_batch":
+                print(f"{i}. ADD BATCH: {old_value - product_id + 1} products (IDs {product_id}-{old_value})")
+                continue
+            product = inventory.search_product(product_id)
+            label = product.name if product else f"product #{product_id}"
             if op_type == "add":
-                print(f"{i}. ADD: {op[1]}")
+                print(f"{i}. ADD: {product if product else label}")
             elif op_type == "remove":
-                print(f"{i}. REMOVE: {op[1]}")
+                print(f"{i}. REMOVE: ID: {product_id} | Name: {old_value[0]} | Category: {old_value[1]}")
             elif op_type == "update_quantity":
-                print(f"{i}. UPDATE QUANTITY: {op[1].name} (was {op[2]})")
+                print(f"{i}. UPDATE QUANTITY: {label} (was {old_value})")
             elif op_type == "update_price":
-                print(f"{i}. UPDATE PRICE: {op[1].name} (was ${op[2]:.2f})")
+                print(f"{i}. UPDATE PRICE: {label} (was ${old_value:.2f})")
     else:
         print("\nNo recent operations.")
 
@@ -299,6 +333,8 @@ def display_statistics_ui(inventory):
     stats = inventory.get_statistics()
     print(f"\nTotal Products: {stats['total_products']}")
     print(f"Total Quantity: {stats['total_quantity']}")
+    print(f"Reserved by Orders: {stats['reserved_quantity']}")
+    print(f"Available to Order: {stats['available_quantity']}")
     print(f"Total Inventory Value: ${stats['total_value']:.2f}")
     print(f"Number of Categories: {stats['categories']}")
     print(f"Pending Orders in Queue: {stats['pending_orders']}")
@@ -322,7 +358,7 @@ def main():
         print_menu()
         
         try:
-            choice = input("\nEnter your choice (1-15): ").strip()
+            choice = input("\nEnter your choice (1-16): ").strip()
             
             if choice == "1":
                 add_product_ui(inventory)
@@ -349,15 +385,17 @@ def main():
             elif choice == "12":
                 undo_operation_ui(inventory)
             elif choice == "13":
-                display_recent_operations_ui(inventory)
+                redo_operation_ui(inventory)
             elif choice == "14":
-                display_statistics_ui(inventory)
+                display_recent_operations_ui(inventory)
             elif choice == "15":
+                display_statistics_ui(inventory)
+            elif choice == "16":
                 print("\nThank you for using Product Inventory List System!")
                 print("Goodbye!")
                 break
             else:
-                print("\n✗ Invalid choice! Please enter a number between 1-15.")
+                print("\n✗ Invalid choice! Please enter a number between 1-16.")
             
             input("\nPress Enter to continue...")
         
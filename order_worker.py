@@ -0,0 +1,106 @@
+"""
+Order Worker for the Product Inventory System
+Background consumer that drains the order queue in micro-batches
+"""
+
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrderWorker:
+    """Background thread that processes queued orders in batches
+    
+    Each batch takes up to batch_size orders through
+    InventorySystem.process_orders(), so every product's stock is
+    decremented once per batch. When the queue is empty the thread sleeps
+    for interval seconds, or until wake() is called. A batch that raises is
+    logged and counted, and the thread carries on. run_once() processes a
+    single batch on the calling thread, for deterministic use without the
+    thread.
+    """
+    def __init__(self, inventory, batch_size=100, interval=0.05):
+        self.inventory = inventory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.thread = None
+        self.stopping = threading.Event()
+        self.wakeup = threading.Event()
+        
+        # Throughput counters (written only by the processing thread)
+        self.batches = 0
+        self.processed = 0
+        self.rejected = 0
+        self.failed_batches = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+    
+    def run_once(self):
+        """Process one batch and return (processed, rejected) orders"""
+        start = time.perf_counter()
+        processed, rejected = self.inventory.process_orders(self.batch_size)
+        if processed or rejected:
+            self.batches += 1
+            self.processed += len(processed)
+            self.rejected += len(rejected)
+            self.busy_seconds += time.perf_counter() - start
+        return processed, rejected
+    
+    def _run(self):
+        while not self.stopping.is_set():
+            try:
+                processed, rejected = self.run_once()
+            except Exception:
+                # Keep the thread alive, but wait out the interval before retrying
+                self.failed_batches += 1
+                logger.exception("Order batch failed")
+                processed = rejected = None
+            if not processed and not rejected:
+                self.wakeup.wait(self.interval)
+                self.wakeup.clear()
+    
+    def start(self):
+        """Start the background thread (no-op if it is already running)"""
+        if self.is_running():
+            return
+        self.stopping.clear()
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name="order-worker", daemon=True)
+        self.thread.start()
+    
+    def stop(self, timeout=None):
+        """Stop the thread after its current batch and wait for it to exit"""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.wakeup.set()
+        self.thread.join(timeout)
+        self.thread = None
+    
+    def wake(self):
+        """Check the queue now instead of at the end of the idle interval"""
+        self.wakeup.set()
+    
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+    
+    def status(self):
+        """Return the worker's settings and throughput counters"""
+        uptime = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        return {
+            "running": self.is_running(),
+            "batch_size": self.batch_size,
+            "interval_ms": self.interval * 1000,
+            "batches": self.batches,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "failed_batches": self.failed_batches,
+            "pending": len(self.inventory.pending_orders),
+            "average_batch_size": (self.processed + self.rejected) / self.batches if self.batches else 0,
+            "orders_per_second": self.processed / uptime if uptime else 0.0,
+            "busy_orders_per_second": ((self.processed + self.rejected) / self.busy_seconds
+                                       if self.busy_seconds else 0.0)
+        }
@@ -0,0 +1,323 @@
+"""
+Persistence for the Product Inventory System
+Append-only write-ahead log with group commit, plus periodic compacted snapshots
+"""
+
+import glob
+import json
+import os
+import threading
+
+from binary_snapshot import MappedSnapshot, write_binary_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; the data directory is then unlocked
+    fcntl = None
+
+
+SNAPSHOT_FILES = {"json": "snapshot.json", "binary": "snapshot.bin"}
+SEGMENT_PATTERN = "wal-*.log"
+
+
+def _fsync_directory(directory):
+    """Make a rename inside directory durable (best effort on platforms without it)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _segment_start(path):
+    """Return the first log sequence number stored in a segment file"""
+    return int(os.path.basename(path)[4:-4])
+
+
+class WriteAheadLog:
+    """Append-only log of JSON lines with group commit
+    
+    append() writes each record through to the OS, so it survives the
+    process dying; only the fsync is deferred. sync_to(count) blocks until
+    the first count records are on disk: one caller at a time (the leader)
+    fsyncs everything written so far while later callers wait for it, so a
+    single fsync covers every commit that arrived in the meantime. A
+    background thread also fsyncs every sync_interval seconds, and append()
+    syncs inline once sync_batch records are pending; sync_interval=0
+    fsyncs on every append.
+    """
+    def __init__(self, path, sync_interval=0.05, sync_batch=1000):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.sync_batch = sync_batch
+        self.file = open(path, "a", encoding="utf-8")
+        self.appended = 0  # records written to the OS
+        self.synced = 0  # records known to be on disk
+        self.syncing = False
+        self.lock = threading.Lock()
+        self.sync_done = threading.Condition(self.lock)
+        self.closed = threading.Event()
+        self.flusher = None
+        if sync_interval > 0:
+            self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self.flusher.start()
+    
+    def append(self, line):
+        """Append one serialized record to the log and return how many it holds"""
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+            self.appended += 1
+            count = self.appended
+        if self.sync_interval == 0 or count - self.synced >= self.sync_batch:
+            self.sync_to(count)
+        return count
+    
+    def sync_to(self, count):
+        """Block until the first count records are on disk"""
+        with self.lock:
+            while self.synced < count:
+                if not self.syncing:
+                    break
+                self.sync_done.wait()
+            else:
+                return
+            # Lead this round: everything appended so far goes into one fsync
+            self.syncing = True
+            target = self.appended
+        durable = self.synced
+        try:
+            os.fsync(self.file.fileno())
+            durable = target
+        finally:
+            with self.lock:
+                self.syncing = False
+                self.synced = max(self.synced, durable)
+                self.sync_done.notify_all()
+    
+    def sync(self):
+        """Force every appended record to disk"""
+        self.sync_to(self.appended)
+    
+    def _flush_loop(self):
+        while not self.closed.wait(self.sync_interval):
+            self.sync()
+    
+    def close(self):
+        """Sync and close the log"""
+        self.closed.set()
+        if self.flusher is not None:
+            self.flusher.join()
+        with self.lock:
+            while self.syncing:
+                self.sync_done.wait()
+            if self.synced < self.appended:
+                os.fsync(self.file.fileno())
+                self.synced = self.appended
+            self.file.close()
+            self.sync_done.notify_all()
+
+
+class Persistence:
+    """Durable storage for an InventorySystem in a data directory
+    
+    Every journal record gets a log sequence number (LSN) and goes to the
+    current log segment. After snapshot_every records a background thread
+    captures the state, starts a new segment and writes the snapshot; older
+    segments are deleted once it is on disk. Recovery loads the
+    snapshot and replays only the records after its LSN. A change is on
+    disk before the InventorySystem call that made it returns: records go
+    to the OS as they are appended, and committers wait for a shared fsync
+    (see wait_durable()).
+    
+    Snapshots are JSON or, with snapshot_format="binary", the mmap-friendly
+    layout from binary_snapshot.py; an inventory on a MappedStore then
+    serves the snapshot's products straight from the mapping. Only one
+    process may use a data directory at a time.
+    """
+    def __init__(self, directory, snapshot_every=50000, sync_interval=0.05, sync_batch=1000,
+                 snapshot_format="json"):
+        if snapshot_format not in SNAPSHOT_FILES:
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+        self.directory = directory
+        self.snapshot_format = snapshot_format
+        self.snapshot_every = snapshot_every
+        self.sync_interval = sync_interval
+        self.sync_batch = sync_batch
+        self.inventory = None
+        self.wal = None
+        self.lsn = 0
+        self.records_since_snapshot = 0
+        self.snapshot_thread = None
+        
+        os.makedirs(directory, exist_ok=True)
+        self.lock_file = open(os.path.join(directory, "LOCK"), "w")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self.lock_file.close()
+                raise RuntimeError(f"Data directory {directory} is in use by another process")
+    
+    def recover(self, inventory):
+        """Load the latest snapshot and log tail into inventory, then start journaling it"""
+        snapshot_lsn = self._load_snapshot(inventory)
+        self.lsn = snapshot_lsn
+        
+        for path in self._segments():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of the log
+                    if record[0] > snapshot_lsn:
+                        inventory.apply_journal_record(record[1:])
+                        self.lsn = record[0]
+                        self.records_since_snapshot += 1
+        
+        self.inventory = inventory
+        self._open_segment()
+        inventory.journal = self
+        return inventory
+    
+    def _segments(self):
+        """Return the log segment paths in LSN order"""
+        return sorted(glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)), key=_segment_start)
+    
+    def _open_segment(self):
+        """Start a new log segment for records after the current LSN"""
+        if self.wal is not None:
+            self.wal.close()
+        path = os.path.join(self.directory, f"wal-{self.lsn + 1}.log")
+        self.wal = WriteAheadLog(path, self.sync_interval, self.sync_batch)
+    
+    def _load_snapshot(self, inventory):
+        """Load whichever snapshot file exists into inventory and return its LSN"""
+        binary_path = os.path.join(self.directory, SNAPSHOT_FILES["binary"])
+        json_path = os.path.join(self.directory, SNAPSHOT_FILES["json"])
+        if os.path.exists(binary_path):
+            # Not closed here: a MappedStore keeps reading products from it (the
+            # mapping is released once nothing refers to the snapshot any more)
+            snapshot = MappedSnapshot(binary_path)
+            self._load_rows(inventory, snapshot, snapshot.orders(), snapshot.next_id, snapshot.next_order_id)
+            return snapshot.lsn
+        if os.path.exists(json_path):
+            with open(json_path, encoding="utf-8") as f:
+                state = json.load(f)
+            self._load_rows(inventory, state["products"], state["orders"], state["next_id"],
+                            state.get("next_order_id", 1))
+            return state["lsn"]
+        return 0
+    
+    def _load_rows(self, inventory, products, orders, next_id, next_order_id):
+        """Rebuild products, pending orders and both ID counters from snapshot rows"""
+        inventory.load_products(products)
+        for order in orders:
+            inventory.apply_journal_record(["order", order])
+        inventory.next_id = max(inventory.next_id, next_id)
+        # Orders already processed are gone, but their IDs must not be handed out again
+        inventory.next_order_id = max(inventory.next_order_id, next_order_id)
+    
+    def _capture_state(self):
+        """Copy the current inventory state into plain lists (the caller holds off writers)"""
+        inventory = self.inventory
+        return {
+            "lsn": self.lsn,
+            "next_id": inventory.next_id,
+            "next_order_id": inventory.next_order_id,
+            "products": [[p.product_id, p.name, p.category, p.price, p.quantity]
+                         for p in inventory.iter_products()],
+            "orders": inventory.display_pending_orders()
+        }
+    
+    def append(self, record):
+        """Journal hook called by InventorySystem after each physical change"""
+        self.lsn += 1
+        self.wal.append(json.dumps([self.lsn] + record))
+        self.records_since_snapshot += 1
+        if self.records_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+    
+    def wait_durable(self, lsn):
+        """Journal hook: block until every record up to lsn is on disk
+        
+        InventorySystem calls it after a transaction, once the inventory
+        lock is released, so concurrent commits share one fsync.
+        """
+        wal = self.wal
+        if wal is None:
+            return  # Closed, and so synced
+        start = _segment_start(wal.path)
+        if lsn >= start:
+            wal.sync_to(lsn - start + 1)
+        # Earlier records are in older segments, which were synced when closed
+    
+    def snapshot(self, wait=False):
+        """Write a compacted snapshot of the current state in a background thread
+        
+        Returns False if a previous snapshot is still in progress. With wait
+        True, waits for that one and then for the new snapshot to be written.
+        """
+        if self.snapshot_thread is not None and self.snapshot_thread.is_alive():
+            if not wait:
+                return False
+            self.snapshot_thread.join()
+        
+        self.snapshot_thread = threading.Thread(target=self._take_snapshot)
+        self.snapshot_thread.start()
+        if wait:
+            self.snapshot_thread.join()
+        return True
+    
+    def _take_snapshot(self):
+        """Capture the state and switch segments, then write the snapshot
+        
+        Records are only appended under the inventory's write lock, so
+        holding its read lock keeps them out from the capture until the new
+        segment is open: each record is either in the snapshot or in a
+        segment that is kept.
+        """
+        with self.inventory.lock.read():
+            state = self._capture_state()
+            obsolete = self._segments()
+            self._open_segment()
+            self.records_since_snapshot = 0
+        self._write_snapshot(state, obsolete)
+    
+    def _write_snapshot(self, state, obsolete):
+        """Atomically replace the snapshot file, then drop the segments it covers"""
+        path = os.path.join(self.directory, SNAPSHOT_FILES[self.snapshot_format])
+        if self.snapshot_format == "binary":
+            write_binary_snapshot(path, state)
+        else:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        # A snapshot left over in the other format is now stale
+        for snapshot_format, file_name in SNAPSHOT_FILES.items():
+            stale_path = os.path.join(self.directory, file_name)
+            if snapshot_format != self.snapshot_format and os.path.exists(stale_path):
+                os.remove(stale_path)
+        _fsync_directory(self.directory)
+        for segment in obsolete:
+            os.remove(segment)
+    
+    def close(self):
+        """Sync the log and wait for any snapshot in progress"""
+        if self.snapshot_thread is not None:
+            self.snapshot_thread.join()
+        if self.wal is not None:
+            self.wal.close()
+            self.wal = None
+        if self.inventory is not None:
+            self.inventory.journal = None
+        self.lock_file.close()
@@ -3,8 +3,14 @@ Product class definition for the Inventory System
 """
 
 
+# Largest quantity the storage engines can hold (a signed 64-bit integer)
+MAX_QUANTITY = 2 ** 63 - 1
+
+
 class Product:
     """Product class to represent items in the inventory"""
+    __slots__ = ("product_id", "name", "category", "price", "quantity")
+    
     def __init__(self, product_id, name, category, price, quantity):
         self.product_id = product_id
         self.name = name
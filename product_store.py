@@ -0,0 +1,557 @@
+"""
+Product Storage Engines for the Inventory System
+Primary storage behind InventorySystem: a linked list of Product objects, or compact columns
+
+Both engines expose the same interface:
+    insert(product, successor_id)  store a product, return the stored product
+    delete(product_id)             remove a product, return it as a detached Product
+    get(product_id)                stored product or None; updates to it write through
+    set_quantity(product, value)   change a stored product's quantity
+    set_price(product, value)      change a stored product's price
+    snapshot(product_id)           the product's current values or None, safe to read after
+                                   it is removed (for results used outside the inventory lock)
+    successor_id(product_id)       ID of the next product in list order (position hint for undo)
+    page(after_id, limit)          (products with ID > after_id in ID order, has_more)
+    numeric_columns()              (ids, prices, quantities, category codes, category names) arrays
+    iteration, len() and `in`
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left, insort
+
+from data_structures import LinkedList
+from product import Product
+
+
+def _swap_remove(column, position):
+    """Remove column[position] by moving the last element into its place"""
+    last = column.pop()
+    if position < len(column):
+        column[position] = last
+    return last
+
+
+def product_columns(products):
+    """Build numeric_columns() arrays from an iterable of products"""
+    ids, prices, quantities, codes = array('q'), array('d'), array('q'), array('i')
+    names = []
+    code_of = {}
+    for product in products:
+        code = code_of.get(product.category)
+        if code is None:
+            code = code_of[product.category] = len(names)
+            names.append(product.category)
+        ids.append(product.product_id)
+        prices.append(product.price)
+        quantities.append(product.quantity)
+        codes.append(code)
+    return ids, prices, quantities, codes, names
+
+
+class LinkedListStore:
+    """Product storage on a doubly linked list kept in product ID order
+    
+    Products are full Product objects. A product ID -> node hash index gives
+    O(1) lookups and unlinks, and product_array keeps a plain Python list of
+    the same products, with typed numeric columns kept in step with it for
+    numeric_columns(). Quantity and price changes must go through
+    set_quantity() and set_price() so the columns stay current.
+    """
+    def __init__(self):
+        # Linked List for storing products, kept in ascending product ID order
+        self.product_list = LinkedList()
+        
+        # Hash index: product ID -> linked list node (O(1) lookups and unlinks)
+        self.product_index = {}
+        
+        # List for storing all products (Python list)
+        self.product_array = []
+        
+        # Hash index: product ID -> position in product_array (O(1) removal)
+        self.array_positions = {}
+        
+        # Numeric columns in product_array order, so analytics need no pass over the list
+        self.ids = array('q')
+        self.prices = array('d')
+        self.quantities = array('q')
+        self.category_codes = array('i')
+        self.categories = StringDictionary()
+    
+    def insert(self, product, successor_id=None):
+        """Link a product in before successor_id, or at the tail"""
+        # Convert the numeric fields first, so a value that does not fit a
+        # column (TypeError/OverflowError) leaves the store unchanged
+        integers = array('q', (product.product_id, product.quantity))
+        price = array('d', (product.price,))[0]
+        
+        successor = self.product_index.get(successor_id)
+        if successor is None:
+            node = self.product_list.append(product)
+        else:
+            node = self.product_list.insert_before(successor, product)
+        self.product_index[product.product_id] = node
+        self.array_positions[product.product_id] = len(self.product_array)
+        self.product_array.append(product)
+        self.ids.append(integers[0])
+        self.prices.append(price)
+        self.quantities.append(integers[1])
+        self.category_codes.append(self.categories.encode(product.category))
+        return product
+    
+    def delete(self, product_id):
+        """Unlink a product and return it"""
+        node = self.product_index.pop(product_id)
+        position = self.array_positions.pop(product_id)
+        self.categories.release(self.category_codes[position])
+        # Fill the gap with the last element instead of shifting the list and columns
+        last = _swap_remove(self.product_array, position)
+        if position < len(self.product_array):
+            self.array_positions[last.product_id] = position
+        for column in (self.ids, self.prices, self.quantities, self.category_codes):
+            _swap_remove(column, position)
+        return self.product_list.unlink(node)
+    
+    def get(self, product_id):
+        node = self.product_index.get(product_id)
+        return node.data if node is not None else None
+    
+    def snapshot(self, product_id):
+        # Removed products are detached, not reused, so the stored object stays readable
+        return self.get(product_id)
+    
+    def set_quantity(self, product, new_quantity):
+        # Column first: a value that does not fit is rejected before the product changes
+        self.quantities[self.array_positions[product.product_id]] = new_quantity
+        product.update_quantity(new_quantity)
+    
+    def set_price(self, product, new_price):
+        self.prices[self.array_positions[product.product_id]] = new_price
+        product.update_price(new_price)
+    
+    def successor_id(self, product_id):
+        node = self.product_index[product_id].next
+        return node.data.product_id if node is not None else None
+    
+    def page(self, after_id=None, limit=50):
+        """Return up to limit products with IDs greater than after_id, in ID order"""
+        if after_id is None:
+            current = self.product_list.head
+        elif after_id in self.product_index:
+            current = self.product_index[after_id].next
+        else:
+            # The cursor product was removed; resume at the next live ID
+            current = None
+            last_id = self.product_list.tail.data.product_id if self.product_list.tail else 0
+            for product_id in range(max(after_id, 0) + 1, last_id + 1):
+                if product_id in self.product_index:
+                    current = self.product_index[product_id]
+                    break
+        
+        products = []
+        while current is not None and len(products) < limit:
+            products.append(current.data)
+            current = current.next
+        return products, current is not None
+    
+    def numeric_columns(self):
+        """Return the column arrays themselves (dense, in product_array order)"""
+        return self.ids, self.prices, self.quantities, self.category_codes, self.categories.strings
+    
+    def __iter__(self):
+        return iter(self.product_list)
+    
+    def __len__(self):
+        return len(self.product_list)
+    
+    def __contains__(self, product_id):
+        return product_id in self.product_index
+
+
+class StringDictionary:
+    """Dictionary encoding for low-cardinality strings (e.g. categories)
+    
+    Each distinct string gets a small integer code. Codes are reference
+    counted and recycled once no row uses them.
+    """
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+        self.refcounts = array('q')
+        self.free_codes = []
+    
+    def encode(self, text):
+        """Return the code for text, adding a reference"""
+        code = self.codes.get(text)
+        if code is None:
+            if self.free_codes:
+                code = self.free_codes.pop()
+                self.strings[code] = text
+            else:
+                code = len(self.strings)
+                self.strings.append(text)
+                self.refcounts.append(0)
+            self.codes[text] = code
+        self.refcounts[code] += 1
+        return code
+    
+    def release(self, code):
+        """Drop a reference to code, recycling it when unused"""
+        self.refcounts[code] -= 1
+        if self.refcounts[code] == 0:
+            del self.codes[self.strings[code]]
+            self.strings[code] = None
+            self.free_codes.append(code)
+    
+    def __len__(self):
+        return len(self.codes)
+
+
+class ProductView:
+    """Lightweight Product backed by a row of a ColumnarStore
+    
+    Holds only the store and the product ID; fields are read from (and
+    updates written to) the columns on access. Once the product is removed
+    every access raises LookupError, so a stale view can never read or
+    overwrite another product's row.
+    """
+    __slots__ = ("store", "product_id")
+    
+    def __init__(self, store, product_id):
+        self.store = store
+        self.product_id = product_id
+    
+    def _row(self):
+        row = self.store._row(self.product_id)
+        if row < 0:
+            raise LookupError(f"Product {self.product_id} has been removed")
+        return row
+    
+    @property
+    def name(self):
+        return self.store.name_at(self._row())
+    
+    @property
+    def category(self):
+        store = self.store
+        return store.categories.strings[store.category_codes[self._row()]]
+    
+    @property
+    def price(self):
+        return self.store.prices[self._row()]
+    
+    @property
+    def quantity(self):
+        return self.store.quantities[self._row()]
+    
+    def update_quantity(self, new_quantity):
+        """Update the quantity of the product"""
+        self.store.quantities[self._row()] = new_quantity
+    
+    def update_price(self, new_price):
+        """Update the price of the product"""
+        self.store.prices[self._row()] = new_price
+    
+    def __str__(self):
+        return f"ID: {self.product_id} | Name: {self.name} | Category: {self.category} | Price: ${self.price:.2f} | Quantity: {self.quantity}"
+    
+    def __repr__(self):
+        return f"ProductView({self.product_id}, '{self.name}', '{self.category}', {self.price}, {self.quantity})"
+    
+    def __eq__(self, other):
+        if isinstance(other, (Product, ProductView)):
+            return self.product_id == other.product_id
+        return False
+
+
+class ColumnarStore:
+    """Memory-lean product storage in typed array columns
+    
+    Each product is one row across the id/price/quantity columns. Names are
+    UTF-8 bytes in an append-only heap in row order (they are nearly unique, so a
+    dictionary would not shrink them), and categories are dictionary-encoded.
+    row_of is a direct-address table from product ID to row, so lookups are
+    O(1). Deleted rows are tombstoned and reclaimed by compact().
+    
+    get() returns a write-through ProductView; snapshot(), page() and
+    iteration return detached Products, materialized under the caller's
+    lock, since their results are often used after it is released.
+    """
+    TOMBSTONE = -1
+    
+    def __init__(self):
+        self.ids = array('q')
+        self.prices = array('d')
+        self.quantities = array('q')
+        self.name_offsets = array('Q')  # row's name spans offsets[row]..offsets[row + 1]
+        self.category_codes = array('i')
+        self.name_heap = bytearray()
+        self.categories = StringDictionary()
+        
+        # Direct-address table: product ID -> row, -1 if absent
+        self.row_of = array('q')
+        self.end = 0  # one past the highest product ID stored
+        self.live = 0
+    
+    def _row(self, product_id):
+        """Return the row of product_id, or -1"""
+        if 0 <= product_id < len(self.row_of):
+            return self.row_of[product_id]
+        return -1
+    
+    def _name_span(self, row):
+        """Return the (start, end) of a row's name in the heap"""
+        start = self.name_offsets[row]
+        end = self.name_offsets[row + 1] if row + 1 < len(self.name_offsets) else len(self.name_heap)
+        return start, end
+    
+    def name_at(self, row):
+        start, end = self._name_span(row)
+        return self.name_heap[start:end].decode("utf-8")
+    
+    def _materialize(self, row):
+        """Build a detached Product from a row"""
+        return Product(self.ids[row], self.name_at(row),
+                       self.categories.strings[self.category_codes[row]],
+                       self.prices[row], self.quantities[row])
+    
+    def insert(self, product, successor_id=None):
+        """Append a row for product; order comes from the product ID, so successor_id is unused"""
+        # Convert every field before touching a column, so a value that does not
+        # fit (TypeError/OverflowError) cannot leave the columns out of step
+        product_id = product.product_id
+        integers = array('q', (product_id, product.quantity))
+        price = array('d', (product.price,))[0]
+        name = product.name.encode("utf-8")
+        if product_id < 0:
+            raise ValueError("Product IDs must be non-negative")
+        
+        if product_id >= len(self.row_of):
+            # Grow geometrically so inserting ascending IDs stays amortized O(1)
+            grow_to = max(product_id + 1, 2 * len(self.row_of))
+            self.row_of.extend(array('q', [-1]) * (grow_to - len(self.row_of)))
+        
+        category_code = self.categories.encode(product.category)
+        self.end = max(self.end, product_id + 1)
+        self.row_of[product_id] = len(self.ids)
+        self.ids.append(product_id)
+        self.prices.append(price)
+        self.quantities.append(integers[1])
+        self.name_offsets.append(len(self.name_heap))
+        self.category_codes.append(category_code)
+        self.name_heap.extend(name)
+        self.live += 1
+        return ProductView(self, product_id)
+    
+    def delete(self, product_id):
+        """Tombstone a product's row and return it as a detached Product"""
+        row = self.row_of[product_id]
+        product = self._materialize(row)
+        self.categories.release(self.category_codes[row])
+        self.ids[row] = self.TOMBSTONE
+        self.row_of[product_id] = -1
+        self.live -= 1
+        dead = len(self.ids) - self.live
+        if dead > 1024 and dead > self.live:
+            self.compact()
+        return product
+    
+    def compact(self):
+        """Rewrite the columns without tombstoned rows or unused name bytes"""
+        keep = [row for row in range(len(self.ids)) if self.ids[row] != self.TOMBSTONE]
+        heap = bytearray()
+        offsets = array('Q')
+        for row in keep:
+            start, end = self._name_span(row)
+            offsets.append(len(heap))
+            heap.extend(self.name_heap[start:end])
+        
+        self.ids = array('q', (self.ids[row] for row in keep))
+        self.prices = array('d', (self.prices[row] for row in keep))
+        self.quantities = array('q', (self.quantities[row] for row in keep))
+        self.category_codes = array('i', (self.category_codes[row] for row in keep))
+        self.name_offsets = offsets
+        self.name_heap = heap
+        for row, product_id in enumerate(self.ids):
+            self.row_of[product_id] = row
+    
+    def get(self, product_id):
+        return ProductView(self, product_id) if self._row(product_id) >= 0 else None
+    
+    def snapshot(self, product_id):
+        row = self._row(product_id)
+        return self._materialize(row) if row >= 0 else None
+    
+    def set_quantity(self, product, new_quantity):
+        product.update_quantity(new_quantity)
+    
+    def set_price(self, product, new_price):
+        product.update_price(new_price)
+    
+    def successor_id(self, product_id):
+        return None
+    
+    def page(self, after_id=None, limit=50):
+        """Return up to limit products with IDs greater than after_id, in ID order"""
+        products = []
+        product_id = 0 if after_id is None else max(after_id, 0) + 1
+        row_of = self.row_of
+        while product_id < self.end:
+            if row_of[product_id] >= 0:
+                if len(products) == limit:
+                    return products, True
+                products.append(self._materialize(row_of[product_id]))
+            product_id += 1
+        return products, False
+    
+    def numeric_columns(self):
+        """Return the column arrays themselves (tombstoned rows have ID -1)"""
+        return self.ids, self.prices, self.quantities, self.category_codes, self.categories.strings
+    
+    def __iter__(self):
+        row_of = self.row_of
+        for product_id in range(self.end):
+            row = row_of[product_id]
+            if row >= 0:
+                yield self._materialize(row)
+    
+    def __len__(self):
+        return self.live
+    
+    def __contains__(self, product_id):
+        return self._row(product_id) >= 0
+
+
+class MappedStore:
+    """Product storage layered over a memory-mapped binary snapshot
+    
+    attach() makes the records of a MappedSnapshot (see binary_snapshot.py)
+    the starting contents without reading them; a record becomes a Product
+    only when it is first fetched with get(), so a worker can serve reads as
+    soon as the file is mapped. Fetched and newly inserted products are kept
+    in a dict by ID, and removed snapshot records are remembered by ID.
+    Reads that do not go through get() (snapshot(), page(), iteration)
+    decode records without keeping them. Without a snapshot it is a plain
+    dict of products kept in ID order.
+    """
+    def __init__(self):
+        self.base = None
+        
+        # Product ID -> Product, for fetched and inserted products
+        self.products = {}
+        
+        # IDs of snapshot records that have been removed
+        self.removed = set()
+        
+        # Sorted IDs of products that are not in the snapshot
+        self.added_ids = []
+        self.live = 0
+    
+    def attach(self, snapshot):
+        """Start from the records of snapshot; only valid while the store is empty"""
+        if self.live:
+            raise ValueError("Can only attach a snapshot to an empty store")
+        self.base = snapshot
+        self.live = len(snapshot)
+    
+    def _base_index(self, product_id):
+        """Return the index of product_id's snapshot record, or -1"""
+        return self.base.index(product_id) if self.base is not None else -1
+    
+    def insert(self, product, successor_id=None):
+        """Store product; order comes from the product ID, so successor_id is unused"""
+        # Reject values a snapshot record (and numeric_columns()) cannot hold, as the other engines do
+        array('q', (product.product_id, product.quantity))
+        array('d', (product.price,))
+        product_id = product.product_id
+        self.products[product_id] = product
+        if self._base_index(product_id) >= 0:
+            self.removed.discard(product_id)
+        else:
+            insort(self.added_ids, product_id)
+        self.live += 1
+        return product
+    
+    def delete(self, product_id):
+        """Remove a product and return it"""
+        product = self.get(product_id)
+        del self.products[product_id]
+        if self._base_index(product_id) >= 0:
+            self.removed.add(product_id)
+        else:
+            del self.added_ids[bisect_left(self.added_ids, product_id)]
+        self.live -= 1
+        return product
+    
+    def get(self, product_id):
+        product = self.products.get(product_id)
+        if product is None and product_id not in self.removed:
+            index = self._base_index(product_id)
+            if index >= 0:
+                product = self.products[product_id] = Product(*self.base.record(index))
+        return product
+    
+    def snapshot(self, product_id):
+        product = self.products.get(product_id)
+        if product is None and product_id not in self.removed:
+            index = self._base_index(product_id)
+            if index >= 0:
+                product = Product(*self.base.record(index))
+        return product
+    
+    def set_quantity(self, product, new_quantity):
+        array('q', (new_quantity,))
+        product.update_quantity(new_quantity)
+    
+    def set_price(self, product, new_price):
+        array('d', (new_price,))
+        product.update_price(new_price)
+    
+    def successor_id(self, product_id):
+        return None
+    
+    def _products_after(self, after_id):
+        """Yield the products with IDs greater than after_id, in ID order"""
+        start = 0 if after_id is None else max(after_id, 0) + 1
+        added = ((product_id, -1) for product_id in
+                 self.added_ids[bisect_left(self.added_ids, start):])
+        if self.base is None:
+            entries = added
+        else:
+            base = self.base
+            stored = ((base.id_at(index), index) for index in range(base.lower_bound(start), len(base)))
+            entries = heapq.merge(stored, added)
+        for product_id, index in entries:
+            product = self.products.get(product_id)
+            if product is None:
+                if product_id in self.removed:
+                    continue
+                product = Product(*self.base.record(index))
+            yield product
+    
+    def page(self, after_id=None, limit=50):
+        """Return up to limit products with IDs greater than after_id, in ID order"""
+        products = []
+        for product in self._products_after(after_id):
+            if len(products) == limit:
+                return products, True
+            products.append(product)
+        return products, False
+    
+    def numeric_columns(self):
+        """Copy the numeric fields into typed arrays (one pass over the products)"""
+        return product_columns(self)
+    
+    def __iter__(self):
+        return self._products_after(None)
+    
+    def __len__(self):
+        return self.live
+    
+    def __contains__(self, product_id):
+        if product_id in self.products:
+            return True
+        return product_id not in self.removed and self._base_index(product_id) >= 0
+
+
+STORES = {"linked": LinkedListStore, "columnar": ColumnarStore, "mapped": MappedStore}
@@ -0,0 +1,99 @@
+"""
+Tests for the Inventory Analytics
+The NumPy path must match the pure-Python reference on every storage engine
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import math
+import random
+import unittest
+
+import analytics
+from inventory_system import InventorySystem
+from product import MAX_QUANTITY
+from product_store import STORES
+
+
+def assert_results_match(test, expected, actual, path="analytics"):
+    """Compare analytics results, allowing float rounding differences"""
+    if isinstance(expected, dict):
+        test.assertEqual(expected.keys(), actual.keys(), path)
+        for key in expected:
+            assert_results_match(test, expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, float) or isinstance(actual, float):
+        test.assertTrue(math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-6),
+                        f"{path}: {expected} != {actual}")
+    else:
+        test.assertEqual(expected, actual, path)
+
+
+def churned_inventory(engine, count=2000, seed=7):
+    """Return an inventory on engine after a random mix of adds, removals and updates"""
+    rng = random.Random(seed)
+    inventory = InventorySystem(store=STORES[engine]())
+    categories = ["Electronics", "electronics", "Furniture", "Books", "Toys"]
+    for i in range(count):
+        inventory.add_product(f"Product {i}", rng.choice(categories),
+                              round(rng.uniform(0.5, 500), 2), rng.randint(0, 40))
+    ids = [product.product_id for product in inventory.iter_products()]
+    rng.shuffle(ids)
+    for product_id in ids[:count // 4]:
+        inventory.remove_product(product_id)
+    for product_id in ids[count // 4:count // 2]:
+        inventory.update_product_quantity(product_id, rng.randint(0, 40))
+        inventory.update_product_price(product_id, round(rng.uniform(0.5, 500), 2))
+    inventory.undo(50)
+    return inventory
+
+
+@unittest.skipIf(analytics.np is None, "NumPy is not installed")
+class VectorizedAnalyticsTest(unittest.TestCase):
+    def test_matches_reference_on_every_engine(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                inventory = churned_inventory(engine)
+                expected = analytics.compute_reference(inventory.backend)
+                assert_results_match(self, expected, inventory.analytics())
+                assert_results_match(self, analytics.compute_reference(inventory.backend, 20),
+                                     inventory.analytics(20))
+    
+    def test_empty_inventory(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                inventory = InventorySystem(store=STORES[engine]())
+                self.assertEqual(analytics.compute_reference(inventory.backend), inventory.analytics())
+    
+    def test_largest_quantity(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                inventory = InventorySystem(store=STORES[engine]())
+                inventory.add_product("Bulk", "Bolts", 0.01, MAX_QUANTITY)
+                self.assertEqual(inventory.analytics()["total_quantity"], MAX_QUANTITY)
+
+
+class NumericColumnsTest(unittest.TestCase):
+    def test_linked_columns_follow_changes(self):
+        inventory = churned_inventory("linked", count=500)
+        ids, prices, quantities, codes, names = inventory.backend.numeric_columns()
+        rows = sorted((ids[row], prices[row], quantities[row], names[codes[row]]) for row in range(len(ids)))
+        expected = [(product.product_id, product.price, product.quantity, product.category)
+                    for product in inventory.iter_products()]
+        self.assertEqual(rows, expected)
+    
+    def test_rejected_quantity_leaves_store_unchanged(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                inventory = InventorySystem(store=STORES[engine]())
+                product = inventory.add_product("Widget", "Parts", 2.5, 4)
+                with self.assertRaises(OverflowError):
+                    inventory.add_product("Too many", "Parts", 1.0, MAX_QUANTITY + 1)
+                with self.assertRaises(OverflowError):
+                    inventory.update_product_quantity(product.product_id, MAX_QUANTITY + 1)
+                self.assertEqual([p.product_id for p in inventory.iter_products()], [product.product_id])
+                self.assertEqual(inventory.search_product(product.product_id).quantity, 4)
+                self.assertTrue(inventory.verify_statistics())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,274 @@
+"""
+Tests for the Flask Web Application
+Endpoints are driven through Flask's test client against a fresh inventory
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import json
+import time
+import unittest
+from unittest import mock
+
+import app
+from inventory_system import InventorySystem
+from json_cache import ProductJSONCache
+
+
+class AppTestCase(unittest.TestCase):
+    """Runs each test on a new in-memory inventory seeded with the demo products"""
+    inventory_options = {}
+    
+    def setUp(self):
+        inventory = InventorySystem(**self.inventory_options)
+        json_cache = ProductJSONCache()
+        inventory.change_listeners.append(json_cache.invalidate)
+        for name, value in (("inventory", inventory), ("json_cache", json_cache)):
+            patcher = mock.patch.object(app, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        app.init_sample_data()
+        self.inventory = inventory
+        self.client = app.app.test_client()
+
+
+class OrderDeadlineTest(AppTestCase):
+    inventory_options = {"priority_orders": True}
+    
+    def test_non_finite_deadlines_are_rejected(self):
+        for deadline in ("nan", "inf", "-Infinity", float("nan"), float("inf")):
+            with self.subTest(deadline=deadline):
+                response = self.client.post("/api/orders", json={"product_id": 1, "quantity": 1,
+                                                                 "deadline": deadline})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("finite", response.get_json()["error"])
+        response = self.client.post("/api/orders", data='{"product_id": 1, "quantity": 1, "deadline": NaN}',
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.inventory.pending_orders, {})
+    
+    def test_non_finite_priority_is_rejected(self):
+        response = self.client.post("/api/orders", data='{"product_id": 1, "quantity": 1, "priority": 1e999}',
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+    
+    def test_deadline_expires_the_order(self):
+        response = self.client.post("/api/orders", json={"product_id": 1, "quantity": 4,
+                                                         "deadline": time.time() + 0.05})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.inventory.available_quantity(1), 6)
+        time.sleep(0.1)
+        self.assertEqual(self.inventory.expire_orders(), 1)
+        self.assertEqual(self.inventory.available_quantity(1), 10)
+    
+    def test_process_rejects_non_finite_budget(self):
+        for deadline_ms in ("nan", "inf", "1e999"):
+            with self.subTest(deadline_ms=deadline_ms):
+                response = self.client.post(f"/api/orders/process?max=5&deadline_ms={deadline_ms}")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post("/api/orders/process?max=5&deadline_ms=50").status_code, 200)
+
+
+class ETagTest(AppTestCase):
+    def get(self, url, etag=None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return self.client.get(url, headers=headers)
+    
+    def test_unchanged_resources_are_not_modified(self):
+        for url in ("/api/products", "/api/products?limit=2", "/api/products/category/Furniture",
+                    "/api/statistics"):
+            with self.subTest(url=url):
+                first = self.get(url)
+                self.assertEqual(first.status_code, 200)
+                etag = first.headers["ETag"]
+                again = self.get(url, etag)
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.data, b"")
+                self.assertEqual(again.headers["ETag"], etag)
+    
+    def test_writes_change_the_etag(self):
+        etag = self.get("/api/products").headers["ETag"]
+        self.client.put("/api/products/1/quantity", json={"quantity": 7})
+        response = self.get("/api/products", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.get_json()["products"][0]["quantity"], 7)
+    
+    def test_category_etag_ignores_other_categories(self):
+        url = "/api/products/category/furniture"
+        etag = self.get(url).headers["ETag"]
+        self.client.put("/api/products/1/price", json={"price": 899.99})  # Electronics
+        self.assertEqual(self.get(url, etag).status_code, 304)
+        self.client.put("/api/products/4/price", json={"price": 149.99})  # Desk Chair
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["products"][0]["price"], 149.99)
+    
+    def test_orders_change_the_statistics_etag(self):
+        etag = self.get("/api/statistics").headers["ETag"]
+        products_etag = self.get("/api/products").headers["ETag"]
+        self.client.post("/api/orders", json={"product_id": 1, "quantity": 2})
+        response = self.get("/api/statistics", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["statistics"]["reserved_quantity"], 2)
+        # Orders do not change the products themselves
+        self.assertEqual(self.get("/api/products", products_etag).status_code, 304)
+
+
+class FragmentCacheTest(AppTestCase):
+    def products(self, url="/api/products"):
+        return {p["product_id"]: p for p in self.client.get(url).get_json()["products"]}
+    
+    def test_list_responses_follow_writes(self):
+        self.assertEqual(self.products()[2]["price"], 29.99)
+        self.assertEqual(len(app.json_cache), 5)  # Every fragment is cached now
+        
+        self.client.put("/api/products/2/price", json={"price": 19.99})
+        self.client.put("/api/products/3/quantity", json={"quantity": 0})
+        products = self.products()
+        self.assertEqual(products[2]["price"], 19.99)
+        self.assertEqual(products[3]["quantity"], 0)
+        self.assertEqual(self.products("/api/products/category/electronics")[2]["price"], 19.99)
+        
+        self.client.delete("/api/products/2")
+        self.assertNotIn(2, self.products())
+        self.client.post("/api/operations/undo")
+        self.assertEqual(self.products()[2]["price"], 19.99)
+        self.client.post("/api/operations/undo?steps=2")
+        products = self.products()
+        self.assertEqual((products[2]["price"], products[3]["quantity"]), (29.99, 30))
+    
+    def test_export_uses_fresh_fragments(self):
+        self.client.get("/api/products")
+        self.client.put("/api/products/5/price", json={"price": 59.99})
+        lines = self.client.get("/api/products/export").data.splitlines()
+        self.assertIn(b'"price":59.99', lines[4])
+
+
+class CursorPagingTest(AppTestCase):
+    def page(self, **params):
+        response = self.client.get("/api/products", query_string=params)
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        return [p["product_id"] for p in body["products"]], body["next_cursor"]
+    
+    def test_pages_cover_the_catalog_once(self):
+        seen = []
+        ids, cursor = self.page(limit=2)
+        while True:
+            seen.append(ids)
+            if cursor is None:
+                break
+            ids, cursor = self.page(limit=2, cursor=cursor)
+        self.assertEqual(seen, [[1, 2], [3, 4], [5]])
+    
+    def test_exact_last_page_has_no_cursor(self):
+        self.assertEqual(self.page(limit=5), ([1, 2, 3, 4, 5], None))
+        ids, cursor = self.page(limit=4)
+        self.assertEqual(self.page(limit=4, cursor=cursor), ([5], None))
+    
+    def test_cursor_survives_changes_between_pages(self):
+        ids, cursor = self.page(limit=2)
+        self.client.delete("/api/products/2")  # The cursor's own product
+        self.client.delete("/api/products/3")
+        self.client.post("/api/products", json={"name": "Lamp", "category": "Lighting",
+                                                "price": 20.0, "quantity": 3})
+        self.assertEqual(self.page(limit=2, cursor=cursor), ([4, 5], app.encode_cursor(5)))
+        self.assertEqual(self.page(limit=2, cursor=app.encode_cursor(5)), ([6], None))
+    
+    def test_page_size_is_capped(self):
+        with mock.patch.object(app, "MAX_PAGE_SIZE", 2):
+            self.assertEqual(self.page(limit=1000), ([1, 2], app.encode_cursor(2)))
+    
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"limit": 0}, {"limit": -1}, {"limit": "ten"}, {"cursor": "!!!"},
+                       {"cursor": "cDo"}, {"cursor": app.encode_cursor(1)[:-1] + "*"},
+                       {"cursor": "eDox"}):  # "x:1"
+            with self.subTest(params=params):
+                response = self.client.get("/api/products", query_string=params)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()["success"])
+    
+    def test_empty_cursor_starts_from_the_beginning(self):
+        self.assertEqual(self.page(limit=2, cursor=""), ([1, 2], app.encode_cursor(2)))
+
+
+class ExportTest(AppTestCase):
+    def test_ndjson_is_the_default(self):
+        response = self.client.get("/api/products/export")
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        rows = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual(rows, self.client.get("/api/products").get_json()["products"])
+        self.assertTrue(response.data.endswith(b"\n"))
+    
+    def test_json_matches_the_product_list(self):
+        response = self.client.get("/api/products/export?format=json")
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(response.get_json(), self.client.get("/api/products").get_json())
+    
+    def test_empty_catalog(self):
+        for product_id in range(1, 6):
+            self.client.delete(f"/api/products/{product_id}")
+        self.assertEqual(self.client.get("/api/products/export").data, b"")
+        response = self.client.get("/api/products/export?format=json")
+        self.assertEqual(response.get_json(), {"products": [], "success": True})
+    
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get("/api/products/export?format=csv")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ndjson", response.get_json()["error"])
+
+
+class BulkAddTest(AppTestCase):
+    def post(self, body, content_type="application/json"):
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        return self.client.post("/api/products/bulk", data=body, content_type=content_type)
+    
+    def test_invalid_rows_are_reported_and_the_rest_added(self):
+        response = self.post([
+            {"name": "Lamp", "category": "Lighting", "price": 20.0, "quantity": 3},
+            {"name": "", "category": "Lighting", "price": 20.0, "quantity": 3},
+            {"name": "Desk", "category": "Furniture", "price": -1, "quantity": 1},
+            "Chair",
+            {"name": "Bulb", "category": "Lighting", "price": 2.5, "quantity": 10}
+        ])
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body["added"], 2)
+        self.assertEqual([(p["product_id"], p["name"]) for p in body["products"]], [(6, "Lamp"), (7, "Bulb")])
+        self.assertEqual([error["row"] for error in body["errors"]], [1, 2, 3])
+        self.assertEqual(len(self.inventory.backend), 7)
+    
+    def test_ndjson_with_a_malformed_line(self):
+        body = ('{"name": "Lamp", "category": "Lighting", "price": 20.0, "quantity": 3}\n'
+                '\n'
+                '{"name": "Desk", "category": \n'
+                '[1, 2]\n'
+                '{"name": "Bulb", "category": "Lighting", "price": 2.5, "quantity": 10}\n')
+        response = self.post(body, "application/x-ndjson")
+        body = response.get_json()
+        self.assertEqual(body["added"], 2)
+        # Blank lines are skipped, so rows count the non-blank lines
+        self.assertEqual([error["row"] for error in body["errors"]], [1, 2])
+        self.assertIn("Invalid JSON", body["errors"][0]["error"])
+    
+    def test_batch_with_no_valid_rows_adds_nothing(self):
+        response = self.post({"products": [{"name": "Lamp"}, {"price": 1}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.get_json()["added"], len(response.get_json()["errors"])), (0, 2))
+        self.assertEqual(len(self.inventory.backend), 5)
+    
+    def test_batch_is_one_undo_step(self):
+        self.post([{"name": f"Pen {i}", "category": "Office", "price": 1.0, "quantity": 5} for i in range(3)])
+        self.assertEqual(self.client.post("/api/operations/undo").get_json()["undone"], 1)
+        self.assertEqual(len(self.inventory.backend), 5)
+    
+    def test_malformed_requests_are_rejected(self):
+        for body in ([], {"products": []}, {"name": "Lamp"}, "not json"):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Tests for the Storage Backends of the Product Inventory System
+The SQLite backend's triggers, versions, conditional updates and connection pool,
+and the inventory tests rerun on a SQLite database
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+import test_inventory_system as suite
+from backends import SQLiteBackend
+from inventory_system import InventorySystem
+from product import Product
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """Opens backends on a database in a temporary directory"""
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.database = os.path.join(directory.name, "inventory.db")
+        super().setUp()  # After the database is named: the rerun tests' setUp may use it
+    
+    def open_backend(self, pool_size=4):
+        backend = SQLiteBackend(self.database, pool_size)
+        self.addCleanup(backend.close)
+        return backend
+    
+    def make_inventory(self, **options):
+        return InventorySystem(backend=self.open_backend(), **options)
+
+
+class SQLiteBackendTest(SQLiteTestCase):
+    def insert(self, backend, name, category, price, quantity):
+        return backend.insert(Product(backend.allocate_id(), name, category, price, quantity))
+    
+    def test_counters_follow_every_change(self):
+        backend = self.open_backend()
+        lamp = self.insert(backend, "Lamp", "Lighting", 20.0, 3)
+        self.insert(backend, "Desk", "Furniture", 150.0, 2)
+        self.insert(backend, "Bulb", "LIGHTING", 2.5, 10)
+        self.assertEqual(backend.statistics(), {
+            "total_products": 3, "total_quantity": 15, "total_value": 385.0, "categories": 2})
+        
+        backend.set_quantity(lamp, 5)
+        backend.set_price(lamp, 10.0)
+        self.assertEqual(backend.statistics()["total_quantity"], 17)
+        self.assertEqual(backend.statistics()["total_value"], 375.0)
+        backend.delete(2)
+        self.assertEqual(backend.statistics(), {
+            "total_products": 2, "total_quantity": 15, "total_value": 75.0, "categories": 1})
+        backend.delete(1)
+        backend.delete(3)
+        self.assertEqual(backend.statistics(), {
+            "total_products": 0, "total_quantity": 0, "total_value": 0.0, "categories": 0})
+        self.assertEqual(len(backend), 0)
+    
+    def test_counters_are_shared_between_processes(self):
+        self.insert(self.open_backend(), "Lamp", "Lighting", 20.0, 3)
+        other = self.open_backend()  # Another worker opening the same database
+        self.assertEqual(other.statistics()["total_products"], 1)
+        self.assertEqual(other.allocate_id(), 2)
+    
+    def test_versions(self):
+        backend = self.open_backend()
+        lamp = self.insert(backend, "Lamp", "Lighting", 20.0, 3)
+        self.insert(backend, "Desk", "Furniture", 150.0, 2)
+        self.assertEqual(backend.version, 2)
+        self.assertEqual(backend.category_version("lighting"), 1)
+        self.assertEqual(backend.category_version("Furniture"), 2)
+        self.assertEqual(backend.category_version("Toys"), 0)
+        
+        backend.set_quantity(lamp, 4)
+        self.assertEqual(backend.version, 3)
+        self.assertEqual(backend.category_version("LIGHTING"), 3)
+        self.assertEqual(backend.category_version("Furniture"), 2)
+        backend.delete(2)
+        self.assertEqual(backend.category_version("Furniture"), 4)  # Outlives the category
+        # The epoch is fixed for the life of the database
+        self.assertEqual(self.open_backend().epoch, backend.epoch)
+    
+    def test_take_stock_only_takes_what_is_there(self):
+        backend = self.open_backend()
+        lamp = self.insert(backend, "Lamp", "Lighting", 20.0, 3)
+        version = backend.version
+        self.assertFalse(backend.take_stock(lamp, 4))
+        self.assertEqual(backend.get(1).quantity, 3)
+        self.assertEqual(backend.version, version)  # No row changed
+        
+        stale = backend.get(1)
+        self.assertTrue(backend.take_stock(lamp, 2))
+        # The check runs against the row, not the caller's copy
+        self.assertFalse(backend.take_stock(stale, 3))
+        self.assertTrue(backend.take_stock(stale, 1))
+        self.assertEqual(stale.quantity, 0)
+        self.assertEqual(backend.statistics()["total_quantity"], 0)
+    
+    def test_pool_shares_connections_between_threads(self):
+        backend = self.open_backend(pool_size=2)
+        self.insert(backend, "Lamp", "Lighting", 20.0, 100)
+        taken = []
+        
+        def buyer():
+            lamp = backend.get(1)
+            for _ in range(30):
+                if backend.take_stock(lamp, 1):
+                    taken.append(1)
+        
+        threads = [threading.Thread(target=buyer) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(taken), 100)
+        self.assertEqual(backend.get(1).quantity, 0)
+        self.assertLessEqual(backend.pool.opened, 2)
+    
+    def test_nested_transactions_join_the_outer_one(self):
+        backend = self.open_backend()
+        with self.assertRaises(ValueError):
+            with backend.transaction():
+                self.insert(backend, "Lamp", "Lighting", 20.0, 3)
+                with backend.transaction():
+                    self.insert(backend, "Desk", "Furniture", 150.0, 2)
+                raise ValueError("abort")
+        self.assertEqual(len(backend), 0)
+        self.assertEqual(backend.version, 0)
+    
+    def test_rolled_back_order_ids_are_not_reused(self):
+        backend = self.open_backend()
+        with self.assertRaises(ValueError):
+            with backend.transaction():
+                self.assertEqual(backend.allocate_order_id(), 1)
+                self.assertEqual(backend.allocate_order_id(), 2)
+                raise ValueError("abort")
+        self.assertEqual(backend.allocate_order_id(), 3)
+    
+    def test_orders_kept_after_a_failed_transaction_keep_unique_ids(self):
+        inventory = self.make_inventory()
+        inventory.add_product("Lamp", "Lighting", 20.0, 10)
+        with self.assertRaises(ValueError):
+            with inventory.transaction():
+                kept = inventory.add_order(1, 2)
+                raise ValueError("abort")
+        # Pending orders are not rolled back, so their IDs stay taken
+        self.assertIn(kept["order_id"], inventory.pending_orders)
+        self.assertNotEqual(inventory.add_order(1, 1)["order_id"], kept["order_id"])
+        self.assertEqual(len(inventory.pending_orders), 2)
+
+
+# The inventory tests, on a SQLite backend
+class SQLiteTransactionUndoTest(SQLiteTestCase, suite.TransactionUndoTest):
+    pass
+
+
+class SQLiteUndoBudgetTest(SQLiteTestCase, suite.UndoBudgetTest):
+    pass
+
+
+class SQLiteOrderReservationTest(SQLiteTestCase, suite.OrderReservationTest):
+    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
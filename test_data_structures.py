@@ -0,0 +1,218 @@
+"""
+Tests for the Data Structures of the Product Inventory System
+Indexes are checked against brute-force scans, queues against sorted copies
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import random
+import unittest
+
+from data_structures import BoundedStack, NGramIndex, PrefixIndex, PriorityQueue, Queue
+
+
+WORDS = ["laptop", "lamp", "lamb", "la", "l", "mouse", "mousepad", "desk", "desk lamp", "café", ""]
+
+
+class PrefixIndexTest(unittest.TestCase):
+    def brute_force(self, entries, prefix, limit=None):
+        keys = [key for text, key in sorted(entries) if text.startswith(prefix)]
+        return keys if limit is None else keys[:limit]
+    
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        index = PrefixIndex()
+        entries = set()
+        for step in range(3000):
+            if entries and rng.random() < 0.4:
+                text, key = rng.choice(sorted(entries))
+                index.remove(text, key)
+                entries.discard((text, key))
+            else:
+                # Keys arrive out of order, as they do when undo restores a product
+                text, key = rng.choice(WORDS) + rng.choice(["", "s", "top", " pro"]), rng.randrange(10 ** 6)
+                if (text, key) in entries:
+                    continue
+                entries.add((text, key))
+                index.insert(text, key)
+            if step % 50 == 0:
+                self.assertEqual(len(index), len(entries))
+                for prefix in ["", "l", "la", "lam", "lamp", "mo", "desk ", "café", "x", "\U0010ffff"]:
+                    self.assertEqual(index.starts_with(prefix), self.brute_force(entries, prefix), prefix)
+                    self.assertEqual(index.starts_with(prefix, 3), self.brute_force(entries, prefix, 3), prefix)
+    
+    def test_ties_are_ordered_by_key(self):
+        index = PrefixIndex()
+        for key in (7, 3, 9, 1):
+            index.insert("desk", key)
+        index.insert("desk lamp", 2)
+        self.assertEqual(index.starts_with("desk"), [1, 3, 7, 9, 2])
+        self.assertEqual(index.starts_with("desk", 2), [1, 3])
+        index.remove("desk", 3)
+        self.assertEqual(index.starts_with("de", 3), [1, 7, 9])
+    
+    def test_built_from_items(self):
+        items = [("mouse", 4), ("lamp", 2), ("lamp", 1), ("laptop", 3)]
+        index = PrefixIndex(items)
+        self.assertEqual(index.starts_with("la"), [1, 2, 3])
+        index.insert("lamb", 5)
+        self.assertEqual(index.starts_with(""), [5, 1, 2, 3, 4])
+
+
+class NGramIndexTest(unittest.TestCase):
+    def search(self, index, query):
+        candidates = index.candidates(query)
+        if index.is_exact(query):
+            return candidates
+        return [key for key in candidates if query in self.texts[key]]
+    
+    def test_matches_brute_force(self):
+        rng = random.Random(2)
+        index = NGramIndex(3)
+        self.texts = {}
+        removed = {}
+        for step in range(4000):
+            action = rng.random()
+            if self.texts and action < 0.3:
+                key = rng.choice(sorted(self.texts))
+                index.remove(key, self.texts[key])
+                removed[key] = self.texts.pop(key)
+            elif removed and action < 0.4:
+                # Re-add a removed key, as undo does, possibly before compaction
+                key = rng.choice(sorted(removed))
+                self.texts[key] = removed.pop(key)
+                index.add(key, self.texts[key])
+            else:
+                self.texts[step] = " ".join(rng.choice(WORDS) for _ in range(2))
+                index.add(step, self.texts[step])
+            if step % 100 == 0:
+                for query in ["lam", "lamp", "desk lamp", "use", "afé", "mouse mouse", "zzz"]:
+                    self.assertTrue(index.is_searchable(query))
+                    expected = sorted(key for key, text in self.texts.items() if query in text)
+                    self.assertEqual(self.search(index, query), expected, query)
+    
+    def test_short_queries_are_not_searchable(self):
+        index = NGramIndex(3)
+        index.add(1, "lamp")
+        self.assertFalse(index.is_searchable("la"))
+        self.assertFalse(index.is_searchable(""))
+        self.assertTrue(index.is_exact("lam"))
+        self.assertEqual(index.candidates("lam"), [1])
+    
+    def test_compaction_reclaims_postings(self):
+        index = NGramIndex(3)
+        for key in range(100):
+            index.add(key, f"product {key}")
+        for key in range(100):
+            index.remove(key, f"product {key}")
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.entries, 0)
+        self.assertEqual(index.candidates("pro"), [])
+
+
+def check_pages(test, queue, expected):
+    """Check iteration, display() and page() against the expected dispatch order"""
+    test.assertEqual(list(queue), expected)
+    test.assertEqual(queue.display(), expected)
+    for offset in (0, 1, 5, len(expected) - 1, len(expected), len(expected) + 3):
+        for limit in (None, 1, 4, 100):
+            stop = None if limit is None else offset + limit
+            test.assertEqual(queue.page(offset, limit), expected[offset:stop], (offset, limit))
+
+
+class QueueTest(unittest.TestCase):
+    def test_ring_buffer_wraps_and_grows(self):
+        queue = Queue()
+        expected = []
+        for item in range(40):
+            queue.enqueue(item)
+            expected.append(item)
+            if item % 3 == 0:
+                # Dequeue now and then, so the ring buffer wraps around
+                self.assertEqual(queue.dequeue(), expected.pop(0))
+        check_pages(self, queue, expected)
+        while expected:
+            self.assertEqual(queue.dequeue(), expected.pop(0))
+        self.assertTrue(queue.is_empty())
+    
+    def test_remove_where_keeps_order(self):
+        queue = Queue()
+        for item in range(20):
+            queue.enqueue(item)
+        self.assertEqual(queue.remove_where(lambda item: item % 2), list(range(1, 20, 2)))
+        check_pages(self, queue, list(range(0, 20, 2)))
+    
+    def test_bounded_queue(self):
+        queue = Queue(capacity=2)
+        queue.enqueue(1)
+        queue.enqueue(2)
+        self.assertTrue(queue.is_full())
+        with self.assertRaises(IndexError):
+            queue.enqueue(3)
+        queue.dequeue()
+        queue.enqueue(3)
+        self.assertEqual(queue.display(), [2, 3])
+
+
+class PriorityQueueTest(unittest.TestCase):
+    def test_pages_follow_dispatch_order(self):
+        rng = random.Random(3)
+        queue = PriorityQueue(key=lambda item: item[0])
+        items = []
+        for arrival in range(300):
+            item = (rng.randint(0, 9), arrival)
+            queue.enqueue(item)
+            items.append(item)
+        for _ in range(50):
+            items.remove(queue.dequeue())
+        # Equal keys leave in arrival order, which sorting (key, arrival) reproduces
+        check_pages(self, queue, sorted(items))
+    
+    def test_remove_where_keeps_order(self):
+        queue = PriorityQueue(key=lambda item: -item)
+        for item in range(20):
+            queue.enqueue(item)
+        self.assertEqual(queue.remove_where(lambda item: item % 2), list(range(19, 0, -2)))
+        check_pages(self, queue, list(range(18, -1, -2)))
+    
+    def test_bounded_queue(self):
+        queue = PriorityQueue(key=lambda item: item, capacity=2)
+        queue.enqueue(2)
+        queue.enqueue(1)
+        self.assertTrue(queue.is_full())
+        with self.assertRaises(IndexError):
+            queue.enqueue(3)
+        self.assertEqual(queue.dequeue(), 1)
+
+
+class BoundedStackTest(unittest.TestCase):
+    def test_drops_oldest_when_full(self):
+        stack = BoundedStack(3)
+        for item in range(5):
+            stack.push(item)
+        self.assertEqual(stack.display(), [2, 3, 4])
+        self.assertEqual(stack.pop(), 4)
+        self.assertEqual(stack.recent(5), [3, 2])
+    
+    def test_weight_budget(self):
+        stack = BoundedStack(10, weight=len)
+        stack.push("aaaa")
+        stack.push("bbbb")
+        stack.push("cc")
+        self.assertEqual(stack.total_weight, 10)
+        stack.push("ddd")
+        self.assertEqual(stack.display(), ["bbbb", "cc", "ddd"])
+        self.assertEqual(stack.total_weight, 9)
+        self.assertEqual(stack.pop(), "ddd")
+        self.assertEqual(stack.total_weight, 6)
+    
+    def test_entry_over_budget_is_not_kept(self):
+        stack = BoundedStack(10, weight=len)
+        stack.push("aaaa")
+        stack.push("x" * 11)
+        self.assertTrue(stack.is_empty())
+        self.assertEqual(stack.total_weight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
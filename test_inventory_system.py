@@ -0,0 +1,186 @@
+"""
+Tests for the Inventory System
+Transactions, the undo history and the order pipeline
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import time
+import unittest
+
+from inventory_system import InventorySystem
+from product_store import STORES
+
+
+def names(inventory):
+    return [product.name for product in inventory.iter_products()]
+
+
+class InventoryTestCase(unittest.TestCase):
+    """Creates the inventories under test (test_backends.py reruns these tests on SQLite)"""
+    def make_inventory(self, **options):
+        return InventorySystem(**options)
+
+
+class TransactionUndoTest(InventoryTestCase):
+    def test_grouped_transaction_is_one_undo_step(self):
+        inventory = self.make_inventory()
+        with inventory.transaction():
+            inventory.add_product("Lamp", "Lighting", 20.0, 3)
+            inventory.add_product("Desk", "Furniture", 150.0, 1)
+        self.assertEqual(inventory.undo(), 1)
+        self.assertEqual(names(inventory), [])
+        self.assertEqual(inventory.redo(), 1)
+        self.assertEqual(names(inventory), ["Lamp", "Desk"])
+    
+    def test_ungrouped_transaction_keeps_one_entry_per_call(self):
+        inventory = self.make_inventory()
+        with inventory.transaction(group_undo=False):
+            inventory.add_product("Lamp", "Lighting", 20.0, 3)
+            with inventory.transaction():  # Nested transactions follow the outermost one
+                inventory.add_product("Desk", "Furniture", 150.0, 1)
+                inventory.update_product_quantity(1, 5)
+        self.assertEqual(inventory.undo(), 1)
+        self.assertEqual(inventory.search_product(1).quantity, 3)
+        self.assertEqual(names(inventory), ["Lamp", "Desk"])
+        self.assertEqual(inventory.undo(), 1)
+        self.assertEqual(names(inventory), ["Lamp"])
+    
+    def test_failed_transaction_is_reverted(self):
+        inventory = self.make_inventory()
+        inventory.add_product("Lamp", "Lighting", 20.0, 3)
+        with self.assertRaises(ValueError):
+            with inventory.transaction(group_undo=False):
+                inventory.add_product("Desk", "Furniture", 150.0, 1)
+                raise ValueError("abort")
+        self.assertEqual(names(inventory), ["Lamp"])
+        self.assertEqual(inventory.undo(), 1)
+        self.assertEqual(names(inventory), [])
+
+
+class UndoBudgetTest(InventoryTestCase):
+    def add_group(self, inventory, *names):
+        with inventory.transaction():
+            for name in names:
+                inventory.add_product(name, "Office", 1.0, 1)
+    
+    def test_budget_counts_records_not_entries(self):
+        inventory = self.make_inventory(undo_limit=5)
+        inventory.add_product("Lamp", "Lighting", 20.0, 3)
+        self.add_group(inventory, "Desk", "Chair")
+        self.add_group(inventory, "Pen", "Ink", "Paper")
+        # 1 + 2 + 3 records exceed the budget, so the oldest entry was dropped
+        self.assertEqual(inventory.operation_stack.total_weight, 5)
+        self.assertEqual(inventory.undo(5), 2)
+        self.assertEqual(names(inventory), ["Lamp"])
+        self.assertEqual(inventory.redo(5), 2)
+        self.assertEqual(len(names(inventory)), 6)
+    
+    def test_oversized_transaction_clears_the_history(self):
+        inventory = self.make_inventory(undo_limit=2)
+        inventory.add_product("Lamp", "Lighting", 20.0, 3)
+        self.add_group(inventory, "Pen", "Ink", "Paper")
+        self.assertEqual(inventory.undo(), 0)
+        self.assertEqual(len(names(inventory)), 4)
+    
+    def test_batch_add_is_one_record(self):
+        inventory = self.make_inventory(undo_limit=2)
+        inventory.add_products([("Pen", "Office", 1.0, 100)] * 50)
+        self.assertEqual(inventory.operation_stack.total_weight, 1)
+        self.assertEqual(inventory.undo(), 1)
+        self.assertEqual(names(inventory), [])
+
+
+class DetachedResultsTest(unittest.TestCase):
+    def test_added_products_stay_readable_after_removal(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                inventory = InventorySystem(store=STORES[engine]())
+                product = inventory.add_product("Lamp", "Lighting", 20.0, 3)
+                batch = inventory.add_products([("Desk", "Furniture", 150.0, 1), ("Chair", "Furniture", 60.0, 4)])
+                # As if another thread removed them before the response was built
+                for product_id in (1, 2, 3):
+                    inventory.remove_product(product_id)
+                self.assertEqual((product.product_id, product.name, product.quantity), (1, "Lamp", 3))
+                self.assertEqual([(p.product_id, p.name, p.price) for p in batch],
+                                 [(2, "Desk", 150.0), (3, "Chair", 60.0)])
+                inventory.add_product("Pen", "Office", 1.0, 100)
+                self.assertEqual(product.name, "Lamp")  # Not a view of a reused row
+
+
+class OrderReservationTest(InventoryTestCase):
+    def setUp(self):
+        self.inventory = self.make_inventory()
+        self.product_id = self.inventory.add_product("Lamp", "Lighting", 20.0, 10).product_id
+    
+    def test_orders_reserve_stock_until_they_leave_the_queue(self):
+        inventory = self.inventory
+        first = inventory.add_order(self.product_id, 4)
+        second = inventory.add_order(self.product_id, 5)
+        self.assertEqual(inventory.available_quantity(self.product_id), 1)
+        self.assertIsNone(inventory.add_order(self.product_id, 2))  # Only 1 unreserved
+        
+        self.assertEqual(inventory.process_order()["order_id"], first["order_id"])
+        self.assertEqual(inventory.search_product(self.product_id).quantity, 6)
+        self.assertEqual(inventory.available_quantity(self.product_id), 1)
+        self.assertEqual(inventory.cancel_order(second["order_id"]), second)
+        self.assertEqual(inventory.available_quantity(self.product_id), 6)
+        self.assertEqual(inventory.reservations, {})
+        self.assertEqual(inventory.get_statistics()["reserved_quantity"], 0)
+    
+    def test_reads_expire_due_orders(self):
+        inventory = self.inventory
+        inventory.add_order(self.product_id, 3, deadline=time.time() + 0.05)
+        inventory.add_order(self.product_id, 2)
+        tag = inventory.version_tag(orders=True)
+        self.assertEqual(inventory.get_statistics()["reserved_quantity"], 5)
+        time.sleep(0.1)
+        # No add_order or process_orders call in between
+        self.assertNotEqual(inventory.version_tag(orders=True), tag)
+        statistics = inventory.get_statistics()
+        self.assertEqual(statistics["reserved_quantity"], 2)
+        self.assertEqual(statistics["pending_orders"], 1)
+        self.assertEqual(inventory.available_quantity(self.product_id), 8)
+    
+    def test_available_quantity_expires_orders(self):
+        self.inventory.add_order(self.product_id, 3, deadline=time.time() - 1)
+        self.assertEqual(self.inventory.available_quantity(self.product_id), 10)
+    
+    def test_cancelled_orders_are_skipped_and_compacted(self):
+        inventory = self.make_inventory()
+        product_id = inventory.add_product("Pen", "Office", 1.0, 1000).product_id
+        orders = [inventory.add_order(product_id, 1)["order_id"] for _ in range(10)]
+        for order_id in orders[2:5]:
+            inventory.cancel_order(order_id)
+        self.assertEqual(inventory.order_tombstones, 3)
+        self.assertEqual(len(inventory.order_queue), 10)
+        self.assertEqual([order["order_id"] for order in inventory.display_pending_orders(1, 3)],
+                         [orders[1], orders[5], orders[6]])
+        self.assertEqual(inventory.get_statistics()["pending_orders"], 7)
+        
+        # Tombstones ahead of the next order are skipped when it is dequeued
+        processed, _ = inventory.process_orders(3)
+        self.assertEqual([order["order_id"] for order in processed], [orders[0], orders[1], orders[5]])
+        self.assertEqual(inventory.order_tombstones, 0)
+        # Once tombstones are more than half the queue, it is compacted
+        inventory.cancel_order(orders[7])
+        inventory.cancel_order(orders[8])
+        self.assertEqual(inventory.order_tombstones, 2)
+        inventory.cancel_order(orders[9])
+        self.assertEqual(inventory.order_tombstones, 0)
+        self.assertEqual(len(inventory.order_queue), 1)
+        self.assertEqual([order["order_id"] for order in inventory.display_pending_orders()], [orders[6]])
+        self.assertIsNone(inventory.cancel_order(orders[0]))  # Already processed
+    
+    def test_order_ids_are_not_reused(self):
+        inventory = self.inventory
+        first = inventory.add_order(self.product_id, 1)["order_id"]
+        inventory.cancel_order(first)
+        second = inventory.add_order(self.product_id, 1)["order_id"]
+        inventory.process_order()
+        self.assertEqual(inventory.add_order(self.product_id, 1)["order_id"], second + 1)
+        self.assertGreater(second, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
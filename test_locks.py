@@ -0,0 +1,143 @@
+"""
+Tests for the Locks of the Product Inventory System
+Readers share the ReadWriteLock, writers are exclusive and preferred
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import threading
+import time
+import unittest
+
+from locks import ReadWriteLock
+
+
+TIMEOUT = 5
+
+
+def start(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class ReadWriteLockTest(unittest.TestCase):
+    def setUp(self):
+        self.lock = ReadWriteLock()
+    
+    def test_readers_share(self):
+        both_inside = threading.Barrier(2, timeout=TIMEOUT)
+        
+        def reader():
+            with self.lock.read():
+                both_inside.wait()
+        
+        threads = [start(reader), start(reader)]
+        for thread in threads:
+            thread.join(TIMEOUT)
+            self.assertFalse(thread.is_alive())
+        self.assertFalse(both_inside.broken)
+    
+    def test_writer_waits_for_readers(self):
+        events = []
+        reading = threading.Event()
+        release = threading.Event()
+        
+        def reader():
+            with self.lock.read():
+                reading.set()
+                release.wait(TIMEOUT)
+                events.append("read done")
+        
+        def writer():
+            with self.lock.write():
+                events.append("write")
+        
+        threads = [start(reader)]
+        self.assertTrue(reading.wait(TIMEOUT))
+        threads.append(start(writer))
+        time.sleep(0.05)
+        self.assertEqual(events, [])
+        release.set()
+        for thread in threads:
+            thread.join(TIMEOUT)
+        self.assertEqual(events, ["read done", "write"])
+    
+    def test_waiting_writer_blocks_new_readers(self):
+        events = []
+        reading = threading.Event()
+        release = threading.Event()
+        
+        def first_reader():
+            with self.lock.read():
+                reading.set()
+                release.wait(TIMEOUT)
+        
+        def writer():
+            with self.lock.write():
+                events.append("write")
+        
+        def late_reader():
+            with self.lock.read():
+                events.append("late read")
+        
+        threads = [start(first_reader)]
+        self.assertTrue(reading.wait(TIMEOUT))
+        threads.append(start(writer))
+        while not self.lock.waiting_writers:
+            time.sleep(0.001)
+        threads.append(start(late_reader))
+        time.sleep(0.05)
+        self.assertEqual(events, [])
+        release.set()
+        for thread in threads:
+            thread.join(TIMEOUT)
+        self.assertEqual(events, ["write", "late read"])
+    
+    def test_writers_are_exclusive(self):
+        counter = {"value": 0, "inside": 0, "overlap": False}
+        
+        def writer():
+            for _ in range(200):
+                with self.lock.write():
+                    counter["inside"] += 1
+                    if counter["inside"] > 1:
+                        counter["overlap"] = True
+                    value = counter["value"]
+                    time.sleep(0)
+                    counter["value"] = value + 1
+                    counter["inside"] -= 1
+        
+        threads = [start(writer) for _ in range(4)]
+        for thread in threads:
+            thread.join(TIMEOUT)
+        self.assertFalse(counter["overlap"])
+        self.assertEqual(counter["value"], 800)
+    
+    def test_reentrant(self):
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    pass
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        # Fully released: another thread can write
+        written = threading.Event()
+        
+        def writer():
+            with self.lock.write():
+                written.set()
+        
+        start(writer)
+        self.assertTrue(written.wait(TIMEOUT))
+    
+    def test_upgrade_raises(self):
+        with self.lock.read():
+            with self.assertRaises(RuntimeError):
+                with self.lock.write():
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
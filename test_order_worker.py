@@ -0,0 +1,101 @@
+"""
+Tests for the Order Worker of the Product Inventory System
+Batches processed with run_once(), and the background thread surviving a failed batch
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import time
+import unittest
+from unittest import mock
+
+from inventory_system import InventorySystem
+from order_worker import OrderWorker
+
+
+def order_ids(orders):
+    return [order["order_id"] for order in orders]
+
+
+class RunOnceTest(unittest.TestCase):
+    def setUp(self):
+        self.inventory = InventorySystem()
+        self.inventory.add_product("Lamp", "Lighting", 20.0, 10)
+        self.worker = OrderWorker(self.inventory, batch_size=3)
+    
+    def test_batches_follow_queue_order(self):
+        for _ in range(5):
+            self.inventory.add_order(1, 2)
+        processed, rejected = self.worker.run_once()
+        self.assertEqual((order_ids(processed), rejected), ([1, 2, 3], []))
+        self.assertEqual(self.inventory.search_product(1).quantity, 4)
+        processed, rejected = self.worker.run_once()
+        self.assertEqual(order_ids(processed), [4, 5])
+        self.assertEqual(self.inventory.pending_orders, {})
+        
+        status = self.worker.status()
+        self.assertEqual((status["batches"], status["processed"], status["rejected"]), (2, 5, 0))
+        self.assertEqual(status["average_batch_size"], 2.5)
+    
+    def test_orders_beyond_the_stock_are_rejected(self):
+        self.inventory.add_order(1, 6)
+        self.inventory.add_order(1, 4)
+        self.inventory.update_product_quantity(1, 5)  # Stock taken after the orders were placed
+        processed, rejected = self.worker.run_once()
+        self.assertEqual((order_ids(processed), order_ids(rejected)), ([2], [1]))
+        self.assertEqual(self.inventory.search_product(1).quantity, 1)
+        self.assertEqual(self.worker.status()["rejected"], 1)
+    
+    def test_empty_queue_is_not_a_batch(self):
+        self.assertEqual(self.worker.run_once(), ([], []))
+        self.assertEqual(self.worker.status()["batches"], 0)
+
+
+class BackgroundThreadTest(unittest.TestCase):
+    def test_failed_batch_does_not_stop_the_thread(self):
+        inventory = InventorySystem()
+        inventory.add_product("Lamp", "Lighting", 20.0, 10)
+        worker = OrderWorker(inventory, interval=0.01)
+        process_orders = inventory.process_orders
+        calls = []
+        
+        def flaky(max_orders):
+            calls.append(max_orders)
+            if len(calls) == 1:
+                raise RuntimeError("database is locked")
+            return process_orders(max_orders)
+        
+        inventory.add_order(1, 2)
+        with mock.patch.object(inventory, "process_orders", flaky), \
+                self.assertLogs("order_worker", "ERROR") as logs:
+            worker.start()
+            self.addCleanup(worker.stop)
+            for _ in range(200):
+                if worker.processed:
+                    break
+                time.sleep(0.01)
+            self.assertTrue(worker.is_running())
+        self.assertEqual(worker.status()["failed_batches"], 1)
+        self.assertEqual(worker.processed, 1)
+        self.assertIsInstance(logs.records[0].exc_info[1], RuntimeError)
+    
+    def test_wake_processes_without_waiting_for_the_interval(self):
+        inventory = InventorySystem()
+        inventory.add_product("Lamp", "Lighting", 20.0, 10)
+        worker = OrderWorker(inventory, interval=60)
+        worker.start()
+        self.addCleanup(worker.stop)
+        time.sleep(0.05)  # Let it find the queue empty and go to sleep
+        inventory.add_order(1, 1)
+        worker.wake()
+        for _ in range(200):
+            if worker.processed:
+                break
+            time.sleep(0.01)
+        self.assertEqual(worker.processed, 1)
+        worker.stop(timeout=5)
+        self.assertFalse(worker.is_running())
+
+
+if __name__ == "__main__":
+    unittest.main()
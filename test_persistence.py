@@ -0,0 +1,291 @@
+"""
+Tests for the Persistence of the Product Inventory System
+Write-ahead log recovery, group commit and snapshots (JSON, binary and the mapped store)
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from binary_snapshot import MappedSnapshot
+from inventory_system import InventorySystem
+from persistence import SNAPSHOT_FILES, Persistence
+from product_store import STORES
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def inventory_state(inventory):
+    """Everything recovery must restore"""
+    products = [(p.product_id, p.name, p.category, p.price, p.quantity) for p in inventory.iter_products()]
+    return products, inventory.display_pending_orders(), inventory.next_id
+
+
+def random_workload(inventory, steps, seed):
+    rng = random.Random(seed)
+    for step in range(steps):
+        ids = [product.product_id for product in inventory.iter_products()]
+        action = rng.random()
+        if action < 0.3 or not ids:
+            inventory.add_product(f"Item {step}", rng.choice(["Tools", "Toys", "Books"]),
+                                  round(rng.uniform(1, 100), 2), rng.randint(0, 50))
+        elif action < 0.35:
+            inventory.add_products([(f"Batch {step}", "Bulk", 1.5, 3)] * 3)
+        elif action < 0.45:
+            inventory.remove_product(rng.choice(ids))
+        elif action < 0.55:
+            inventory.update_product_quantity(rng.choice(ids), rng.randint(0, 50))
+        elif action < 0.6:
+            inventory.update_product_price(rng.choice(ids), round(rng.uniform(1, 100), 2))
+        elif action < 0.7:
+            inventory.add_order(rng.choice(ids), rng.randint(1, 3))
+        elif action < 0.75 and inventory.pending_orders:
+            inventory.cancel_order(rng.choice(sorted(inventory.pending_orders)))
+        elif action < 0.85:
+            inventory.process_order()
+        else:
+            inventory.undo(rng.randint(1, 2))
+
+
+class PersistenceTestCase(unittest.TestCase):
+    """Opens inventories journaled to a temporary data directory"""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = self.directory.name
+    
+    def open(self, engine="linked", priority_orders=False, **options):
+        inventory = InventorySystem(store=STORES[engine](), priority_orders=priority_orders)
+        persistence = Persistence(self.path, **options)
+        persistence.recover(inventory)
+        return inventory, persistence
+
+
+class RecoveryTest(PersistenceTestCase):
+    def test_log_replay(self):
+        inventory, persistence = self.open()
+        random_workload(inventory, 600, seed=1)
+        expected = inventory_state(inventory)
+        persistence.close()
+        
+        recovered, persistence = self.open()
+        self.assertEqual(inventory_state(recovered), expected)
+        self.assertTrue(recovered.verify_statistics())
+        persistence.close()
+    
+    def test_torn_final_record_is_ignored(self):
+        inventory, persistence = self.open()
+        inventory.add_product("Kept", "Tools", 1.0, 1)
+        expected = inventory_state(inventory)
+        persistence.close()
+        (segment,) = [name for name in os.listdir(self.path) if name.startswith("wal-")]
+        with open(os.path.join(self.path, segment), "a", encoding="utf-8") as f:
+            f.write('[2,"add",2,"Torn')
+        
+        recovered, persistence = self.open()
+        self.assertEqual(inventory_state(recovered), expected)
+        persistence.close()
+    
+    def test_acknowledged_writes_survive_a_killed_process(self):
+        # The child commits, then dies without closing anything; its background
+        # sync interval is far longer than the run, so only commit waits can save it
+        script = (
+            "import os, sys\n"
+            f"sys.path.insert(0, {HERE!r})\n"
+            "from inventory_system import InventorySystem\n"
+            "from persistence import Persistence\n"
+            "inventory = InventorySystem()\n"
+            f"Persistence({self.path!r}, sync_interval=60).recover(inventory)\n"
+            "for i in range(100):\n"
+            "    inventory.add_product(f'Item {i}', 'Tools', 1.0, i)\n"
+            "inventory.add_order(5, 2)\n"
+            "os._exit(0)\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
+        
+        recovered, persistence = self.open()
+        self.assertEqual(len(recovered.backend), 100)
+        self.assertEqual(recovered.reservations, {5: 2})
+        persistence.close()
+    
+    def test_replay_does_not_depend_on_dispatch_order(self):
+        inventory, persistence = self.open()
+        inventory.add_product("Lamp", "Lighting", 20.0, 100)
+        for priority in (0, 2, 1, 2, 0, 1):
+            inventory.add_order(1, 1, priority)
+        inventory.process_orders(3)
+        pending = sorted(inventory.pending_orders)
+        persistence.close()
+        
+        # Restarted with priority dispatch, the orders FIFO dispatch took must stay closed
+        recovered, persistence = self.open(priority_orders=True)
+        self.assertEqual(sorted(recovered.pending_orders), pending)
+        self.assertEqual(recovered.reservations, {1: 3})
+        persistence.close()
+
+
+class SnapshotTest(PersistenceTestCase):
+    def check_round_trip(self, engine, snapshot_format):
+        with tempfile.TemporaryDirectory() as path:
+            self.path = path
+            inventory, persistence = self.open(engine, snapshot_every=150, snapshot_format=snapshot_format)
+            random_workload(inventory, 800, seed=2)
+            expected = inventory_state(inventory)
+            persistence.close()
+            self.assertIn(SNAPSHOT_FILES[snapshot_format], os.listdir(path))
+            
+            recovered, persistence = self.open(engine, snapshot_format=snapshot_format)
+            self.assertEqual(inventory_state(recovered), expected)
+            self.assertTrue(recovered.verify_statistics())
+            # Recovered inventories keep working (and journaling)
+            random_workload(recovered, 200, seed=3)
+            expected = inventory_state(recovered)
+            persistence.close()
+            
+            recovered, persistence = self.open(engine, snapshot_format=snapshot_format)
+            self.assertEqual(inventory_state(recovered), expected)
+            persistence.close()
+    
+    def test_json_snapshots(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                self.check_round_trip(engine, "json")
+    
+    def test_binary_snapshots(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                self.check_round_trip(engine, "binary")
+    
+    def test_switching_snapshot_format(self):
+        inventory, persistence = self.open(snapshot_format="binary")
+        random_workload(inventory, 300, seed=4)
+        persistence.snapshot(wait=True)
+        persistence.close()
+        
+        recovered, persistence = self.open(snapshot_format="json")
+        expected = inventory_state(recovered)
+        persistence.snapshot(wait=True)
+        persistence.close()
+        self.assertNotIn(SNAPSHOT_FILES["binary"], os.listdir(self.path))
+        
+        recovered, persistence = self.open()
+        self.assertEqual(inventory_state(recovered), expected)
+        persistence.close()
+    
+    def test_mapped_store_reads_the_snapshot_lazily(self):
+        inventory, persistence = self.open(snapshot_format="binary")
+        for i in range(50):
+            inventory.add_product(f"Lamp {i}", "Lighting", 10.0 + i, i)
+        persistence.snapshot(wait=True)
+        persistence.close()
+        
+        recovered, persistence = self.open("mapped", snapshot_format="binary")
+        store = recovered.backend.store
+        self.assertIsInstance(store.base, MappedSnapshot)
+        self.assertEqual(store.products, {})
+        self.assertEqual(len(recovered.backend), 50)
+        self.assertEqual(recovered.search_product(7).name, "Lamp 6")
+        self.assertEqual(store.products, {})  # Reads do not materialize
+        recovered.update_product_quantity(7, 99)
+        self.assertEqual(list(store.products), [7])
+        self.assertEqual([p.product_id for p in recovered.search_by_name("lamp 4")],
+                         [5, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50])
+        self.assertEqual(recovered.get_statistics()["total_quantity"], sum(range(50)) - 6 + 99)
+        persistence.close()
+    
+    def test_order_ids_continue_after_a_snapshot(self):
+        for snapshot_format in SNAPSHOT_FILES:
+            with self.subTest(snapshot_format=snapshot_format), tempfile.TemporaryDirectory() as path:
+                self.path = path
+                inventory, persistence = self.open(snapshot_format=snapshot_format)
+                inventory.add_product("Lamp", "Lighting", 20.0, 10)
+                for _ in range(3):
+                    inventory.add_order(1, 1)
+                inventory.process_orders(3)  # Nothing pending: only the counter remembers the IDs
+                persistence.snapshot(wait=True)
+                persistence.close()
+                
+                recovered, persistence = self.open(snapshot_format=snapshot_format)
+                self.assertEqual(recovered.add_order(1, 1)["order_id"], 4)
+                persistence.close()
+    
+    def test_writes_during_a_snapshot_are_kept(self):
+        inventory, persistence = self.open()
+        acknowledged = []
+        stop = threading.Event()
+        
+        def writer():
+            while not stop.is_set():
+                acknowledged.append(inventory.add_product("Item", "Tools", 1.0, 1).product_id)
+        
+        # Slow down the segment switch, so commits arriving during it are likely
+        segments = persistence._segments
+        
+        def slow_segments():
+            time.sleep(0.05)
+            return segments()
+        
+        thread = threading.Thread(target=writer)
+        thread.start()
+        with mock.patch.object(persistence, "_segments", slow_segments):
+            for _ in range(3):
+                persistence.snapshot(wait=True)
+        stop.set()
+        thread.join()
+        persistence.close()
+        
+        recovered, persistence = self.open()
+        self.assertEqual([product.product_id for product in recovered.iter_products()], acknowledged)
+        persistence.close()
+
+
+class GroupCommitTest(unittest.TestCase):
+    def test_concurrent_commits_share_fsyncs(self):
+        with tempfile.TemporaryDirectory() as path:
+            inventory = InventorySystem()
+            persistence = Persistence(path, sync_interval=60)
+            persistence.recover(inventory)
+            barrier = threading.Barrier(8)
+            
+            def writer(seed):
+                barrier.wait()
+                for i in range(50):
+                    inventory.add_product(f"Item {seed} {i}", "Tools", 1.0, 1)
+            
+            with mock.patch("persistence.os.fsync", wraps=os.fsync) as fsync:
+                threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                # Without group commit every commit would take its own fsync
+                self.assertLess(fsync.call_count, 200)
+            # Every commit waited for its records to reach the disk
+            self.assertEqual(persistence.wal.synced, persistence.wal.appended)
+            self.assertEqual(persistence.wal.appended, 400)
+            persistence.close()
+    
+    def test_read_only_calls_do_not_sync(self):
+        with tempfile.TemporaryDirectory() as path:
+            inventory = InventorySystem()
+            persistence = Persistence(path, sync_interval=60)
+            persistence.recover(inventory)
+            inventory.add_product("Item", "Tools", 1.0, 1)
+            with mock.patch("persistence.os.fsync", wraps=os.fsync) as fsync:
+                inventory.remove_product(12345)  # Changes nothing
+                inventory.cancel_order(12345)
+                self.assertEqual(fsync.call_count, 0)
+            persistence.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
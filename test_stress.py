@@ -0,0 +1,32 @@
+"""
+Tests for the Thread Safety of the Product Inventory System
+A short run of the stress benchmark on every storage engine
+
+Run with: python -m unittest (or python -m pytest)
+"""
+
+import unittest
+
+from benchmarks import run_stress
+from product_store import STORES
+
+
+# Long enough for thousands of interleaved calls, short enough for CI;
+# run "python benchmarks.py stress --seconds 30" for a real soak
+SECONDS = 0.5
+THREADS = 4
+
+
+class StressTest(unittest.TestCase):
+    def test_invariants_hold_on_every_engine(self):
+        for engine in STORES:
+            with self.subTest(engine=engine):
+                # run_stress raises if a thread failed or an invariant broke
+                inventory, counts, shipped, elapsed = run_stress(engine, THREADS, SECONDS)
+                self.assertGreater(counts["writes"], 0)
+                self.assertGreater(counts["orders"], 0)
+                self.assertEqual(len(inventory.pending_orders), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()